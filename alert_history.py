@@ -0,0 +1,128 @@
+"""alert_history.py — Persistent, de-duplicated log of UOA alerts across scans
+One SQLite row per (ticker, alert_type, trading day). Every scan upserts its alerts:
+the first scan to see an alert sets first_seen, later ones bump last_seen and the
+scan count and keep the peak of each metric, plus the latest alert as JSON. The
+page uses it to mark alerts that are new since the previous scan of their ticker
+and to show the day's history. Queries go through indexes on (day, last_seen) and
+(ticker, day) so they stay fast as the log grows."""
+
+import json
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from baselines import trading_day
+from snapshot_store import CACHE_DIR
+
+DB_PATH = CACHE_DIR / "alert_history.sqlite"
+PEAKS   = ("vol_ratio", "vol_z", "total_vol", "est_notional")   # alert fields tracked as daily max
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def _conn() -> sqlite3.Connection:
+    c = getattr(_local, "conn", None)
+    if c is None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        c = sqlite3.connect(DB_PATH, timeout=30)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        c.execute(f"""CREATE TABLE IF NOT EXISTS alerts (
+                        ticker     TEXT NOT NULL,
+                        alert_type TEXT NOT NULL,
+                        day        TEXT NOT NULL,
+                        first_seen REAL NOT NULL,
+                        last_seen  REAL NOT NULL,
+                        scans      INTEGER NOT NULL,
+                        {", ".join(f"peak_{m} REAL" for m in PEAKS)},
+                        alert      TEXT NOT NULL,
+                        PRIMARY KEY (ticker, alert_type, day))""")
+        c.execute("CREATE INDEX IF NOT EXISTS ix_alerts_day_last ON alerts(day, last_seen)")
+        c.execute("CREATE INDEX IF NOT EXISTS ix_alerts_ticker_day ON alerts(ticker, day)")
+        c.commit()
+        _local.conn = c
+    return c
+
+
+def _num(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def record(alerts: list, seen_at: float | None = None, day: str | None = None):
+    """Upsert one scan's alerts (seen_at = when that scan started)."""
+    if not alerts:
+        return
+    seen_at = seen_at or time.time()
+    day     = day or trading_day()
+    rows = [(a["ticker"], a["alert_type"], day, seen_at, seen_at, 1,
+             *(_num(a.get(m)) for m in PEAKS), json.dumps(a, separators=(",", ":")))
+            for a in alerts]
+    # MAX() is NULL if either side is, so fall back to whichever side is set
+    peaks = ", ".join(f"peak_{m} = COALESCE(MAX(peak_{m}, excluded.peak_{m}), peak_{m}, excluded.peak_{m})"
+                      for m in PEAKS)
+    try:
+        with _write_lock:
+            c = _conn()
+            with c:
+                c.executemany(f"""
+                    INSERT INTO alerts VALUES ({", ".join("?" * (7 + len(PEAKS)))})
+                    ON CONFLICT (ticker, alert_type, day) DO UPDATE SET
+                        first_seen = MIN(first_seen, excluded.first_seen),
+                        last_seen  = MAX(last_seen, excluded.last_seen),
+                        scans      = scans + 1,
+                        {peaks},
+                        alert      = excluded.alert""", rows)
+    except Exception:
+        pass
+
+
+def annotate(alerts: list, scanned_at: dict, day: str | None = None) -> list:
+    """Copies of alerts with first_seen, last_seen, scans, peak_<metric> and is_new.
+
+    scanned_at maps ticker → start time of the scan the alert came from; an
+    alert is new if no earlier scan that day had raised it.
+    """
+    day = day or trading_day()
+    try:
+        hist = {(t, k): row for t, k, *row in _conn().execute(
+            f"SELECT ticker, alert_type, first_seen, last_seen, scans, "
+            f"{', '.join(f'peak_{m}' for m in PEAKS)} FROM alerts WHERE day = ?", (day,))}
+    except Exception:
+        hist = {}
+    out = []
+    for a in alerts:
+        row = hist.get((a["ticker"], a["alert_type"]))
+        if row is None:
+            out.append(dict(a, is_new=False))
+            continue
+        first, last, scans, *peaks = row
+        started = (scanned_at.get(a["ticker"]) or [None])[0]
+        out.append(dict(a, first_seen=first, last_seen=last, scans=scans,
+                        is_new=started is not None and first >= started,
+                        **{f"peak_{m}": p for m, p in zip(PEAKS, peaks)}))
+    return out
+
+
+def history(day: str | None = None, ticker: str | None = None, limit: int = 500) -> pd.DataFrame:
+    """Logged alerts for one day (optionally one ticker), most recently seen first."""
+    day = day or trading_day()
+    sql = (f"SELECT ticker, alert_type, first_seen, last_seen, scans, "
+           f"{', '.join(f'peak_{m}' for m in PEAKS)} FROM alerts WHERE day = ?")
+    args: list = [day]
+    if ticker:
+        sql += " AND ticker = ?"
+        args.append(ticker)
+    sql += " ORDER BY last_seen DESC LIMIT ?"
+    args.append(int(limit))
+    cols = ["ticker", "alert_type", "first_seen", "last_seen", "scans"] + [f"peak_{m}" for m in PEAKS]
+    try:
+        rows = _conn().execute(sql, args).fetchall()
+    except Exception:
+        rows = []
+    return pd.DataFrame(rows, columns=cols)
@@ -0,0 +1,83 @@
+"""alert_store.py — Columnar view over a scan's alert list for filtering and sorting
+Alerts stay plain dicts (that is what scans produce, persist and stream), but the
+page filters and counts them through one DataFrame built once per scan: `cat`,
+`sector` and `mcap_tier` are categoricals with a boolean mask per category built
+up front, the summary flags are one bool matrix, and numeric columns sort with
+argsort. A filter + sort + summary is a handful of array ops however many alerts
+the scan found."""
+
+import numpy as np
+import pandas as pd
+
+CATEGORICAL = ("cat", "sector", "mcap_tier")
+NUMERIC     = ("vol_ratio", "est_notional", "pc_ratio", "vol_z", "total_vol", "iv_rank")
+FLAGS       = ("bullish", "bearish", "is_top50", "conflict", "is_new")
+
+
+class AlertStore:
+    """Columnar index over `alerts` (a list of alert dicts, kept in its given order).
+
+    select() returns row positions into `alerts`; rows() maps them back to the
+    dicts; summary() and conflict_tickers() describe a selection.
+    """
+
+    def __init__(self, alerts: list):
+        self.alerts = alerts
+        n = len(alerts)
+        self.df = pd.DataFrame({
+            **{c: pd.Categorical([a.get(c) for a in alerts]) for c in CATEGORICAL},
+            **{c: pd.to_numeric(pd.Series([a.get(c) for a in alerts], dtype="object"),
+                                errors="coerce").astype("float64") for c in NUMERIC},
+            "ticker": [a["ticker"] for a in alerts],
+        })
+        self._flags = np.array([(a["bullish"] is True, a["bullish"] is False,
+                                 bool(a["is_top50"]), bool(a.get("conflict")), bool(a.get("is_new")))
+                                for a in alerts], dtype=bool).reshape(n, len(FLAGS))
+        # One mask per category value, so a filter is a lookup and an AND
+        self._masks = {c: {v: (self.df[c].cat.codes == i).to_numpy()
+                           for i, v in enumerate(self.df[c].cat.categories)}
+                       for c in CATEGORICAL}
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def mask(self, **equals) -> np.ndarray:
+        """Rows where each categorical column equals its value (None = any)."""
+        m = np.ones(len(self), dtype=bool)
+        for col, value in equals.items():
+            if value is not None:
+                m &= self._masks[col].get(value, np.zeros(len(self), dtype=bool))
+        return m
+
+    def select(self, top50_only: bool = False, new_only: bool = False, sort_by: str | None = None,
+               ascending: bool = False, **equals) -> np.ndarray:
+        """Positions of matching rows.
+
+        Without `sort_by` rows keep the store's order; with it they are ordered
+        by that numeric column (missing values last), Top 50 rows first.
+        """
+        m = self.mask(**equals)
+        if top50_only:
+            m &= self._flags[:, FLAGS.index("is_top50")]
+        if new_only:
+            m &= self._flags[:, FLAGS.index("is_new")]
+        pos = np.flatnonzero(m)
+        if sort_by is None or not len(pos):
+            return pos
+        vals = self.df[sort_by].to_numpy()[pos]
+        key  = np.where(np.isnan(vals), np.inf, vals if ascending else -vals)
+        top  = self._flags[pos, FLAGS.index("is_top50")]
+        return pos[np.lexsort((key, ~top))]
+
+    def rows(self, pos) -> list:
+        return [self.alerts[i] for i in pos]
+
+    def summary(self, pos) -> dict:
+        """{"alerts", "bullish", "bearish", "is_top50", "conflict", "is_new"} counts for pos."""
+        counts = self._flags[pos].sum(axis=0)
+        return {"alerts": len(pos), **{f: int(c) for f, c in zip(FLAGS, counts)}}
+
+    def conflict_tickers(self, pos) -> list:
+        pos = np.asarray(pos, dtype=np.intp)
+        hit = pos[self._flags[pos, FLAGS.index("conflict")]]
+        return sorted(set(self.df["ticker"].to_numpy()[hit]))
@@ -0,0 +1,275 @@
+"""api_server.py — Local read-only REST/JSON API over scan results and trade setups
+Serves what downstream tools used to scrape from the Streamlit pages, from a stdlib
+ThreadingHTTPServer with no Streamlit or Plotly import:
+
+    GET /alerts             latest UOA alerts (merged published scans, annotated from
+                            alert_history); ?cat= &sector= &mcap_tier= &ticker= &top50=1
+                            &new=1 &sort=<vol_ratio|est_notional|…> &asc=1 &limit= &offset=
+    GET /top50              TOP_50_STOCKS records; /top50/<TICKER> one record
+    GET /setups             Options Engine trade setups for the Top 50 (trade_setups.py)
+    GET /setups/<TICKER>    one setup; tickers outside the Top 50 are built from the
+                            previous close and live IV rank, as the chain explorer does
+    GET /health
+
+Every 200 carries a weak ETag over its JSON body and a request whose If-None-Match
+matches gets a bodiless 304, so a poller pays one lookup while nothing changes.
+Bodies of GZIP_MIN_BYTES or more are gzip-compressed for clients that accept it.
+Encoded responses are cached per URL until their data changes (a newly published
+scan for /alerts, a new day for /setups; the Top 50 data is static).
+
+    python api_server.py [--host 127.0.0.1] [--port 8765] [--scan]
+
+--scan also runs the background scans (scan_engine.SCAN_SCHEDULE) in this process;
+otherwise /alerts serves what the Streamlit server or `scan_engine.py --publish`
+last published into the same APPLOVIN_CACHE_DIR."""
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import sys
+import threading
+from collections import OrderedDict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import alert_history
+import perf
+import scan_engine
+import snapshot_store
+import trade_setups
+from alert_store import NUMERIC, AlertStore
+from applovin_data import TOP_50_STOCKS
+from scan_scheduler import ScanScheduler
+
+API_PORT       = 8765
+GZIP_MIN_BYTES = 1024
+CACHE_ENTRIES  = 256      # encoded responses kept (LRU)
+TICKER_RE      = re.compile(r"^[A-Z][A-Z0-9.\-]{0,9}$")
+
+_TOP50 = {s["ticker"]: s for s in TOP_50_STOCKS}
+
+_lock = threading.Lock()
+_responses: OrderedDict = OrderedDict()   # url → (version, body, etag, gzipped body or None)
+_alerts = {"version": None, "result": None, "store": None}
+
+
+class _BadRequest(Exception):
+    pass
+
+
+class _NotFound(Exception):
+    pass
+
+
+# ── Encoding & caching ────────────────────────────────────────────────────────
+def _encode(payload) -> tuple[bytes, str, bytes | None]:
+    """(JSON body, weak ETag, gzipped body if worth it)."""
+    body = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    return body, etag, gzip.compress(body, 6) if len(body) >= GZIP_MIN_BYTES else None
+
+
+def _cached(url: str, version, build) -> tuple:
+    """_encode(build()) for url, reused while `version` is unchanged."""
+    with _lock:
+        hit = _responses.get(url)
+        if hit is not None and hit[0] == version:
+            _responses.move_to_end(url)
+            return hit[1:]
+    resp = _encode(build())
+    with _lock:
+        _responses[url] = (version, *resp)
+        _responses.move_to_end(url)
+        while len(_responses) > CACHE_ENTRIES:
+            _responses.popitem(last=False)
+    return resp
+
+
+# ── Data ──────────────────────────────────────────────────────────────────────
+def _alert_state() -> tuple:
+    """(version, merged scan result or None, AlertStore or None), rebuilt when a scan is published.
+
+    The version is the as-of time of each kind's published scan, read without
+    loading the scans themselves.
+    """
+    version = tuple(snapshot_store.as_of("scan_result", kind) for kind in scan_engine.SCAN_SCHEDULE)
+    with _lock:
+        if _alerts["version"] == version:
+            return version, _alerts["result"], _alerts["store"]
+    r = scan_engine.shared_result()
+    store = AlertStore(alert_history.annotate(r["alerts"], r["fetched"])) if r else None
+    with _lock:
+        _alerts.update(version=version, result=r, store=store)
+    return version, r, store
+
+
+def _flag(q: dict, name: str) -> bool:
+    return q.get(name, [""])[0].lower() in ("1", "true", "yes")
+
+
+def _int(q: dict, name: str, default: int | None) -> int | None:
+    raw = q.get(name, [None])[0]
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise _BadRequest(f"{name} must be an integer")
+    if value < 0:
+        raise _BadRequest(f"{name} must be >= 0")
+    return value
+
+
+def _alerts_payload(q: dict, r: dict | None, store: AlertStore | None) -> dict:
+    sort = q.get("sort", [None])[0]
+    if sort is not None and sort not in NUMERIC:
+        raise _BadRequest(f"sort must be one of {', '.join(NUMERIC)}")
+    limit, offset = _int(q, "limit", None), _int(q, "offset", 0)
+    if store is None:
+        return {"finished": None, "tickers": 0, "total": 0, "offset": offset, "alerts": []}
+    pos = store.select(top50_only=_flag(q, "top50"), new_only=_flag(q, "new"), sort_by=sort,
+                       ascending=_flag(q, "asc"),
+                       **{c: q[c][0] for c in ("cat", "sector", "mcap_tier") if c in q})
+    if "ticker" in q:
+        pos = pos[store.df["ticker"].to_numpy()[pos] == q["ticker"][0].upper()]
+    page = pos[offset:] if limit is None else pos[offset:offset + limit]
+    return {"finished": r["finished"], "tickers": len(r["tickers"]), "total": len(pos),
+            "offset": offset, "alerts": store.rows(page)}
+
+
+def _ticker(raw: str) -> str:
+    t = raw.upper()
+    if not TICKER_RE.match(t):
+        raise _BadRequest(f"bad ticker {raw!r}")
+    return t
+
+
+def _route(path: str, query: str) -> tuple:
+    """Encoded response for GET path?query; raises _BadRequest / _NotFound."""
+    parts = [p for p in path.split("/") if p]
+    url   = f"{path}?{query}"
+    if parts == ["health"]:
+        return _encode({"ok": True})
+    if parts == ["alerts"]:
+        version, r, store = _alert_state()
+        return _cached(url, version, lambda: _alerts_payload(parse_qs(query), r, store))
+    if parts == ["top50"]:
+        return _cached(url, 0, lambda: {"stocks": TOP_50_STOCKS})
+    if len(parts) == 2 and parts[0] == "top50":
+        t = _ticker(parts[1])
+        if t not in _TOP50:
+            raise _NotFound(f"{t} is not in the Top 50")
+        return _cached(url, 0, lambda: _TOP50[t])
+    if parts == ["setups"]:
+        # Setups depend on today's date (expiry, DTE, theta, earnings window)
+        ranked = sorted(TOP_50_STOCKS, key=lambda s: s["app_score"], reverse=True)
+        return _cached(url, date.today().isoformat(),
+                       lambda: {"setups": [trade_setups.summary(s) for s in ranked]})
+    if len(parts) == 2 and parts[0] == "setups":
+        t = _ticker(parts[1])
+        if t in _TOP50:
+            return _cached(url, date.today().isoformat(), lambda: trade_setups.summary(_TOP50[t]))
+        # Live price / IV rank: market_data's caches do the reuse, the body is re-encoded
+        return _encode(trade_setups.summary(trade_setups.live_setup(t)))
+    raise _NotFound(f"no route {path}")
+
+
+# ── HTTP ──────────────────────────────────────────────────────────────────────
+def _etag_match(header: str | None, etag: str) -> bool:
+    """If-None-Match against etag (weak comparison)."""
+    if not header:
+        return False
+    want = etag.removeprefix("W/")
+    return any(tag.strip() == "*" or tag.strip().removeprefix("W/") == want for tag in header.split(","))
+
+
+def _accepts_gzip(header: str) -> bool:
+    for part in header.split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        if coding.lower() in ("gzip", "*"):
+            q = next((p[2:] for p in params if p.startswith("q=")), "1")
+            try:
+                return float(q) > 0
+            except ValueError:
+                return False
+    return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version   = "applovin-gems-api/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def _respond(self, head: bool):
+        url = urlsplit(self.path)
+        with perf.timer(f"api.{url.path.strip('/').split('/')[0] or 'root'}"):
+            try:
+                status, resp = 200, _route(url.path, url.query)
+            except _BadRequest as e:
+                status, resp = 400, _encode({"error": str(e)})
+            except _NotFound as e:
+                status, resp = 404, _encode({"error": str(e)})
+            except Exception as e:
+                status, resp = 500, _encode({"error": f"{type(e).__name__}: {e}"})
+            body, etag, gz = resp
+
+            if status == 200 and _etag_match(self.headers.get("If-None-Match"), etag):
+                perf.count("api.not_modified")
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                return
+
+            use_gz = gz is not None and _accepts_gzip(self.headers.get("Accept-Encoding", ""))
+            data   = gz if use_gz else body
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+            if status == 200:
+                self.send_header("ETag", etag)
+            if use_gz:
+                self.send_header("Content-Encoding", "gzip")
+            self.end_headers()
+            if not head:
+                self.wfile.write(data)
+
+
+def serve(host: str = "127.0.0.1", port: int = API_PORT, scan: bool = False):
+    """Serve until interrupted; with scan=True also run the scheduled background scans."""
+    if scan:
+        ScanScheduler(scan_engine.scheduled_jobs()).start()
+    httpd = ThreadingHTTPServer((host, port), _Handler)
+    httpd.daemon_threads = True
+    print(f"serving on http://{host}:{port}", file=sys.stderr)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Local REST/JSON API for UOA alerts and trade setups")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=API_PORT)
+    ap.add_argument("--scan", action="store_true", help="also run the scheduled background scans")
+    args = ap.parse_args(argv)
+    serve(args.host, args.port, args.scan)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
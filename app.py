@@ -151,11 +151,35 @@ from scanner_page import render_scanner_page
 from options_page import render_options_page
 from unusual_activity_page import render_unusual_activity_page
 
-if page == "The AppLovin Strategy":
-    render_applovin_page()
-elif page == "50-Stock Scanner":
-    render_scanner_page()
-elif page == "Options Engine":
-    render_options_page()
-else:
-    render_unusual_activity_page()
+import perf
+
+with perf.timer(f"render.{page}"):
+    if page == "The AppLovin Strategy":
+        render_applovin_page()
+    elif page == "50-Stock Scanner":
+        render_scanner_page()
+    elif page == "Options Engine":
+        render_options_page()
+    else:
+        render_unusual_activity_page()
+
+# ── Performance panel (APPLOVIN_PERF=1) ──
+if perf.ENABLED:
+    import json
+    import pandas as pd
+
+    with st.sidebar.expander("⏱️ Performance"):
+        rep = perf.report()
+        if rep["timers"]:
+            st.caption("Timers (ms; percentiles are histogram-bucket upper bounds)")
+            st.dataframe(pd.DataFrame(rep["timers"]).T, use_container_width=True)
+        if rep["caches"]:
+            st.caption("Cache hit rates")
+            st.dataframe(pd.DataFrame(rep["caches"]).T, use_container_width=True)
+        if rep["counters"]:
+            st.caption("Counters")
+            st.json(rep["counters"])
+        st.download_button("Download JSON", json.dumps(rep, indent=2), file_name="perf.json",
+                           mime="application/json")
+        if st.button("Reset counters"):
+            perf.reset()
@@ -3,6 +3,8 @@ import streamlit as st
 import plotly.graph_objects as go
 from datetime import datetime
 
+import perf
+
 # ── PHASE COLORS ──
 PHASE_COLORS = {
     "IPO_GROWTH":"#2563EB","PEAK":"#16A34A","SELLOFF_TRIGGER":"#F59E0B",
@@ -36,7 +38,7 @@ def _section(title, sub=""):
 def _metric_box(label, value, color="#2563EB"):
     return f'<div style="background:#F8FAFC;border:1px solid #E2E8F0;border-radius:8px;padding:12px 16px;flex:1;text-align:center;"><div style="font-size:22px;font-weight:700;color:{color}!important;">{value}</div><div style="font-size:11px;color:#6B7280!important;margin-top:2px;">{label}</div></div>'
 
-@st.cache_data
+@perf.cached("applovin_page._load_data", st.cache_data)
 def _load_data():
     from applovin_data import (APP_QUARTERS, APP_FULL_CYCLE, GATE_DEFINITIONS,
         NON_FINANCIAL_PATTERNS, BEARISH_PHASE_DATA, INSTITUTIONAL_PILLARS,
@@ -0,0 +1,127 @@
+"""baselines.py — Rolling per-ticker options volume/OI baselines for the UOA detector
+Each scan records the day's call/put volume and OI per ticker into a local SQLite
+time series. 20- and 30-day windows are kept as running integer sums and sums of
+squares, updated incrementally as each completed day rolls in (add the new day,
+subtract the one that fell out). Today's value never counts toward its own baseline.
+frame() returns mean / std / n per ticker for one window, for O(1) lookups."""
+
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+
+from snapshot_store import CACHE_DIR
+
+DB_PATH  = CACHE_DIR / "baselines.sqlite"
+METRICS  = ("call_vol", "put_vol", "call_oi", "put_oi")
+WINDOWS  = (20, 30)
+MIN_DAYS = 10      # completed days required before a baseline is trusted
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def _conn() -> sqlite3.Connection:
+    c = getattr(_local, "conn", None)
+    if c is None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        c = sqlite3.connect(DB_PATH, timeout=30)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute(f"""CREATE TABLE IF NOT EXISTS daily (
+                        ticker TEXT NOT NULL,
+                        day    TEXT NOT NULL,
+                        {", ".join(f"{m} INTEGER NOT NULL" for m in METRICS)},
+                        PRIMARY KEY (ticker, day)) WITHOUT ROWID""")
+        c.execute(f"""CREATE TABLE IF NOT EXISTS rolling (
+                        ticker      TEXT NOT NULL,
+                        window      INTEGER NOT NULL,
+                        through_day TEXT NOT NULL,
+                        n           INTEGER NOT NULL,
+                        {", ".join(f"{m}_s INTEGER NOT NULL, {m}_ss INTEGER NOT NULL" for m in METRICS)},
+                        PRIMARY KEY (ticker, window)) WITHOUT ROWID""")
+        c.commit()
+        _local.conn = c
+    return c
+
+
+def trading_day(d: date | None = None) -> str:
+    """ISO date of the session d belongs to (weekends map back to Friday)."""
+    d = d or date.today()
+    return (d - timedelta(days=max(0, d.weekday() - 4))).isoformat()
+
+
+def record(values: pd.DataFrame, day: str | None = None):
+    """Store one day's metrics (DataFrame indexed by ticker, columns METRICS).
+
+    Re-recording the same day overwrites it (intraday rescans). Earlier days
+    not yet in the rolling windows are folded in first.
+    """
+    day = day or trading_day()
+    if values.empty:
+        return
+    rows = [(t, day, *(int(values.at[t, m]) for m in METRICS)) for t in values.index]
+    with _write_lock:
+        c = _conn()
+        with c:
+            for window in WINDOWS:
+                _roll_forward(c, window, day)
+            c.executemany(f"INSERT OR REPLACE INTO daily VALUES ({', '.join('?' * (2 + len(METRICS)))})",
+                          rows)
+
+
+def _roll_forward(c: sqlite3.Connection, window: int, day: str):
+    """Fold every recorded day before `day` that isn't in the window yet."""
+    cols = ", ".join(f"d.{m}" for m in METRICS)
+    pending = c.execute(f"""
+        SELECT d.ticker, d.day, {cols} FROM daily d
+        LEFT JOIN rolling r ON r.ticker = d.ticker AND r.window = ?
+        WHERE d.day < ? AND d.day > COALESCE(r.through_day, '')
+        ORDER BY d.ticker, d.day""", (window, day)).fetchall()
+    if not pending:
+        return
+
+    state: dict[str, list] = {}
+    for t, *rest in c.execute("SELECT ticker, through_day, n, "
+                              + ", ".join(f"{m}_s, {m}_ss" for m in METRICS)
+                              + " FROM rolling WHERE window = ?", (window,)):
+        state[t] = rest
+    fallout_sql = (f"SELECT {', '.join(METRICS)} FROM daily WHERE ticker = ? AND day <= ? "
+                   "ORDER BY day DESC LIMIT 1 OFFSET ?")
+
+    for t, d, *vals in pending:
+        # acc = [through_day, n, m1_s, m1_ss, m2_s, m2_ss, ...]
+        acc = state.setdefault(t, ["", 0] + [0] * (2 * len(METRICS)))
+        acc[0] = d
+        acc[1] += 1
+        for i, v in enumerate(vals):
+            acc[2 + 2 * i] += v
+            acc[3 + 2 * i] += v * v
+        if acc[1] > window:
+            old = c.execute(fallout_sql, (t, d, window)).fetchone()
+            if old:
+                acc[1] -= 1
+                for i, v in enumerate(old):
+                    acc[2 + 2 * i] -= v
+                    acc[3 + 2 * i] -= v * v
+
+    c.executemany(f"INSERT OR REPLACE INTO rolling VALUES ({', '.join('?' * (4 + 2 * len(METRICS)))})",
+                  [(t, window, *acc) for t, acc in state.items()])
+
+
+def frame(window: int = 30) -> pd.DataFrame:
+    """Per-ticker baseline for `window`: n plus <metric>_mean / <metric>_std columns."""
+    try:
+        rows = _conn().execute("SELECT * FROM rolling WHERE window = ?", (window,)).fetchall()
+    except Exception:
+        rows = []
+    cols = ["ticker", "window", "through_day", "n"] + [f"{m}_{k}" for m in METRICS for k in ("s", "ss")]
+    raw  = pd.DataFrame(rows, columns=cols).set_index("ticker")
+    out  = pd.DataFrame({"n": raw["n"]}, index=raw.index)
+    n    = raw["n"].where(raw["n"] > 0)
+    for m in METRICS:
+        s, ss = raw[f"{m}_s"].astype("float64"), raw[f"{m}_ss"].astype("float64")
+        out[f"{m}_mean"] = s / n
+        var = (ss - s * s / n) / (n - 1).where(n > 1)
+        out[f"{m}_std"]  = var.clip(lower=0) ** 0.5
+    return out
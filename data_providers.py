@@ -0,0 +1,241 @@
+"""data_providers.py — Raw market-data sources behind market_data's cached helpers
+A provider answers five questions: options-snapshot pages, previous-day bar, IV
+rank, grouped daily bars and option trades. PolygonOratsProvider asks the live
+APIs (through http_client); ReplayProvider serves JSON recorded on disk, with
+optional injected latency and error rate, so scans can be run and benchmarked
+offline; RecordingProvider wraps a live provider and writes what it fetches in the
+replay layout. market_data reads through provider(); set_provider() swaps it, and
+APPLOVIN_REPLAY_DIR selects a replay directory at import.
+
+Every method returns the same "nothing" value on failure as a failed request
+would ([] pages / {} / None), never raises.
+
+Replay layout (one JSON file per key):
+    <root>/options/<TICKER>.json    full chain (list of snapshot contracts)
+    <root>/prev/<TICKER>.json       previous-day bar
+    <root>/ivrank/<TICKER>.json     IV rank (number or null)
+    <root>/grouped/<YYYY-MM-DD>.json  ticker → day bar
+    <root>/trades/<CONTRACT>.json   list of trades (one day)"""
+
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+import perf
+from http_client import http_get
+
+POLYGON_KEY = "vzp2Q7xwgpv5g6rEl3Ewfp28fQlXsYqj"
+ORATS_KEY   = "306e5550-50f0-478a-b47d-477afa769d0a"
+
+SNAPSHOT_PAGE_LIMIT = 250     # Polygon max per page
+SNAPSHOT_MAX_PAGES  = 40      # safety cap: 10,000 contracts per chain
+TRADES_PAGE_LIMIT   = 50000   # Polygon max per page
+TRADES_MAX_PAGES    = 2       # safety cap per contract
+
+
+def _json(r, kind: str):
+    with perf.timer(f"json.{kind}"):
+        return r.json()
+
+
+class PolygonOratsProvider:
+    """Live Polygon (snapshots, bars, trades) and ORATS (IV rank) endpoints."""
+
+    def snapshot_pages(self, ticker: str):
+        """Yield every page of the Polygon options snapshot for ticker, following next_url."""
+        url    = f"https://api.polygon.io/v3/snapshot/options/{ticker}"
+        params = {"limit": SNAPSHOT_PAGE_LIMIT, "apiKey": POLYGON_KEY}
+        for _ in range(SNAPSHOT_MAX_PAGES):
+            try:
+                r = http_get(url, params=params, timeout=8)
+                if r.status_code != 200:
+                    return
+                body = _json(r, "snapshot")
+            except Exception:
+                return
+            yield body.get("results", [])
+            url = body.get("next_url")
+            if not url:
+                return
+            params = {"apiKey": POLYGON_KEY}  # next_url already carries cursor + limit
+
+    def prev_day(self, ticker: str) -> dict:
+        try:
+            r = http_get(
+                f"https://api.polygon.io/v2/aggs/ticker/{ticker}/prev",
+                params={"apiKey": POLYGON_KEY},
+                timeout=5,
+            )
+            results = _json(r, "prev").get("results") if r.status_code == 200 else None
+            if results:
+                return results[0]
+        except Exception:
+            pass
+        return {}
+
+    def iv_rank(self, ticker: str):
+        try:
+            r = http_get(
+                "https://api.orats.io/datav2/hist/ivrank",
+                params={"ticker": ticker, "token": ORATS_KEY},
+                timeout=5,
+            )
+            if r.status_code == 200:
+                data = _json(r, "ivrank").get("data", [])
+                if data:
+                    return data[0].get("ivRank")
+        except Exception:
+            pass
+        return None
+
+    def grouped_daily(self, day: str) -> dict:
+        try:
+            r = http_get(
+                f"https://api.polygon.io/v2/aggs/grouped/locale/us/market/stocks/{day}",
+                params={"adjusted": "true", "apiKey": POLYGON_KEY},
+                timeout=15,
+            )
+            if r.status_code == 200:
+                return {b["T"]: b for b in _json(r, "grouped").get("results") or [] if b.get("T")}
+        except Exception:
+            pass
+        return {}
+
+    def trades(self, contract: str, day: str) -> list | None:
+        """contract's trades on day (first TRADES_MAX_PAGES pages); None if the first page failed."""
+        url    = f"https://api.polygon.io/v3/trades/{contract}"
+        params = {"timestamp": day, "limit": TRADES_PAGE_LIMIT, "apiKey": POLYGON_KEY}
+        trades: list = []
+        for _ in range(TRADES_MAX_PAGES):
+            try:
+                r = http_get(url, params=params, timeout=8)
+                if r.status_code != 200:
+                    break
+                body = _json(r, "trades")
+            except Exception:
+                break
+            trades.extend(body.get("results") or [])
+            url = body.get("next_url")
+            if not url:
+                return trades
+            params = {"apiKey": POLYGON_KEY}
+        return trades or None
+
+
+class ReplayProvider:
+    """Serve recorded JSON from `root` (see the module docstring for the layout).
+
+    Each call sleeps `latency` seconds (±50% jitter) first and fails with
+    probability `error_rate`, as a timed-out or 5xx request would. A missing
+    file is a failure too. `seed` makes the injected jitter and errors
+    repeatable for a given call order.
+    """
+
+    def __init__(self, root, latency: float = 0.0, error_rate: float = 0.0, seed: int | None = None):
+        self.root       = Path(root)
+        self.latency    = float(latency)
+        self.error_rate = float(error_rate)
+        self._rng       = random.Random(seed)
+        self._rng_lock  = threading.Lock()
+        self.calls      = 0
+        self.errors     = 0
+
+    def _load(self, kind: str, key: str, empty):
+        with self._rng_lock:
+            self.calls += 1
+            delay = self.latency * self._rng.uniform(0.5, 1.5) if self.latency else 0.0
+            fail  = self.error_rate > 0 and self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return empty
+        try:
+            with perf.timer(f"replay.{kind}"), open(self.root / kind / f"{key}.json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return empty
+
+    def snapshot_pages(self, ticker: str):
+        chain = self._load("options", ticker, None)
+        if not chain:
+            return
+        for i in range(0, min(len(chain), SNAPSHOT_PAGE_LIMIT * SNAPSHOT_MAX_PAGES), SNAPSHOT_PAGE_LIMIT):
+            yield chain[i:i + SNAPSHOT_PAGE_LIMIT]
+
+    def prev_day(self, ticker: str) -> dict:
+        return self._load("prev", ticker, {}) or {}
+
+    def iv_rank(self, ticker: str):
+        return self._load("ivrank", ticker, None)
+
+    def grouped_daily(self, day: str) -> dict:
+        return self._load("grouped", day, {}) or {}
+
+    def trades(self, contract: str, day: str) -> list | None:
+        return self._load("trades", contract, None)
+
+
+class RecordingProvider:
+    """Pass calls through to `inner` and save non-empty results under `root` for ReplayProvider."""
+
+    def __init__(self, inner, root):
+        self.inner = inner
+        self.root  = Path(root)
+
+    def _save(self, kind: str, key: str, value):
+        path = self.root / kind / f"{key}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(value, separators=(",", ":")))
+        tmp.replace(path)
+
+    def snapshot_pages(self, ticker: str):
+        chain = []
+        for page in self.inner.snapshot_pages(ticker):
+            chain.extend(page)
+            yield page
+        if chain:
+            self._save("options", ticker, chain)
+
+    def prev_day(self, ticker: str) -> dict:
+        bar = self.inner.prev_day(ticker)
+        if bar:
+            self._save("prev", ticker, bar)
+        return bar
+
+    def iv_rank(self, ticker: str):
+        v = self.inner.iv_rank(ticker)
+        if v is not None:
+            self._save("ivrank", ticker, v)
+        return v
+
+    def grouped_daily(self, day: str) -> dict:
+        bars = self.inner.grouped_daily(day)
+        if bars:
+            self._save("grouped", day, bars)
+        return bars
+
+    def trades(self, contract: str, day: str) -> list | None:
+        trades = self.inner.trades(contract, day)
+        if trades is not None:
+            self._save("trades", contract, trades)
+        return trades
+
+
+_provider = (ReplayProvider(os.environ["APPLOVIN_REPLAY_DIR"]) if os.environ.get("APPLOVIN_REPLAY_DIR")
+             else PolygonOratsProvider())
+
+
+def provider():
+    return _provider
+
+
+def set_provider(p):
+    """Route every market_data fetch through p (callers clear market_data's caches)."""
+    global _provider
+    _provider = p
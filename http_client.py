@@ -0,0 +1,252 @@
+"""http_client.py — Shared HTTP layer for every Polygon and ORATS caller
+One pooled keep-alive requests.Session per host, a per-provider token-bucket
+rate limiter that backs off on 429/Retry-After, and retry + exponential backoff
+on 429/5xx. All pages call http_get() instead of bare requests.get().
+Fetch helpers are wrapped in @coalesce so concurrent identical fetches from
+different sessions (or pages) share one in-flight call."""
+
+import functools
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import perf
+
+# ── Pool / retry settings ────────────────────────────────────────────────────
+POOL_SIZE      = 32                         # keep-alive connections per host (≥ scan workers)
+MAX_RETRIES    = 3
+BACKOFF        = 0.5                        # seconds; 0.5 → 1 → 2 between retries
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# ── Rate limits per provider: (requests/sec, burst) ──────────────────────────
+PROVIDER_HOSTS = {"api.polygon.io": "polygon", "api.orats.io": "orats"}
+RATE_LIMITS = {
+    "polygon": (50.0, 50),
+    "orats":   (10.0, 20),
+}
+MIN_RATE_FRACTION = 0.10                    # adaptive floor: never drop below 10% of configured rate
+RECOVERY_STEP     = 0.02                    # +2% of configured rate per successful call
+
+_sessions: dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens/sec, holding at most `burst`.
+
+    On a 429 the rate is halved (down to a floor) and, if the server sent
+    Retry-After, all callers are held until it expires. Each success nudges
+    the rate back toward the configured maximum.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.max_rate      = float(rate)
+        self.rate          = float(rate)
+        self.burst         = float(burst)
+        self.tokens        = float(burst)
+        self.stamp         = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock         = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp  = now
+
+    def acquire(self) -> float:
+        """Block until a token is available; return seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def backoff(self, retry_after: float | None = None):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate   = max(self.max_rate * MIN_RATE_FRACTION, self.rate * 0.5)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def recover(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+
+_buckets: dict[str, TokenBucket] = {p: TokenBucket(*cfg) for p, cfg in RATE_LIMITS.items()}
+
+# Counters since process start; see net_stats()
+_stats = {"requests": 0, "throttled": 0, "retried": 0, "rate_limited": 0, "failed": 0,
+          "coalesced": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(key: str, n: int = 1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+def net_stats() -> dict:
+    """Snapshot of request counters (requests, throttled, retried, rate_limited, failed, coalesced)."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def configure_rate(provider: str, rate: float, burst: int):
+    """Set the requests/sec and burst for provider ("polygon" or "orats")."""
+    RATE_LIMITS[provider] = (float(rate), int(burst))
+    _buckets[provider] = TokenBucket(rate, burst)
+
+
+def _build_session(pool_size: int) -> requests.Session:
+    # Connection-level retries only; status retries go through http_get so the
+    # rate limiter sees every 429.
+    retry = Retry(
+        total=MAX_RETRIES,
+        status=0,
+        backoff_factor=BACKOFF,
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                          pool_block=False, max_retries=retry)
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def session_for(url: str) -> requests.Session:
+    """Return the shared Session for url's host, creating it on first use."""
+    host = urlsplit(url).netloc
+    s = _sessions.get(host)
+    if s is None:
+        with _lock:
+            s = _sessions.get(host)
+            if s is None:
+                s = _sessions[host] = _build_session(POOL_SIZE)
+    return s
+
+
+def configure_pool(pool_size: int):
+    """Change the per-host pool size; existing sessions are closed and rebuilt lazily."""
+    global POOL_SIZE
+    with _lock:
+        POOL_SIZE = max(1, int(pool_size))
+        for s in _sessions.values():
+            s.close()
+        _sessions.clear()
+
+
+def _retry_after(r: requests.Response) -> float | None:
+    try:
+        return max(0.0, float(r.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
+
+def http_get(url: str, params: dict | None = None, timeout: float = 5) -> requests.Response:
+    """GET through the pooled session and rate limiter for url's host.
+
+    429/5xx responses are retried up to MAX_RETRIES times; the last response is
+    returned either way. Raises like requests.get on connection errors.
+    """
+    session  = session_for(url)
+    provider = PROVIDER_HOSTS.get(urlsplit(url).hostname or "")
+    bucket   = _buckets.get(provider)
+    for attempt in range(MAX_RETRIES + 1):
+        if bucket is not None:
+            with perf.timer(f"http.{provider}.throttle_wait"):
+                if bucket.acquire() > 0:
+                    _count("throttled")
+        _count("requests")
+        with perf.timer(f"http.{provider or 'other'}"):
+            r = session.get(url, params=params, timeout=timeout)
+        if r.status_code not in RETRY_STATUSES:
+            if bucket is not None:
+                bucket.recover()
+            return r
+        wait = BACKOFF * (2 ** attempt)
+        if r.status_code == 429:
+            _count("rate_limited")
+            retry_after = _retry_after(r)
+            if bucket is not None:
+                bucket.backoff(retry_after)
+            if retry_after is not None:
+                wait = retry_after
+        if attempt == MAX_RETRIES:
+            break
+        _count("retried")
+        r.close()
+        time.sleep(wait)
+    _count("failed")
+    return r
+
+
+# ── Single-flight request coalescing ─────────────────────────────────────────
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done  = threading.Event()
+        self.value = None
+        self.error = None
+
+
+_flights: dict[tuple, _Flight] = {}
+_flights_lock = threading.Lock()
+
+
+def single_flight(key: tuple, fn):
+    """Call fn() once for all concurrent callers passing the same key.
+
+    The first caller runs fn; callers arriving while it is in flight wait and
+    get the same result (or exception). Nothing is cached once it completes.
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if not leader:
+        _count("coalesced")
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+    try:
+        flight.value = fn()
+        return flight.value
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+
+
+def coalesce(endpoint: str):
+    """Decorator: single_flight keyed by (endpoint, *args) — e.g. ("orats/ivrank", ticker).
+
+    Helpers that hit the same endpoint and return the same value should share
+    the endpoint name so concurrent calls from either one are coalesced.
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args):
+            return single_flight((endpoint, *args), lambda: fn(*args))
+        return inner
+    return wrap
@@ -0,0 +1,314 @@
+"""market_data.py — Shared Polygon/ORATS market-data fetches for every page
+Owns the options-snapshot fetch and its cache: the UOA scanner and the Options
+Engine both read the same paginated chain (reduced to per-strike aggregates by
+ChainAggregator), previous-day bars, grouped daily bars, IV rank and the trade
+prints of a chain's most active contracts from here.
+Helpers are cached in-process with ttl_cache, read through snapshot_store and
+coalesced per (endpoint, ticker); the raw fetches go to data_providers.provider().
+Nothing here imports Streamlit, so scan_engine can run scans headless."""
+
+from datetime import date, timedelta
+
+import pandas as pd
+
+import oi_history
+import perf
+import snapshot_store
+import trade_prints
+from baselines import trading_day
+from data_providers import provider
+from http_client import coalesce
+from ttl_cache import ttl_cache
+
+
+# Each helper reads through snapshot_store, so a restart serves the last good data.
+@perf.cached("market_data.options_snapshot", ttl_cache(ttl=900))
+def options_snapshot(ticker: str) -> list:
+    """First page (up to 250 contracts) of the Polygon options snapshot — used for the detail table.
+
+    A chain fetch stores its first page under the same key, so after a scan
+    this is served from disk without another request.
+    """
+    return snapshot_store.read_through("options_page1", ticker, 900,
+                                       lambda: _fetch_options_snapshot(ticker))
+
+
+@coalesce("polygon/options_snapshot_page1")
+@perf.timed("market_data._fetch_options_snapshot")
+def _fetch_options_snapshot(ticker: str) -> list:
+    pages = provider().snapshot_pages(ticker)
+    try:
+        return next(pages, [])
+    finally:
+        pages.close()
+
+
+def _page_frame(options: list) -> pd.DataFrame:
+    """Columnar view of one snapshot page: symbol, type, strike, expiry, volume, oi, iv, delta."""
+    details = [opt.get("details", {}) for opt in options]
+    return pd.DataFrame({
+        "symbol": [d.get("ticker", "") for d in details],
+        "type":   [d.get("contract_type", "").lower() for d in details],
+        "strike": [d.get("strike_price", 0) or 0 for d in details],
+        "expiry": [d.get("expiration_date", "9999-12-31") for d in details],
+        "volume": [opt.get("day", {}).get("volume", 0) or 0 for opt in options],
+        "oi":     [opt.get("open_interest", 0) or 0 for opt in options],
+        "iv":     [opt.get("implied_volatility", 0) or 0 for opt in options],
+        "delta":  [(opt.get("greeks", {}) or {}).get("delta") for opt in options],
+    })
+
+
+class ChainAggregator:
+    """Streaming reduction of an options chain, fed one page at a time.
+
+    Each page is folded into plain running sums per (type, strike) — volume, OI
+    and ≤30d volume — plus the max-volume call and put. Memory is bounded by
+    the number of strikes, not contracts. Strikes keep first-seen order so ties
+    resolve as in the chain; uoa_rules.universe_frames turns every chain of a
+    scan into one columnar frame.
+    """
+
+    STRIKE_COLUMNS = ("type", "strike", "volume", "oi", "near_vol")
+
+    def __init__(self):
+        self.contracts     = 0
+        self.strikes: dict[tuple[str, float], list[int]] = {}   # (type, strike) → [volume, oi, near_vol]
+        self.near_call_vol = 0
+        self.max_call_vol  = self.max_put_vol = 0
+        self.max_call_opt  = self.max_put_opt = None
+        self._cutoff_30d   = (date.today() + timedelta(days=30)).isoformat()
+
+    def strike_columns(self) -> list[list]:
+        """[types, strikes, volumes, ois, near_vols], one entry per (type, strike)."""
+        if not self.strikes:
+            return [[] for _ in self.STRIKE_COLUMNS]
+        (types, strikes), sums = zip(*self.strikes), zip(*self.strikes.values())
+        return [list(types), list(strikes), *map(list, sums)]
+
+    def to_dict(self) -> dict:
+        return {
+            "contracts":    self.contracts,
+            "strikes":      self.strike_columns(),
+            "max_call_vol": self.max_call_vol, "max_call_opt": self.max_call_opt,
+            "max_put_vol":  self.max_put_vol,  "max_put_opt":  self.max_put_opt,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ChainAggregator":
+        agg = cls()
+        agg.contracts = d["contracts"]
+        for ct, strike, vol, oi, near in zip(*d["strikes"]):
+            agg.strikes[(ct, strike)] = [vol, oi, near]
+            if ct == "call":
+                agg.near_call_vol += near
+        agg.max_call_vol, agg.max_call_opt = d["max_call_vol"], d["max_call_opt"]
+        agg.max_put_vol,  agg.max_put_opt  = d["max_put_vol"],  d["max_put_opt"]
+        return agg
+
+    def add_page(self, options: list, f: pd.DataFrame | None = None):
+        """Fold one page in; pass `f` if its _page_frame was already built."""
+        if not options:
+            return
+        if f is None:
+            f = _page_frame(options)
+        self.contracts += len(f)
+        strikes, cutoff = self.strikes, self._cutoff_30d
+        for i, (ct, strike, expiry, vol, oi) in enumerate(zip(
+                f["type"].tolist(), f["strike"].tolist(), f["expiry"].tolist(),
+                f["volume"].tolist(), f["oi"].tolist())):
+            if ct != "call" and ct != "put":
+                continue
+            near = vol if expiry <= cutoff else 0
+            row  = strikes.get((ct, strike))
+            if row is None:
+                strikes[(ct, strike)] = [vol, oi, near]
+            else:
+                row[0] += vol
+                row[1] += oi
+                row[2] += near
+            if ct == "call":
+                self.near_call_vol += near
+                if vol > self.max_call_vol:
+                    self.max_call_vol, self.max_call_opt = vol, options[i]
+            elif vol > self.max_put_vol:
+                self.max_put_vol, self.max_put_opt = vol, options[i]
+
+
+@perf.cached("market_data.chain_stats", ttl_cache(ttl=900))
+def chain_stats(ticker: str) -> ChainAggregator:
+    """Aggregate the full (paginated) options chain for ticker."""
+    return snapshot_store.read_through(
+        "chain", ticker, 900, lambda: _fetch_chain_stats(ticker),
+        encode=ChainAggregator.to_dict, decode=ChainAggregator.from_dict,
+        valid=lambda agg: agg.contracts > 0,
+    )
+
+
+@coalesce("polygon/options_snapshot")
+@perf.timed("market_data._fetch_chain_stats")
+def _fetch_chain_stats(ticker: str) -> ChainAggregator:
+    agg = ChainAggregator()
+    for i, page in enumerate(provider().snapshot_pages(ticker)):
+        if i == 0:
+            snapshot_store.put("options_page1", ticker, page)
+        with perf.timer("market_data.aggregate_page"):
+            f = _page_frame(page)
+            agg.add_page(page, f)
+            oi_history.observe(ticker, f)
+    return agg
+
+
+# ── Daily bars & IV rank ──────────────────────────────────────────────────────
+def prev_day(ticker: str) -> dict:
+    """Previous-session OHLCV for ticker.
+
+    Read from the market-wide grouped bars (one request per session for the
+    whole universe); tickers missing from them fall back to Polygon's
+    per-ticker /prev endpoint.
+    """
+    bar = previous_session().get(ticker)
+    if bar:
+        return bar
+    return _prev_day_single(ticker)
+
+
+@perf.cached("market_data.previous_session", ttl_cache(ttl=300))
+def previous_session() -> dict:
+    """Ticker → day bar for the last completed session, stepping back over weekends / holidays.
+
+    Every caller shares the one in-memory index (ttl_cache does not copy) —
+    treat it as read-only.
+    """
+    d = date.today()
+    for _ in range(5):
+        d -= timedelta(days=1)
+        bars = grouped_daily(trading_day(d))
+        if bars:
+            return bars
+    return {}
+
+
+@perf.cached("market_data._prev_day_single", ttl_cache(ttl=1800))
+def _prev_day_single(ticker: str) -> dict:
+    return snapshot_store.read_through("prev_day", ticker, 1800,
+                                       lambda: _fetch_prev_day(ticker))
+
+
+@coalesce("polygon/prev")
+@perf.timed("market_data._fetch_prev_day")
+def _fetch_prev_day(ticker: str) -> dict:
+    return provider().prev_day(ticker)
+
+
+@perf.cached("market_data.iv_rank", ttl_cache(ttl=3600))
+def iv_rank(ticker: str):
+    return snapshot_store.read_through("iv_rank", ticker, 3600,
+                                       lambda: _fetch_iv_rank(ticker),
+                                       valid=lambda v: v is not None)
+
+
+@coalesce("orats/ivrank")
+@perf.timed("market_data._fetch_iv_rank")
+def _fetch_iv_rank(ticker: str):
+    return provider().iv_rank(ticker)
+
+
+def grouped_daily(day: str) -> dict:
+    """Day bars for every US stock on `day` (ticker → bar) in one Polygon call.
+
+    A finished session's bars never change, so days before trading_day() are
+    kept for days (disk) / an hour (memory); only the current session's are
+    re-fetched every few minutes.
+    """
+    if day < trading_day():
+        return _grouped_daily_final(day)
+    return _grouped_daily_live(day)
+
+
+@perf.cached("market_data._grouped_daily_live", ttl_cache(ttl=300))
+def _grouped_daily_live(day: str) -> dict:
+    return snapshot_store.read_through("grouped_daily", day, 300,
+                                       lambda: _fetch_grouped_daily(day))
+
+
+# Separate kind: a "grouped_daily" entry saved while `day` was still trading is partial.
+# The shorter memory TTL bounds retries of days with no bars (holidays, failed fetches).
+@perf.cached("market_data._grouped_daily_final", ttl_cache(ttl=3600))
+def _grouped_daily_final(day: str) -> dict:
+    return snapshot_store.read_through("grouped_daily_final", day, 30 * 86400,
+                                       lambda: _fetch_grouped_daily(day))
+
+
+@coalesce("polygon/grouped_daily")
+@perf.timed("market_data._fetch_grouped_daily")
+def _fetch_grouped_daily(day: str) -> dict:
+    return provider().grouped_daily(day)
+
+
+# ── Option trade prints ───────────────────────────────────────────────────────
+PRINTS_MIN_VOL    = 200     # prefilter: smallest block the UOA rules alert on
+PRINTS_MIN_NEAR   = 300     # prefilter: near-term call volume of the sweep rule
+
+
+@perf.cached("market_data.contract_prints", ttl_cache(ttl=900))
+def contract_prints(contract: str, day: str) -> dict:
+    """trade_prints.summarize() of one option contract's trades on day ({} if unavailable)."""
+    return snapshot_store.read_through("prints", f"{contract}@{day}", 900,
+                                       lambda: _fetch_contract_prints(contract, day))
+
+
+@coalesce("polygon/trades")
+@perf.timed("market_data._fetch_contract_prints")
+def _fetch_contract_prints(contract: str, day: str) -> dict:
+    trades = provider().trades(contract, day)
+    return {} if trades is None else trade_prints.summarize(trades)
+
+
+def chain_prints(chain: "ChainAggregator") -> dict:
+    """{"call": summary, "put": summary} for the chain's most active call and put.
+
+    Only contracts that could trip a block or sweep rule are drilled into
+    (volume ≥ PRINTS_MIN_VOL, or for the call, near-term call volume ≥
+    PRINTS_MIN_NEAR); a side is missing if it was filtered out, its trades
+    couldn't be fetched or it had no prints, so the rules fall back to the snapshot.
+    """
+    near = chain.near_call_vol
+    out = {}
+    for ct in ("call", "put"):
+        vol = getattr(chain, f"max_{ct}_vol")
+        sym = ((getattr(chain, f"max_{ct}_opt") or {}).get("details") or {}).get("ticker")
+        if sym and (vol >= PRINTS_MIN_VOL or (ct == "call" and near >= PRINTS_MIN_NEAR)):
+            summary = contract_prints(sym, trading_day())
+            if summary.get("trades", 0) > 0:
+                out[ct] = summary
+    return out
+
+
+def expire_chain(ticker: str):
+    """Drop ticker's cached chain (memory and disk) so the next fetch goes to Polygon."""
+    chain_stats.clear(ticker)
+    snapshot_store.expire("chain", ticker)
+
+
+def clear_caches():
+    """Drop every in-memory cache in this module (e.g. after data_providers.set_provider).
+
+    snapshot_store keeps its entries; point APPLOVIN_CACHE_DIR elsewhere for a cold start.
+    """
+    for fn in (options_snapshot, chain_stats, _prev_day_single, previous_session,
+               iv_rank, _grouped_daily_live, _grouped_daily_final, contract_prints):
+        fn.clear()
+
+
+# ── Scan inputs ───────────────────────────────────────────────────────────────
+@perf.timed("market_data.scan_inputs")
+def scan_inputs(ticker: str):
+    """Fetch (chain, prev_day, iv_rank, prints) for ticker, or None if it can't be scored."""
+    chain = chain_stats(ticker)
+    if not chain.contracts:
+        return None
+    prev  = prev_day(ticker)
+    price = prev.get("c")
+    if not price or price <= 0:
+        return None
+    return chain, prev, iv_rank(ticker), chain_prints(chain)
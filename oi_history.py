@@ -0,0 +1,225 @@
+"""oi_history.py — Per-contract open-interest history and overnight OI deltas
+Every contract seen in an options snapshot is given a stable integer id (SQLite
+`contracts` registry: id → symbol, ticker, type, strike, expiry), assigned by SQLite
+so processes sharing the cache dir agree on them. Each trading day's
+OI is stored as one columnar .npz file of sorted uint32 ids + int32 OI — about 8 bytes
+per contract, so ~1M contracts/day stays in the single-digit MB range.
+observe() buffers OI from scan worker threads, flush() merges the buffer into today's
+file, and changes() diffs today against the previous stored day."""
+
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:        # Windows: only threads of this process are serialized
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from baselines import trading_day
+from snapshot_store import CACHE_DIR
+
+OI_DIR         = CACHE_DIR / "oi"
+DB_PATH        = CACHE_DIR / "oi_contracts.sqlite"
+RETENTION_DAYS = 30   # day files kept on disk
+
+_lock = threading.Lock()               # guards the registry, its connection and the OI buffer
+_file_lock = threading.Lock()          # with _day_files_locked(): one day-file merge at a time
+_conn: sqlite3.Connection | None = None
+_ids: dict[str, int] = {}              # symbol → id (registered contracts read so far)
+_meta: dict[str, list] = {"ticker": [], "type": [], "strike": [], "expiry": []}  # columns, index == id
+_meta_np: dict[str, np.ndarray] = {}   # array copy of _meta, rebuilt when it grows
+_buf_ids: list[np.ndarray] = []
+_buf_oi:  list[np.ndarray] = []
+_day_cache: dict[str, tuple[tuple, np.ndarray, np.ndarray]] = {}
+
+
+def _db() -> sqlite3.Connection:
+    """The registry connection (caller holds _lock, so one connection serves every thread)."""
+    global _conn
+    if _conn is None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        c = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None, check_same_thread=False)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        c.execute("""CREATE TABLE IF NOT EXISTS contracts (
+                        id     INTEGER PRIMARY KEY,
+                        symbol TEXT NOT NULL UNIQUE,
+                        ticker TEXT NOT NULL,
+                        type   TEXT NOT NULL,
+                        strike REAL NOT NULL,
+                        expiry TEXT NOT NULL)""")
+        _conn = c
+    return _conn
+
+
+def _sync_registry(c: sqlite3.Connection):
+    """Read contracts registered since the last sync, by any process (caller holds _lock)."""
+    for cid, sym, *row in c.execute(
+            "SELECT id, symbol, ticker, type, strike, expiry FROM contracts WHERE id >= ? ORDER BY id",
+            (len(_meta["ticker"]),)):
+        _ids[sym] = cid
+        while len(_meta["ticker"]) < cid:
+            _append_meta(("", "", 0.0, ""))
+        _append_meta(row)
+
+
+def _register(rows: list[tuple]):
+    """Give new (symbol, ticker, type, strike, expiry) rows ids (caller holds _lock).
+
+    SQLite assigns the ids inside one write transaction, so processes sharing
+    the cache dir never hand out the same id; a symbol another process got to
+    first keeps its id. The registry is then re-read to pick both kinds up.
+    """
+    c = _db()
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        c.executemany("INSERT OR IGNORE INTO contracts (symbol, ticker, type, strike, expiry) "
+                      "VALUES (?,?,?,?,?)", rows)
+        c.execute("COMMIT")
+    except BaseException:
+        c.execute("ROLLBACK")
+        raise
+    _sync_registry(c)
+
+
+def _append_meta(row):
+    for col, v in zip(("ticker", "type", "strike", "expiry"), row):
+        _meta[col].append(v)
+
+
+def observe(ticker: str, page: pd.DataFrame):
+    """Buffer OI for one snapshot page (columns symbol, type, strike, expiry, oi)."""
+    page = page[page["symbol"] != ""]
+    if page.empty:
+        return
+    syms = page["symbol"].tolist()
+    with _lock:
+        unknown = {}
+        for sym, ct, k, exp in zip(syms, page["type"].tolist(), page["strike"].tolist(),
+                                   page["expiry"].tolist()):
+            if sym not in _ids and sym not in unknown:
+                unknown[sym] = (sym, ticker, ct, float(k), exp)
+        if unknown:
+            _register(list(unknown.values()))
+        _buf_ids.append(np.fromiter((_ids[s] for s in syms), dtype=np.uint32, count=len(syms)))
+        _buf_oi.append(page["oi"].to_numpy(dtype=np.int32))
+
+
+def _day_path(day: str) -> Path:
+    return OI_DIR / f"{day}.npz"
+
+
+def _load_day(day: str) -> tuple[np.ndarray, np.ndarray]:
+    p = _day_path(day)
+    if not p.exists():
+        return np.empty(0, np.uint32), np.empty(0, np.int32)
+    st  = p.stat()
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)   # each save os.replace()s in a new file
+    hit = _day_cache.get(day)
+    if hit and hit[0] == key:
+        return hit[1], hit[2]
+    with np.load(p) as z:
+        ids, oi = z["ids"], z["oi"]
+    _day_cache[day] = (key, ids, oi)
+    return ids, oi
+
+
+def flush(day: str | None = None):
+    """Merge buffered OI into the day file (latest wins)."""
+    day = day or trading_day()
+    with _lock:
+        if not _buf_ids:
+            return
+        ids = np.concatenate(_buf_ids)
+        oi  = np.concatenate(_buf_oi)
+        _buf_ids.clear()
+        _buf_oi.clear()
+    with _day_files_locked():
+        old_ids, old_oi = _load_day(day)
+        # Newest observations first so np.unique keeps them over older ones
+        all_ids = np.concatenate([ids[::-1], old_ids])
+        all_oi  = np.concatenate([oi[::-1], old_oi])
+        uniq, first = np.unique(all_ids, return_index=True)
+        tmp = tempfile.NamedTemporaryFile(dir=OI_DIR, prefix=f".{day}.", suffix=".tmp", delete=False)
+        try:
+            with tmp:
+                np.savez_compressed(tmp, ids=uniq.astype(np.uint32), oi=all_oi[first].astype(np.int32))
+            os.replace(tmp.name, _day_path(day))
+        except BaseException:
+            Path(tmp.name).unlink(missing_ok=True)
+            raise
+        _prune()
+
+
+@contextmanager
+def _day_files_locked():
+    """Serialize day-file read-merge-writes across threads (_file_lock) and processes (flock)."""
+    OI_DIR.mkdir(parents=True, exist_ok=True)
+    with _file_lock, open(OI_DIR / ".lock", "a") as fh:
+        if fcntl:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        yield
+
+
+def _prune():
+    days = sorted(p for p in OI_DIR.glob("*.npz") if ".tmp" not in p.name)
+    for p in days[:-RETENTION_DAYS]:
+        p.unlink(missing_ok=True)
+
+
+def _previous_day(day: str) -> str | None:
+    days = sorted(p.stem for p in OI_DIR.glob("*.npz") if ".tmp" not in p.name and p.stem < day)
+    return days[-1] if days else None
+
+
+def changes(tickers, day: str | None = None) -> pd.DataFrame:
+    """Day-over-day OI change per contract for tickers.
+
+    Columns: ticker, type, strike, expiry, prev_oi, oi, change, is_new. Only
+    tickers present in the previous day's file are returned (others have no
+    history to diff against). Contracts new since then have prev_oi 0.
+    """
+    cols = ["ticker", "type", "strike", "expiry", "prev_oi", "oi", "change", "is_new"]
+    day  = day or trading_day()
+    prev_day = _previous_day(day)
+    if prev_day is None:
+        return pd.DataFrame(columns=cols)
+    cur_ids, cur_oi   = _load_day(day)
+    prev_ids, prev_oi = _load_day(prev_day)
+    if not len(cur_ids) or not len(prev_ids):
+        return pd.DataFrame(columns=cols)
+
+    with _lock:
+        _sync_registry(_db())
+        n = len(_meta["ticker"])
+        if len(_meta_np.get("ticker", ())) != n:
+            for col, vals in _meta.items():
+                _meta_np[col] = np.asarray(vals, dtype=object if col != "strike" else np.float64)
+        meta = dict(_meta_np)
+    cur_ids, cur_oi = cur_ids[cur_ids < n], cur_oi[cur_ids < n]
+    prev_ids, prev_oi = prev_ids[prev_ids < n], prev_oi[prev_ids < n]
+
+    # Keep only tickers that are wanted and were present the previous day
+    have_prev = np.intersect1d(np.asarray(list(tickers), dtype=object),
+                               np.unique(meta["ticker"][prev_ids]))
+    sel = np.isin(meta["ticker"][cur_ids], have_prev)
+    cur_ids, cur_oi = cur_ids[sel], cur_oi[sel]
+
+    last  = max(len(prev_ids) - 1, 0)
+    pos   = np.minimum(np.searchsorted(prev_ids, cur_ids), last)
+    found = prev_ids[pos] == cur_ids if len(prev_ids) else np.zeros(len(cur_ids), bool)
+    p_oi  = np.where(found, prev_oi[pos] if len(prev_ids) else 0, 0).astype(np.int64)
+
+    out = pd.DataFrame({col: meta[col][cur_ids] for col in ("ticker", "type", "strike", "expiry")})
+    out["prev_oi"] = p_oi
+    out["oi"]      = cur_oi.astype(np.int64)
+    out["change"]  = out["oi"] - out["prev_oi"]
+    out["is_new"]  = ~found
+    return out
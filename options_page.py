@@ -7,9 +7,13 @@ import streamlit.components.v1 as components
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-import requests
-import math
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
+
+import market_data
+import perf
+import scan_engine
+import trade_setups
+import uoa_rules
 
 # ── Design Tokens ────────────────────────────────────────────────────────────
 BLUE       = "#2563EB"
@@ -34,9 +38,6 @@ STAGE_EXPIRY = {
     "SURGE_PHASE": "45-60 days",
 }
 
-ORATS_KEY  = "306e5550-50f0-478a-b47d-477afa769d0a"
-POLYGON_KEY = "vzp2Q7xwgpv5g6rEl3Ewfp28fQlXsYqj"
-
 # ── GROWTH_UNIVERSE (200+ tickers for explorer) ─────────────────────────────
 # TOP_50 tickers merged at runtime
 GROWTH_UNIVERSE = {
@@ -170,58 +171,23 @@ def _iv_label_long(iv):
 
 
 # ── API Helpers ──────────────────────────────────────────────────────────────
-@st.cache_data(ttl=3600)
-def _fetch_iv_rank(ticker):
+@perf.cached("options_page._fetch_unusual_activity", st.cache_data(ttl=900))
+def _fetch_unusual_activity(tickers: tuple) -> set:
+    """Tickers whose shared options chain trips one of the UOA scanner's call-activity rules.
+
+    The chains are fetched in parallel on the scan engine's worker pool and
+    detected in one batch.
+    """
+    inputs = {t: x for t, x, _ in scan_engine.scan_stream(list(tickers), set(), {}, preview=False)
+              if x is not None}
     try:
-        r = requests.get("https://api.orats.io/datav2/hist/ivrank",
-                         params={"ticker": ticker, "token": ORATS_KEY}, timeout=5)
-        if r.status_code == 200:
-            data = r.json().get("data", [])
-            if data:
-                return data[0].get("ivRank")
+        alerts = uoa_rules.detect_batch(inputs, set(), {}, oi_deltas=False)
     except Exception:
-        pass
-    return None
-
+        return set()
+    return {a["ticker"] for a in alerts if a["alert_type"] in uoa_rules.CALL_ACTIVITY}
 
-@st.cache_data(ttl=900)
-def _fetch_unusual_activity(ticker):
-    """Check Polygon options snapshot for unusual call activity."""
-    try:
-        url = f"https://api.polygon.io/v3/snapshot/options/{ticker}?limit=20&apiKey={POLYGON_KEY}"
-        r = requests.get(url, timeout=5)
-        if r.status_code == 200:
-            results = r.json().get("results", [])
-            total_call_vol = 0
-            high_vol = 0
-            for opt in results:
-                day = opt.get("day", {})
-                vol = day.get("volume", 0)
-                details = opt.get("details", {})
-                if details.get("contract_type", "").lower() == "call":
-                    total_call_vol += vol
-                    if vol > 500:
-                        high_vol += 1
-            if high_vol > 0 or total_call_vol > 2000:
-                return True
-    except Exception:
-        pass
-    return False
-
-
-@st.cache_data(ttl=1800)
-def _fetch_polygon_price(ticker):
-    try:
-        url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/prev?apiKey={POLYGON_KEY}"
-        r = requests.get(url, timeout=5)
-        if r.status_code == 200 and r.json().get("results"):
-            return r.json()["results"][0]["c"]
-    except Exception:
-        pass
-    return None
 
-
-@st.cache_data
+@perf.cached("options_page._load", st.cache_data)
 def _load():
     from applovin_data import TOP_50_STOCKS, TOP_25_CONVICTION
     return TOP_50_STOCKS, TOP_25_CONVICTION
@@ -238,7 +204,7 @@ def _render_trade_card(s):
     sc = STAGE_COLORS.get(s.get("app_stage", ""), TEXT_GRAY)
     stage_name = s.get("app_stage", "N/A").replace("_", " ")
 
-    live_iv = _fetch_iv_rank(ticker)
+    live_iv = market_data.iv_rank(ticker)
     iv = live_iv if live_iv is not None else s.get("iv_rank", 45)
     ivc = _iv_color(iv)
 
@@ -287,17 +253,12 @@ def _render_trade_card(s):
         unsafe_allow_html=True)
 
     # ── EARNINGS WARNING (conditional) ──
-    try:
-        earn_dt = datetime.strptime(s.get("next_earnings_date", ""), "%Y-%m-%d").date()
-        exp_dt = datetime.strptime(call_expiry, "%Y-%m-%d").date()
-        if earn_dt < exp_dt:
-            st.markdown(f'''<div style="background:#FEF9C3;border:1px solid #FDE047;border-radius:8px;
-            padding:12px 16px;margin-bottom:12px;font-size:13px;color:{TEXT_DARK};">
-            ⚠️ Earnings on <b>{s["next_earnings_date"]}</b> falls inside your <b>{call_expiry}</b>
-            expiration window. Account for earnings volatility in your sizing.</div>''',
-            unsafe_allow_html=True)
-    except Exception:
-        pass
+    if trade_setups.earnings_in_window(s):
+        st.markdown(f'''<div style="background:#FEF9C3;border:1px solid #FDE047;border-radius:8px;
+        padding:12px 16px;margin-bottom:12px;font-size:13px;color:{TEXT_DARK};">
+        ⚠️ Earnings on <b>{s["next_earnings_date"]}</b> falls inside your <b>{call_expiry}</b>
+        expiration window. Account for earnings volatility in your sizing.</div>''',
+        unsafe_allow_html=True)
 
     # ── WHY IT'S BULLISH ──
     avg_surprise = np.mean(s.get("eps_surprise_pct", [0])) if s.get("eps_surprise_pct") else 0
@@ -344,24 +305,15 @@ TARGET:      <span class="tv-green" style="font-weight:700;">+{target:.0f}%</spa
     unsafe_allow_html=True)
 
     down_rows = []
-    for dp in range(1, 36):
-        new_p = current * (1 - dp / 100)
-        intrinsic_call = max(0.0, new_p - call_strike)
-        time_val_call = call_premium * max(0, 0.45 - (dp / 100) * 1.5)
-        call_val = round(intrinsic_call + time_val_call, 2)
-        spread_width = put_buy - put_sell
-        put_spread_val = round(min(spread_width, max(0.0, put_buy - new_p)), 2)
-        total_val = round(call_val + put_spread_val, 2)
-        pnl_per_share = round(total_val - total_deb, 2)
-        you_get_back = round(total_val * 100, 0)
+    for r in trade_setups.downside(s):
         down_rows.append({
-            "Stock Drops": f"-{dp}%",
-            "Stock Price": f"${new_p:.2f}",
-            "Call Value": f"${call_val:.2f}",
-            "Put Spread Value": f"${put_spread_val:.2f}",
-            "Total Position": f"${total_val:.2f}",
-            "P/L Per Share": f"${pnl_per_share:.2f}",
-            "You Get Back": f"${you_get_back:,.0f}",
+            "Stock Drops": f"{r['move_pct']}%",
+            "Stock Price": f"${r['price']:.2f}",
+            "Call Value": f"${r['call']:.2f}",
+            "Put Spread Value": f"${r['put_spread']:.2f}",
+            "Total Position": f"${r['total']:.2f}",
+            "P/L Per Share": f"${r['pnl']:.2f}",
+            "You Get Back": f"${r['back']:,.0f}",
         })
     st.dataframe(pd.DataFrame(down_rows), use_container_width=True, height=400)
 
@@ -371,50 +323,42 @@ TARGET:      <span class="tv-green" style="font-weight:700;">+{target:.0f}%</spa
     unsafe_allow_html=True)
 
     up_rows = []
-    for gp in [5, 10, 15, 20, 30, 50, 75, 100]:
-        new_p = current * (1 + gp / 100)
-        intrinsic_call = max(0.0, new_p - call_strike)
-        time_val_call = call_premium * 0.25
-        call_val = round(intrinsic_call + time_val_call, 2)
-        put_spread_val = round(max(0.0, put_cost * (1 - gp / 50)), 2)
-        total_val = round(call_val + put_spread_val, 2)
-        gross_profit = round(total_val - total_deb, 2)
-        return_pct = round((gross_profit / total_deb) * 100, 1) if total_deb > 0 else 0
+    for r in trade_setups.upside(s):
         up_rows.append({
-            "Stock Gains": f"+{gp}%",
-            "Stock Price": f"${new_p:.2f}",
-            "Call Value": f"${call_val:.2f}",
-            "Total Position": f"${total_val:.2f}",
-            "Gross Profit": f"${gross_profit:.2f}",
-            "Return on Premium": f"{return_pct:.1f}%",
+            "Stock Gains": f"+{r['move_pct']}%",
+            "Stock Price": f"${r['price']:.2f}",
+            "Call Value": f"${r['call']:.2f}",
+            "Total Position": f"${r['total']:.2f}",
+            "Gross Profit": f"${r['profit']:.2f}",
+            "Return on Premium": f"{r['return_pct']:.1f}%",
         })
     st.dataframe(pd.DataFrame(up_rows), use_container_width=True)
 
     # ── THETA NOTE ──
+    decay = trade_setups.theta(s)
+    net   = -trade_setups.greeks(s)["theta"]
     st.info(
-        f"**Time Decay (Theta):** At 45 DTE, this position loses approximately "
-        f"${call_premium*0.015:.3f}/day to time decay. This accelerates to "
-        f"~${call_premium*0.022:.3f}/day at 30 DTE and "
-        f"~${call_premium*0.035:.3f}/day at 15 DTE. "
-        "The bear put spread partially offsets theta since the short put collects premium."
+        f"**Time Decay (Theta):** At 45 DTE, the call loses approximately "
+        f"${decay[45]:.3f}/day to time decay. This accelerates to "
+        f"~${decay[30]:.3f}/day at 30 DTE and "
+        f"~${decay[15]:.3f}/day at 15 DTE. "
+        f"With the put spread (the short put collects premium), the whole position "
+        f"{'loses' if net >= 0 else 'gains'} ~${abs(net):.3f}/day today."
     )
 
     # ── P/L CHART ──
-    lo = current * 0.65
-    hi = current * 1.55
-    step = max(1, int(current * 0.01))
-    xs = list(range(int(lo), int(hi) + 1, step))
-    ys = []
-    for px in xs:
-        c_val = max(0, px - call_strike) - call_premium
-        p_val = (max(0, put_buy - px) - max(0, put_sell - px)) - put_cost
-        ys.append(round(c_val + p_val, 2))
+    xs, ys = trade_setups.pl_at_expiry(s)
+    _, now = trade_setups.pl_today(s)
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(
         x=xs, y=ys, mode="lines", line=dict(color=BLUE, width=3), name="P/L",
         hovertemplate="Price: $%{x:.0f}<br>P/L: $%{y:.2f}<extra></extra>",
     ))
+    fig.add_trace(go.Scatter(
+        x=xs, y=now, mode="lines", line=dict(color=TEXT_GRAY, width=2, dash="dash"), name="Today",
+        hovertemplate="Price: $%{x:.0f}<br>P/L today: $%{y:.2f}<extra></extra>",
+    ))
     fig.add_trace(go.Scatter(
         x=xs, y=[max(0, y) for y in ys],
         fill="tozeroy", fillcolor="rgba(22,163,74,0.15)", line=dict(width=0),
@@ -430,7 +374,7 @@ TARGET:      <span class="tv-green" style="font-weight:700;">+{target:.0f}%</spa
                   annotation_text=f"Current ${current:.0f}", annotation_position="top")
     fig.add_vline(x=breakeven, line_color=GREEN, line_dash="dot",
                   annotation_text=f"BE ${breakeven:.0f}", annotation_position="top")
-    fig.update_layout(height=300, title=f"{ticker} Position P/L at Expiry",
+    fig.update_layout(height=300, title=f"{ticker} Position P/L at Expiry (dashed: if the move happened today)",
                       xaxis_title="Stock Price", yaxis_title="P/L ($)", showlegend=False)
     st.plotly_chart(_white_chart(fig), use_container_width=True)
 
@@ -499,6 +443,7 @@ def render_options_page():
     # ═════════════════════════════════════════════════════════════════════════
     _section("Top 25 Conviction Rankings", "Ordered by combined APP score + options risk/reward")
 
+    unusual_tickers = _fetch_unusual_activity(tuple(item["ticker"] for item in top25))
     for item in top25:
         ticker = item["ticker"]
         s = next((x for x in stocks if x["ticker"] == ticker), None)
@@ -513,7 +458,7 @@ def render_options_page():
         avg_surprise = np.mean(s.get("eps_surprise_pct", [0])) if s.get("eps_surprise_pct") else 0
 
         # Unusual activity badge
-        unusual = _fetch_unusual_activity(ticker)
+        unusual = ticker in unusual_tickers
         badge_html = (' <span style="background:#DC2626;color:#FFF;font-size:10px;padding:2px 8px;'
                       'border-radius:12px;font-weight:700;">🔥 UNUSUAL CALL ACTIVITY</span>'
                       if unusual else "")
@@ -644,37 +589,15 @@ def render_options_page():
     if analyze and selected:
         ticker = selected
         with st.spinner(f"Analyzing {ticker}... fetching price, IV, options chain"):
-            # 1. Polygon current price
-            price = _fetch_polygon_price(ticker)
-
-            # 2. ORATS IV rank
-            iv_rank = _fetch_iv_rank(ticker)
-
-            # 3. Fallbacks
+            # Previous close and ORATS IV rank (Top 50 record as fallback), 45 DTE structure
             existing = next((x for x in stocks if x["ticker"] == ticker), None)
-            if price is None:
-                price = existing["price_current"] if existing else 100.0
-            if iv_rank is None:
-                iv_rank = existing["iv_rank"] if existing else 45.0
-
-            # Compute trade params (45 DTE)
-            target_expiry = date.today() + timedelta(days=45)
-            days_to_friday = (4 - target_expiry.weekday()) % 7
-            expiry_date = target_expiry + timedelta(days=days_to_friday)
-            expiry_str = expiry_date.strftime("%Y-%m-%d")
-
-            call_strike = round(price * 1.02 / 5) * 5
-            put_buy_strike = round(price * 0.93 / 5) * 5
-            put_sell_strike = round(price * 0.80 / 5) * 5
-
-            sigma = iv_rank / 100 * 0.8 + 0.2
-            t = 45 / 365
-            call_premium = round(price * sigma * math.sqrt(t) * 0.4, 2)
-            put_spread_cost = round((put_buy_strike - put_sell_strike) * 0.22, 2)
-            total_debit = round(call_premium + put_spread_cost, 2)
-            upside_breakeven = call_strike + total_debit
-            recovery_ratio = round((put_buy_strike - put_sell_strike) / total_debit, 1) if total_debit > 0 else 2.0
-            target_profit_pct = round(recovery_ratio * 25)
+            synth = trade_setups.live_setup(ticker, existing, GROWTH_UNIVERSE.get(ticker, ticker))
+            price, iv_rank = synth["price_current"], synth["iv_rank"]
+            call_strike     = synth["call_strike"]
+            put_buy_strike  = synth["put_buy_strike"]
+            put_sell_strike = synth["put_sell_strike"]
+            expiry_str      = synth["call_expiry"]
+            total_debit     = synth["total_debit"]
 
         # ── IV GAUGE (Plotly indicator) ──
         bar_color = GREEN if iv_rank < 30 else AMBER if iv_rank < 60 else RED
@@ -699,35 +622,7 @@ def render_options_page():
         st.plotly_chart(fig, use_container_width=True)
         st.markdown(f"**Options are {iv_lbl}** (IV Rank: {iv_rank:.0f})")
 
-        # Build synthetic stock dict and render full trade card
-        synth = {
-            "ticker": ticker,
-            "company_name": GROWTH_UNIVERSE.get(ticker, ticker),
-            "app_stage": existing["app_stage"] if existing else "MID_CONFIRMATION",
-            "app_score": existing["app_score"] if existing else 50,
-            "price_current": price,
-            "iv_rank": iv_rank,
-            "call_strike": call_strike,
-            "call_expiry": expiry_str,
-            "call_premium": call_premium,
-            "put_buy_strike": put_buy_strike,
-            "put_sell_strike": put_sell_strike,
-            "put_spread_expiry": expiry_str,
-            "put_spread_cost": put_spread_cost,
-            "total_debit": total_debit,
-            "max_loss": total_debit,
-            "upside_breakeven": upside_breakeven,
-            "target_profit_pct": target_profit_pct,
-            "recovery_ratio": recovery_ratio,
-            "plain_english_summary": existing["plain_english_summary"] if existing else f"{ticker} selected for analysis.",
-            "eps_beats_gt15pct": existing.get("eps_beats_gt15pct", 0) if existing else 0,
-            "eps_surprise_pct": existing.get("eps_surprise_pct", []) if existing else [],
-            "axon_equivalent": existing.get("axon_equivalent", "core product") if existing else "core product",
-            "tam_expansion": existing.get("tam_expansion", "new markets") if existing else "new markets",
-            "next_earnings_date": existing.get("next_earnings_date", "") if existing else "",
-            "options_rationale": existing.get("options_rationale", "") if existing else "",
-            "caution_flags": existing.get("caution_flags", []) if existing else [],
-        }
+        # Full trade card for the synthesized setup
         _render_trade_card(synth)
 
         # ── 4-PANEL TRADINGVIEW CHARTS ──
@@ -0,0 +1,179 @@
+"""perf.py — Opt-in timers, counters and cache hit rates for scans and page renders
+Off unless APPLOVIN_PERF=1 (or enable() is called). When off, timer() hands back a
+shared no-op context manager and the decorators go straight to the wrapped call, so
+instrumented code pays one flag check. When on, every named timer feeds a log-bucket
+histogram (count, total, max and p50/p95/p99 estimates), counters accumulate, and
+cached() counts calls vs. misses of cached functions (st.cache_* or ttl_cache).
+snapshot() + since() give per-run deltas; report() summarises, dump() writes JSON.
+No Streamlit import, so the headless scan paths can use it too."""
+
+import contextlib
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("APPLOVIN_PERF", "") not in ("", "0")
+
+_BASE     = 1e-5   # upper bound of bucket 0: 10 µs; each next bucket doubles
+_NBUCKETS = 28     # last bucket is ≥ ~22 minutes
+
+_lock = threading.Lock()
+_hists: dict[str, list] = {}       # name → [count, total, max, buckets]
+_counters: dict[str, int] = {}
+_NOOP = contextlib.nullcontext()
+
+
+def enable(on: bool = True):
+    global ENABLED
+    ENABLED = bool(on)
+
+
+def reset():
+    with _lock:
+        _hists.clear()
+        _counters.clear()
+
+
+def observe(name: str, seconds: float):
+    """Record one duration under name."""
+    b = 0 if seconds <= _BASE else min(_NBUCKETS - 1, math.ceil(math.log2(seconds / _BASE)))
+    with _lock:
+        h = _hists.get(name)
+        if h is None:
+            h = _hists[name] = [0, 0.0, 0.0, [0] * _NBUCKETS]
+        h[0] += 1
+        h[1] += seconds
+        h[2]  = max(h[2], seconds)
+        h[3][b] += 1
+
+
+def count(name: str, n: int = 1):
+    if ENABLED:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+class _Timer:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+def timer(name: str):
+    """Context manager timing its block under name (a no-op while disabled)."""
+    return _Timer(name) if ENABLED else _NOOP
+
+
+def timed(name: str):
+    """Decorator: time every call of the function under name."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - t0)
+        return inner
+    return wrap
+
+
+def cached(name: str, cache):
+    """Decorator: apply `cache` (e.g. st.cache_data(ttl=900) or ttl_cache(ttl=900)) and count its hits and misses.
+
+    Calls are counted outside the cache and misses inside it (the function
+    body only runs on a miss), as cache.<name>.calls / cache.<name>.misses.
+    The result keeps the cache's .clear().
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            count(f"cache.{name}.misses")
+            return fn(*args, **kwargs)
+
+        cached_fn = cache(body)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            count(f"cache.{name}.calls")
+            return cached_fn(*args, **kwargs)
+
+        call.clear = cached_fn.clear
+        return call
+    return wrap
+
+
+# ── Reading the numbers ───────────────────────────────────────────────────────
+def snapshot() -> dict:
+    """Copy of everything recorded so far."""
+    with _lock:
+        return {"timers":   {k: [h[0], h[1], h[2], list(h[3])] for k, h in _hists.items()},
+                "counters": dict(_counters)}
+
+
+def since(before: dict) -> dict:
+    """What was recorded after the `before` snapshot (max is over the whole period)."""
+    now, old = snapshot(), before["timers"]
+    timers = {}
+    for k, (n, total, mx, buckets) in now["timers"].items():
+        o = old.get(k, [0, 0.0, 0.0, [0] * _NBUCKETS])
+        if n > o[0]:
+            timers[k] = [n - o[0], total - o[1], mx, [a - b for a, b in zip(buckets, o[3])]]
+    counters = {k: v - before["counters"].get(k, 0) for k, v in now["counters"].items()
+                if v != before["counters"].get(k, 0)}
+    return {"timers": timers, "counters": counters}
+
+
+def _quantile(buckets: list, n: int, q: float) -> float:
+    """Upper bound (seconds) of the bucket holding the q-quantile."""
+    seen, target = 0, q * n
+    for i, c in enumerate(buckets):
+        seen += c
+        if seen >= target:
+            return _BASE * 2 ** i
+    return _BASE * 2 ** (len(buckets) - 1)
+
+
+def report(snap: dict | None = None) -> dict:
+    """Summary of snap (default: everything so far): timers in ms, counters, cache hit rates."""
+    snap = snap or snapshot()
+    timers = {}
+    for k, (n, total, mx, buckets) in sorted(snap["timers"].items()):
+        timers[k] = {
+            "count":    n,
+            "total_s":  round(total, 4),
+            "mean_ms":  round(total / n * 1000, 3) if n else 0.0,
+            "p50_ms":   round(min(mx, _quantile(buckets, n, 0.50)) * 1000, 3),
+            "p95_ms":   round(min(mx, _quantile(buckets, n, 0.95)) * 1000, 3),
+            "p99_ms":   round(min(mx, _quantile(buckets, n, 0.99)) * 1000, 3),
+            "max_ms":   round(mx * 1000, 3),
+        }
+    counters = {k: v for k, v in sorted(snap["counters"].items()) if not k.startswith("cache.")}
+    caches = {}
+    for k, calls in sorted(snap["counters"].items()):
+        if k.startswith("cache.") and k.endswith(".calls"):
+            name   = k[len("cache."):-len(".calls")]
+            misses = snap["counters"].get(f"cache.{name}.misses", 0)
+            caches[name] = {"calls": calls, "hits": calls - misses, "misses": misses,
+                            "hit_rate": round((calls - misses) / calls, 3) if calls else None}
+    return {"timers": timers, "counters": counters, "caches": caches}
+
+
+def dump(path, snap: dict | None = None):
+    """Write report(snap) as JSON to path."""
+    with open(path, "w") as f:
+        json.dump(report(snap), f, indent=2)
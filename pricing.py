@@ -0,0 +1,141 @@
+"""pricing.py — Vectorized Black-Scholes-Merton prices, Greeks and implied vol
+Every argument is a scalar or a NumPy array and they broadcast together, so a whole
+grid (stocks × scenario moves × price points) is priced in one call of array ops.
+Times are in years, rates and vols annualised and continuously compounded; q is
+the dividend yield. `call` is a bool or a bool array (False = put).
+
+Degenerate inputs — expired (T ≤ 0), zero vol, zero strike or spot — get the
+discounted intrinsic value, a step delta and zero gamma, vega, theta and rho.
+No SciPy: the normal CDF is the Abramowitz & Stegun polynomial (absolute error
+< 7.5e-8), well inside a cent at option prices."""
+
+import numpy as np
+
+DAYS_PER_YEAR = 365
+
+_SQRT_2PI = np.sqrt(2.0 * np.pi)
+_P        = 0.2316419                                       # A&S 26.2.17
+_B        = (1.330274429, -1.821255978, 1.781477937, -0.356563782, 0.319381530)
+
+
+# ── Normal distribution ───────────────────────────────────────────────────────
+# Large grids are bound by array allocation, not arithmetic, so these work in place.
+def norm_pdf(x) -> np.ndarray:
+    x = np.asarray(x, dtype=float)
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def norm_cdf(x) -> np.ndarray:
+    """Standard normal CDF (Abramowitz & Stegun 26.2.17, absolute error < 7.5e-8)."""
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x, out=np.empty(x.shape))            # 0-d arrays too, so the ops below stay in place
+    t = np.multiply(z, _P, out=np.empty(x.shape))
+    t += 1.0
+    np.reciprocal(t, out=t)
+    r = np.full_like(t, _B[0])
+    for b in _B[1:]:
+        r *= t
+        r += b
+    r *= t
+    z *= z
+    z *= -0.5
+    np.exp(z, out=z)
+    z /= _SQRT_2PI
+    r *= z                                          # upper tail at |x|
+    np.subtract(1.0, r, out=r, where=x >= 0)
+    return r
+
+
+# ── Black-Scholes-Merton ──────────────────────────────────────────────────────
+def _setup(S, K, T, sigma, r, q, call):
+    """Broadcast inputs, with dead cells (see module doc) made finite, plus d1, d2 and discounts."""
+    S, K, T, sigma, r, q = (np.asarray(a, dtype=float) for a in (S, K, T, sigma, r, q))
+    live = (T > 0) & (sigma > 0) & (K > 0) & (S > 0)
+    if not live.all():
+        T, sigma = np.where(live, T, 1.0), np.where(live, sigma, 1.0)
+        S, K     = np.where(live, S, 1.0), np.where(live, K, 1.0)
+    sign  = np.where(call, 1.0, -1.0)
+    shape = np.broadcast_shapes(*(a.shape for a in (S, K, T, sigma, r, q, sign)))
+    sqrtT = np.sqrt(T)
+    vol   = sigma * sqrtT
+    d1    = np.divide(S, K, out=np.empty(shape))
+    np.log(d1, out=d1)
+    d1 += (r - q) * T
+    d1 /= vol
+    d1 += 0.5 * vol
+    return S, K, T, sigma, r, q, sign, live, sqrtT, d1, d1 - vol, np.exp(-q * T), np.exp(-r * T)
+
+
+def _intrinsic(S, K, T, r, q, sign):
+    """Discounted intrinsic value of the forward, for the dead cells."""
+    Tc = np.maximum(T, 0.0)
+    return np.maximum(sign * (S * np.exp(-q * Tc) - K * np.exp(-r * Tc)), 0.0)
+
+
+def price(S, K, T, sigma, r=0.0, q=0.0, call=True) -> np.ndarray:
+    """Option value per share."""
+    S0, K0, T0 = S, K, T
+    S, K, T, sigma, r, q, sign, live, _, d1, d2, dq, dr = _setup(S, K, T, sigma, r, q, call)
+    d1 *= sign
+    d2 *= sign
+    value = norm_cdf(d1)
+    value *= S * dq
+    n2 = norm_cdf(d2)
+    n2 *= K * dr
+    value -= n2
+    value *= sign
+    if live.all():
+        return value
+    return np.where(live, value, _intrinsic(np.asarray(S0, float), np.asarray(K0, float),
+                                            np.asarray(T0, float), r, q, sign))
+
+
+def greeks(S, K, T, sigma, r=0.0, q=0.0, call=True) -> dict:
+    """{"price", "delta", "gamma", "vega", "theta", "rho"} as arrays.
+
+    vega and rho are per 1.00 (100 points) of vol / rate, theta per year;
+    divide by 100 and DAYS_PER_YEAR for the per-point / per-day figures.
+    """
+    S0, K0, T0 = (np.asarray(a, dtype=float) for a in (S, K, T))
+    S, K, T, sigma, r, q, sign, live, sqrtT, d1, d2, dq, dr = _setup(S, K, T, sigma, r, q, call)
+    nd1, nd2 = norm_cdf(sign * d1), norm_cdf(sign * d2)
+    pdf      = norm_pdf(d1)
+    out = {
+        "price": sign * (S * dq * nd1 - K * dr * nd2),
+        "delta": sign * dq * nd1,
+        "gamma": dq * pdf / (S * sigma * sqrtT),
+        "vega":  S * dq * pdf * sqrtT,
+        "theta": -S * dq * pdf * sigma / (2 * sqrtT) - sign * r * K * dr * nd2 + sign * q * S * dq * nd1,
+        "rho":   sign * K * T * dr * nd2,
+    }
+    if not live.all():
+        value = _intrinsic(S0, K0, T0, r, q, sign)
+        out = {k: np.where(live, v, 0.0) for k, v in out.items()}
+        out["price"] = np.where(live, out["price"], value)
+        out["delta"] = np.where(live, out["delta"], np.where(value > 0, sign * np.exp(-q * np.maximum(T0, 0.0)), 0.0))
+    return out
+
+
+def implied_vol(value, S, K, T, r=0.0, q=0.0, call=True, lo: float = 1e-4, hi: float = 5.0,
+                tol: float = 1e-6, iterations: int = 50) -> np.ndarray:
+    """Volatility at which price() matches value; NaN where no vol in [lo, hi] does.
+
+    Newton steps on vega, falling back to bisection of the bracket whenever a
+    step would leave it, so each cell converges in a handful of iterations.
+    """
+    value = np.asarray(value, dtype=float)
+    p_lo, p_hi = price(S, K, T, lo, r, q, call), price(S, K, T, hi, r, q, call)
+    ok    = (p_lo <= value) & (value <= p_hi) & (np.asarray(T) > 0)
+    shape = np.broadcast_shapes(value.shape, ok.shape)
+    a, b  = np.full(shape, lo), np.full(shape, hi)
+    sigma = np.full(shape, 0.5)
+    for _ in range(iterations):
+        g    = greeks(S, K, T, sigma, r, q, call)
+        diff = g["price"] - value
+        if np.all(~ok | (np.abs(diff) < tol)):
+            break
+        a, b = np.where(diff < 0, sigma, a), np.where(diff < 0, b, sigma)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = sigma - diff / g["vega"]
+        sigma = np.where((step > a) & (step < b), step, 0.5 * (a + b))
+    return np.where(ok, sigma, np.nan)
@@ -0,0 +1,259 @@
+"""scan_benchmark.py — Offline UOA scan benchmark over recorded market data
+Runs the scanner's Quick and Full scans against a data_providers.ReplayProvider
+directory and reports tickers/sec, p50/p95 per-ticker fetch latency, peak RSS and
+alert count. Every scan starts cold (memory caches and snapshot store cleared), in
+a throwaway APPLOVIN_CACHE_DIR. With --baseline it is a regression gate: exit 1 if
+throughput or p95 latency is worse than the baseline run by more than --tolerance.
+
+    python scan_benchmark.py record DIR [--tickers N]     # live APIs → DIR
+    python scan_benchmark.py synth  DIR [--tickers N]     # deterministic synthetic DIR
+    python scan_benchmark.py run    DIR [--latency S] [--error-rate P] [--workers N]
+                                        [--scans quick,full] [--json OUT] [--perf]
+                                        [--baseline OLD.json] [--tolerance 0.2]
+
+--perf turns on perf.py instrumentation and adds each scan's per-stage timings and
+cache hit rates to the --json report."""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import zlib
+from datetime import date, timedelta
+from pathlib import Path
+
+# Keep benchmark state out of the app's cache (read by snapshot_store at import)
+os.environ.setdefault("APPLOVIN_CACHE_DIR", tempfile.mkdtemp(prefix="uoa-bench-"))
+
+import numpy as np
+
+import data_providers
+import market_data
+import perf
+import scan_engine
+import snapshot_store
+from baselines import trading_day
+
+
+def _peak_rss_mb() -> float:
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kb / 1024 if sys.platform != "darwin" else kb / 1024 / 1024
+
+
+def _universe(root: Path) -> list:
+    have = {p.stem for p in (root / "options").glob("*.json")}
+    return [t for t in scan_engine.SCAN_UNIVERSE if t in have] + sorted(have - set(scan_engine.SCAN_UNIVERSE))
+
+
+# ── record / synth ────────────────────────────────────────────────────────────
+def record(root: Path, n: int, workers: int):
+    """Run a live scan of the first n universe tickers, saving every response under root."""
+    data_providers.set_provider(data_providers.RecordingProvider(data_providers.PolygonOratsProvider(), root))
+    market_data.clear_caches()
+    market_data.previous_session()
+    _, scanned, _ = scan_engine.run_scan(scan_engine.SCAN_UNIVERSE[:n], set(), {}, workers=workers)
+    print(f"recorded {len(scanned)} tickers to {root}")
+
+
+def _synth_chain(ticker: str, rnd: random.Random, price: float) -> list:
+    today, chain = date.today(), []
+    for i in range(rnd.randint(200, 2400)):
+        ct = "call" if rnd.random() < 0.55 else "put"
+        strike = round(price * rnd.uniform(0.6, 1.4) / 5) * 5 or 5.0
+        expiry = (today + timedelta(days=rnd.choice([2, 9, 16, 30, 45, 90, 180, 365]))).isoformat()
+        chain.append({
+            "details": {"ticker": f"O:{ticker}{expiry.replace('-', '')[2:]}{ct[0].upper()}{int(strike * 1000):08d}{i}",
+                        "contract_type": ct, "strike_price": float(strike), "expiration_date": expiry},
+            "day": {"volume": int(rnd.paretovariate(1.3) * 20) if rnd.random() < 0.6 else 0},
+            "open_interest": int(rnd.paretovariate(1.2) * 100),
+            "implied_volatility": rnd.uniform(0.2, 1.2),
+            "greeks": {"delta": rnd.uniform(-1, 1)},
+        })
+    return chain
+
+
+def _synth_trades(volume: int, rnd: random.Random) -> list:
+    """Prints adding up to volume: mostly singles, sometimes a multi-exchange burst or a block."""
+    trades, t, left = [], 34_200 * 10**9, volume
+    while left > 0:
+        t += int(rnd.expovariate(1 / 30) * 10**9)
+        kind = rnd.random()
+        if kind < 0.05 and left >= 100:           # sweep burst
+            for ex in rnd.sample(range(1, 16), rnd.randint(3, 6)):
+                size = min(left, rnd.randint(20, 80))
+                trades.append({"sip_timestamp": t, "size": size, "price": 2.0, "exchange": ex})
+                left -= size
+                t += rnd.randint(1, 5) * 10**6
+        else:
+            size = min(left, rnd.randint(200, 900) if kind < 0.08 else rnd.randint(1, 20))
+            trades.append({"sip_timestamp": t, "size": size, "price": 2.0, "exchange": rnd.randint(1, 15)})
+            left -= size
+    return trades
+
+
+def synth(root: Path, n: int):
+    """Write deterministic synthetic fixtures for the first n universe tickers."""
+    def save(kind, key, value):
+        path = root / kind / f"{key}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(value, separators=(",", ":")))
+
+    grouped = {}
+    for ticker in scan_engine.SCAN_UNIVERSE[:n]:
+        rnd   = random.Random(zlib.crc32(ticker.encode()))
+        price = round(rnd.uniform(10, 600), 2)
+        bar   = {"T": ticker, "c": price, "o": price, "h": price, "l": price,
+                 "v": int(rnd.paretovariate(1.1) * 500_000)}
+        chain = _synth_chain(ticker, rnd, price)
+        save("options", ticker, chain)
+        save("prev", ticker, bar)
+        save("ivrank", ticker, round(rnd.uniform(5, 99), 1))
+        grouped[ticker] = bar
+        for ct in ("call", "put"):
+            side = [c for c in chain if c["details"]["contract_type"] == ct]
+            if side:
+                top = max(side, key=lambda c: c["day"]["volume"])
+                save("trades", top["details"]["ticker"], _synth_trades(top["day"]["volume"], rnd))
+    d = date.today()
+    for _ in range(5):
+        d -= timedelta(days=1)
+        save("grouped", trading_day(d), grouped)
+    print(f"wrote synthetic fixtures for {len(grouped)} tickers to {root}")
+
+
+# ── run ───────────────────────────────────────────────────────────────────────
+def _one_scan(name: str, tickers: list, top50: set, workers: int, replay) -> dict:
+    market_data.clear_caches()
+    snapshot_store.clear()
+    perf.reset()
+    calls0, errors0 = replay.calls, replay.errors
+    latencies: list[float] = []
+    fetch = market_data.scan_inputs
+
+    def timed(ticker):
+        t0 = time.perf_counter()
+        try:
+            return fetch(ticker)
+        finally:
+            latencies.append(time.perf_counter() - t0)
+
+    market_data.scan_inputs = timed
+    try:
+        t0 = time.perf_counter()
+        alerts, scanned, failed = scan_engine.run_scan(tickers, top50, {}, workers=workers)
+        elapsed = time.perf_counter() - t0
+    finally:
+        market_data.scan_inputs = fetch
+    lat = np.array(latencies or [0.0]) * 1000
+    return {
+        "scan":            name,
+        "tickers":         len(scanned),
+        "failed":          len(failed),
+        "seconds":         round(elapsed, 3),
+        "tickers_per_sec": round((len(scanned) + len(failed)) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms":          round(float(np.percentile(lat, 50)), 2),
+        "p95_ms":          round(float(np.percentile(lat, 95)), 2),
+        "alerts":          len(alerts),
+        "provider_calls":  replay.calls - calls0,
+        "injected_errors": replay.errors - errors0,
+        "peak_rss_mb":     round(_peak_rss_mb(), 1),
+    }
+
+
+def run(args) -> int:
+    root   = Path(args.dir)
+    replay = data_providers.ReplayProvider(root, args.latency, args.error_rate, args.seed)
+    data_providers.set_provider(replay)
+    universe = _universe(root)
+    if not universe:
+        print(f"no fixtures under {root}/options", file=sys.stderr)
+        return 2
+    market_data.clear_caches()
+    top50 = scan_engine.top50_tickers() & set(universe)
+    plan  = scan_engine.scan_plan(universe, top50, {}, scan_engine.prev_session_volumes())
+    scans = {"quick": plan[:scan_engine.QUICK_SCAN_N], "full": plan}
+
+    perf.enable(args.perf)
+    results, timings = [], {}
+    for name in args.scans.split(","):
+        if name in scans:
+            results.append(_one_scan(name, scans[name], top50, args.workers, replay))
+            if args.perf:
+                timings[name] = perf.report()
+    cols = list(results[0]) if results else []
+    print("  ".join(f"{c:>15}" for c in cols))
+    for r in results:
+        print("  ".join(f"{r[c]!s:>15}" for c in cols))
+
+    report = {"latency": args.latency, "error_rate": args.error_rate, "workers": args.workers,
+              "results": results}
+    if args.perf:
+        report["perf"] = timings
+        for name, rep in timings.items():
+            top = sorted(rep["timers"].items(), key=lambda kv: -kv[1]["total_s"])[:8]
+            print(f"\n{name}: slowest stages (total s / p95 ms)")
+            for k, v in top:
+                print(f"  {k:<40} {v['total_s']:>9.3f} {v['p95_ms']:>10.2f}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        return _compare(json.loads(Path(args.baseline).read_text()), report, args.tolerance)
+    return 0
+
+
+def _compare(base: dict, new: dict, tolerance: float) -> int:
+    """Print regressions against a baseline report; 1 if any, else 0."""
+    old, failed = {r["scan"]: r for r in base["results"]}, False
+    for r in new["results"]:
+        b = old.get(r["scan"])
+        if b is None:
+            continue
+        problems = []
+        if r["tickers_per_sec"] < b["tickers_per_sec"] * (1 - tolerance):
+            problems.append(f"tickers/sec {b['tickers_per_sec']} → {r['tickers_per_sec']}")
+        if r["p95_ms"] > b["p95_ms"] * (1 + tolerance):
+            problems.append(f"p95 {b['p95_ms']} ms → {r['p95_ms']} ms")
+        if r["alerts"] != b["alerts"] and not (base["error_rate"] or new["error_rate"]):
+            problems.append(f"alerts {b['alerts']} → {r['alerts']}")
+        for p in problems:
+            print(f"REGRESSION [{r['scan']}] {p}")
+        failed |= bool(problems)
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    ap  = argparse.ArgumentParser(description="Offline UOA scan benchmark")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name in ("record", "synth"):
+        p = sub.add_parser(name)
+        p.add_argument("dir")
+        p.add_argument("--tickers", type=int, default=len(scan_engine.SCAN_UNIVERSE))
+        p.add_argument("--workers", type=int, default=scan_engine.SCAN_WORKERS)
+    p = sub.add_parser("run")
+    p.add_argument("dir")
+    p.add_argument("--latency", type=float, default=0.0, help="mean injected seconds per fetch")
+    p.add_argument("--error-rate", type=float, default=0.0, help="fraction of fetches that fail")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--workers", type=int, default=scan_engine.SCAN_WORKERS)
+    p.add_argument("--scans", default="quick,full")
+    p.add_argument("--json")
+    p.add_argument("--perf", action="store_true", help="include per-stage timings (perf.py)")
+    p.add_argument("--baseline")
+    p.add_argument("--tolerance", type=float, default=0.2)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "record":
+        record(Path(args.dir), args.tickers, args.workers)
+        return 0
+    if args.cmd == "synth":
+        synth(Path(args.dir), args.tickers)
+        return 0
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,522 @@
+"""scan_engine.py — Headless UOA scanner shared by the Streamlit page and the CLI
+The scan universe, planning (Top 50 → near earnings → previous-day volume), the
+bounded-pool fetch, batch detection and incremental-rescan helpers, with no
+Streamlit or Plotly import: unusual_activity_page drives it through the scan
+scheduler and reads the results, and cron jobs or worker boxes run it directly.
+
+    python scan_engine.py [--scan full|quick|timed] [--universe FILE] [--workers N]
+                          [--budget S] [--out alerts.jsonl|alerts.parquet]
+                          [--no-history] [--publish] [--quiet]
+
+FILE lists tickers separated by whitespace or commas (# starts a comment). Alerts
+go to --out as JSON lines, or Parquet for a .parquet path; a one-line JSON stats
+summary goes to stdout, and the exit status is 1 if no ticker could be scanned.
+--publish stores the result as the latest scan of its kind, where the page's
+scheduler (after a restart) and api_server pick it up."""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from pathlib import Path
+
+import alert_history
+import baselines
+import market_data
+import perf
+import snapshot_store
+import uoa_rules
+from http_client import net_stats
+
+
+# Tickers fetched in parallel during a scan (each ticker = 3 API round trips)
+SCAN_WORKERS = 16
+
+# Incremental rescans: a ticker is re-fetched once its data is older than the
+# chain cache TTL, or sooner if its stock day volume moved by RESCAN_VOL_CHANGE
+RESCAN_STALE_AFTER = 900
+RESCAN_VOL_CHANGE  = 0.05
+
+# Preview alerts streamed to a feed during a scan are detected in batches, at most
+# once per FEED_INTERVAL seconds, rather than once per ticker
+FEED_INTERVAL = 1.0
+
+# Scan planning: tickers are scanned Top 50 first, then those reporting within
+# EARNINGS_NEAR_DAYS, then by previous-day stock volume. Quick Scan takes the best
+# QUICK_SCAN_N of that order; the timed scan stops after SCAN_BUDGET seconds.
+QUICK_SCAN_N       = 100
+EARNINGS_NEAR_DAYS = 14
+SCAN_BUDGET        = 60
+
+# Background scans (scan_scheduler.py) in the Streamlit server or api_server: seconds
+# between runs. APPLOVIN_SCHEDULED_SCANS=0 keeps only the on-demand runs.
+SCAN_SCHEDULE = {"quick": 300, "full": 900, "timed": None}
+if os.environ.get("APPLOVIN_SCHEDULED_SCANS", "1") == "0":
+    SCAN_SCHEDULE = {"quick": None, "full": None, "timed": None}
+
+# ── Full scan universe: S&P 500 + NASDAQ 100 + high-volume NYSE ───────────────
+SCAN_UNIVERSE = [
+    # Mega-cap tech
+    "AAPL","MSFT","NVDA","AMZN","GOOGL","GOOG","META","TSLA","AVGO","ORCL",
+    # Semis / hardware
+    "AMD","QCOM","MU","INTC","TXN","MCHP","SWKS","QRVO","MPWR","ENTG",
+    "ONTO","MKSI","COHR","CIEN","LRCX","AMAT","KLAC","SNPS","CDNS","ANSS",
+    # Software / cloud
+    "ADBE","CRM","NOW","INTU","PANW","FTNT","ZS","CRWD","NET","DDOG",
+    "HUBS","OKTA","DOCU","ZM","TWLO","TEAM","GTLB","PATH","ASAN","IOT",
+    "S","TENB","QLYS","VRNS","CYBR","DT","ESTC","NEWR","SUMO","PCOR",
+    "SNOW","PLTR","AI","BBAI","APP","TTD","MGNI","PUBM","DSP","APPS",
+    # Fintech / payments
+    "V","MA","PYPL","SQ","AFRM","SOFI","LC","ALLY","NU","STNE",
+    "HOOD","COIN","UPST","OPEN","GLBE","DLO","WEX","FLYW","TOST","FOUR",
+    # Large-cap financials
+    "JPM","BAC","WFC","GS","MS","BLK","C","AXP","SCHW","COF",
+    "BX","KKR","APO","ARES","CG","BAM","MCD","NDAQ","ICE","CME",
+    "SPGI","MCO","MSCI","FDS","MORN",
+    # Healthcare / biotech
+    "LLY","UNH","JNJ","PFE","MRK","ABBV","BMY","AMGN","GILD","REGN",
+    "VRTX","MRNA","ISRG","DXCM","ILMN","IDXX","SYK","MDT","ABT","TMO",
+    "DHR","BRKR","WAT","MTD","A","ALNY","BIIB","RARE","BMRN","HZNP",
+    # Consumer / retail
+    "WMT","COST","HD","LOW","TGT","SBUX","MCD","CMG","DPZ","WING",
+    "SHAK","BROS","NKE","LULU","DECK","SKX","TPR","CROX","CELH","MNST",
+    "ETSY","W","CHWY","BABA","JD","PDD","SE","GRAB","CPNG","MELI",
+    "SHOP","ETSY","AMZN","EBAY","WISH","POSH",
+    # Communication / media
+    "NFLX","DIS","SPOT","ROKU","SNAP","PINS","MTCH","WBD","PARA","FOXA",
+    # Energy
+    "XOM","CVX","COP","DVN","EOG","PXD","OXY","HAL","SLB","BKR",
+    # Industrials
+    "CAT","DE","HON","GE","BA","LMT","RTX","GD","NOC","LHX",
+    "ETN","EMR","ROK","PH","ITW","DOV","XYL","OTIS","CARR","ROP","UNP","CSX",
+    # Travel / leisure / gaming
+    "BKNG","ABNB","EXPE","LYFT","UBER","DKNG","PENN","WYNN","LVS","MGM","CZR",
+    "DAL","UAL","AAL","LUV","JBLU","CCL","RCL","NCLH",
+    # EV / auto
+    "TSLA","RIVN","LCID","NIO","XPEV","LI","F","GM",
+    # Crypto / digital assets
+    "MSTR","RIOT","CLSK","MARA","HUT","CIFR","CORZ","COIN",
+    # Utilities / REITs (high options vol)
+    "NEE","DUK","SO","D","PCG","AMT","PLD","CCI","EQIX","VICI",
+    # High-vol ETFs (must scan)
+    "SPY","QQQ","IWM","GLD","SLV","TLT","HYG","LQD",
+    "XLF","XLK","XLE","XLV","XLY","XLI","XLP","XLB","XLRE",
+    "VXX","UVXY","SQQQ","TQQQ","SPXU","UPRO","LABU","LABD",
+    # AppLovin Gems Top 50 universe (added at runtime merge)
+    "DUOL","CAVA","ONON","DASH","HIMS","RXRX","CELH","FOUR",
+    "FTDR","MNDY","GTLB","BILL","IOT","TOST","PCOR",
+    # Additional S&P / large-cap names
+    "PG","KO","PEP","PM","MO","MDLZ","GIS","CL","EL",
+    "BRK-B","PGR","TRV","CB","AIG","MET","PRU","AFL",
+    "ISRG","ZBH","BSX","EW","HOLX","TECH","KEYS","HXGN","TRMB","FTV",
+]
+# Deduplicate preserving order
+_seen_tickers: set = set()
+SCAN_UNIVERSE = [t for t in SCAN_UNIVERSE if not (t in _seen_tickers or _seen_tickers.add(t))]
+
+
+class _Silent:
+    """Progress / status sink that drops everything."""
+
+    def progress(self, fraction):
+        pass
+
+    def text(self, message):
+        pass
+
+
+_SILENT = _Silent()
+
+
+# ── Scanning ──────────────────────────────────────────────────────────────────
+def _baseline_frame():
+    """Rolling volume baselines for preview detection (None: detect_batch reads them)."""
+    try:
+        return baselines.frame(uoa_rules.BASELINE_WINDOW)
+    except Exception:
+        return None
+
+
+def preview_alerts(inputs: dict, top50_set: set, earnings_map: dict, hist=None) -> list:
+    """Alerts for `inputs` without overnight OI deltas ([] if detection fails)."""
+    try:
+        return uoa_rules.detect_batch(inputs, top50_set, earnings_map, oi_deltas=False, hist=hist)
+    except Exception:
+        return []
+
+
+def net_delta(since: dict) -> dict:
+    """HTTP counters accumulated since the `since` snapshot of net_stats()."""
+    now = net_stats()
+    return {k: now[k] - since.get(k, 0) for k in now}
+
+
+def scan_stream(tickers: list, top50_set: set, earnings_map: dict,
+                workers: int = SCAN_WORKERS, preview: bool = True, deadline: float | None = None):
+    """Fetch tickers on a bounded worker pool, yielding (ticker, inputs, alerts) as each completes.
+
+    Tickers start in list order, so a planned order is fetched best-first.
+    `inputs` is None if the ticker couldn't be scored. `alerts` is a preview
+    from single-ticker detection without overnight OI deltas (empty when
+    preview=False); run_scan re-detects the whole batch once all are in.
+    The stream ends at `deadline` (time.monotonic()) if given; ending or
+    closing it early cancels the tickers not yet started.
+    """
+    if not tickers:
+        return
+    hist = _baseline_frame() if preview else None
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(tickers))))
+    try:
+        futures = {pool.submit(market_data.scan_inputs, t): t for t in tickers}
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            for fut in as_completed(futures, timeout=timeout):
+                t = futures[fut]
+                try:
+                    inputs = fut.result()
+                except Exception:
+                    inputs = None
+                alerts = []
+                if preview and inputs is not None:
+                    alerts = preview_alerts({t: inputs}, top50_set, earnings_map, hist)
+                yield t, inputs, alerts
+        except TimeoutError:
+            return
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+@perf.timed("scan_engine.run_scan")
+def run_scan(tickers: list, top50_set: set, earnings_map: dict, prog=None, status=None,
+             workers: int = SCAN_WORKERS, feed=None, budget: float | None = None,
+             watching=None) -> tuple[list, list, list]:
+    """Fetch every ticker on a bounded pool of worker threads, then detect in one batch.
+
+    Returns (alerts, scanned, failed): scanned are the tickers whose inputs
+    were fetched, failed those whose fetch returned nothing (tickers a budget
+    cut off are in neither). Progress is reported to prog / status
+    (st.progress / st.empty call shape; None = nowhere) as tickers
+    complete, and feed(alerts), if given, receives preview alerts of the
+    tickers completed since its last call, at most every FEED_INTERVAL
+    seconds. watching(), if given, says whether anyone is looking: previews
+    are only detected while it returns True, so an unwatched scan doesn't
+    pay for them. With a `budget` (seconds) the scan stops when it
+    runs out and keeps what finished — pass a planned order so that is the
+    best subset. Inputs are kept in ticker order so the output matches a
+    one-at-a-time scan.
+    """
+    n = len(tickers)
+    if not n:
+        return [], [], []
+    prog, status = prog or _SILENT, status or _SILENT
+    net0     = net_stats()
+    start    = time.monotonic()
+    deadline = None if budget is None else start + budget
+    fetched: dict = {}
+    pending: dict = {}          # inputs not yet previewed to feed
+    hist, fed_at = None, start
+    for done, (t, x, _) in enumerate(scan_stream(tickers, top50_set, earnings_map, workers,
+                                                 preview=False, deadline=deadline), 1):
+        fetched[t] = x
+        if feed is not None and x is not None:
+            pending[t] = x
+            now = time.monotonic()
+            if now - fed_at >= FEED_INTERVAL and (watching is None or watching()):
+                hist = _baseline_frame() if hist is None else hist
+                preview, pending, fed_at = preview_alerts(pending, top50_set, earnings_map, hist), {}, now
+                if preview:
+                    feed(preview)
+        frac = done / n if budget is None else max(done / n, (time.monotonic() - start) / budget)
+        prog.progress(min(frac, 1.0))
+        net = net_delta(net0)
+        status.text(f"Scanned {t}… ({done}/{n}) | "
+                    f"throttled {net['throttled']} · retried {net['retried']} · "
+                    f"rate-limited {net['rate_limited']} · failed {net['failed']}")
+    inputs = {t: fetched[t] for t in tickers if fetched.get(t) is not None}
+    failed = [t for t in tickers if t in fetched and fetched[t] is None]
+    if not inputs:
+        return [], [], failed
+    _, frame = uoa_rules.universe_frames(inputs)
+    # Record before detecting so the previous session is rolled into the baselines
+    try:
+        baselines.record(frame[list(baselines.METRICS)])
+    except Exception:
+        pass
+    return sort_alerts(uoa_rules.detect_batch(inputs, top50_set, earnings_map, frame=frame)), list(inputs), failed
+
+
+def sort_alerts(alerts: list) -> list:
+    # Newest first (by time string), conflicts & Top-50 surfaced at top per group
+    return sorted(alerts, key=lambda a: (not a["is_top50"], not a["conflict"], a["time"]), reverse=False)
+
+
+# ── Scan planning ─────────────────────────────────────────────────────────────
+def prev_session_volumes() -> dict:
+    """Stock volume per ticker for the last completed session (grouped daily bars)."""
+    return {t: int(b.get("v", 0) or 0) for t, b in market_data.previous_session().items()}
+
+
+def scan_plan(universe: list, top50_set: set, earnings_map: dict, volumes: dict) -> list:
+    """Order universe by expected signal value.
+
+    Top 50 watchlist tickers first, then tickers with earnings inside
+    EARNINGS_NEAR_DAYS, then everything else; within each group by
+    previous-day stock volume, highest first. List order breaks ties.
+    """
+    today = date.today()
+
+    def earnings_near(t: str) -> bool:
+        try:
+            days = (date.fromisoformat(str(earnings_map.get(t) or "")[:10]) - today).days
+        except ValueError:
+            return False
+        return 0 <= days <= EARNINGS_NEAR_DAYS
+
+    ranked = sorted(enumerate(universe), key=lambda it: (
+        it[1] not in top50_set, not earnings_near(it[1]), -volumes.get(it[1], 0), it[0]))
+    return [t for _, t in ranked]
+
+
+# ── Incremental rescans ───────────────────────────────────────────────────────
+def day_volumes() -> dict:
+    """Stock day volume per ticker for the current session ({} until Polygon publishes the bars)."""
+    return {t: int(b.get("v", 0) or 0) for t, b in market_data.grouped_daily(baselines.trading_day()).items()}
+
+
+def rescan_plan(tickers: list, fetched: dict, volumes: dict, now: float) -> tuple[list, list]:
+    """Split the tickers that need re-fetching into (stale, changed).
+
+    `fetched` maps ticker → (fetch time, day volume at that time). Tickers never
+    fetched or older than RESCAN_STALE_AFTER are stale; fresher ones whose day
+    volume has since moved by more than RESCAN_VOL_CHANGE are changed. Without a
+    volume signal a ticker is only re-fetched once stale.
+    """
+    stale, changed = [], []
+    for t in tickers:
+        seen = fetched.get(t)
+        if seen is None or now - seen[0] >= RESCAN_STALE_AFTER:
+            stale.append(t)
+            continue
+        v0, v = seen[1], volumes.get(t)
+        if v0 is not None and v is not None and abs(v - v0) > RESCAN_VOL_CHANGE * max(v0, 1):
+            changed.append(t)
+    return stale, changed
+
+
+def merge_alerts(old: list, new: list, rescanned: list) -> list:
+    """Replace the alerts of rescanned tickers in `old` with `new`."""
+    rescanned = set(rescanned)
+    return sort_alerts([a for a in old if a["ticker"] not in rescanned] + new)
+
+
+# ── Planned scans ─────────────────────────────────────────────────────────────
+def top50_tickers() -> set:
+    """Top 50 watchlist tickers; also merges them into SCAN_UNIVERSE."""
+    try:
+        from applovin_data import TOP_50_STOCKS
+    except Exception:
+        return set()
+    for s in TOP_50_STOCKS:
+        if s["ticker"] not in SCAN_UNIVERSE:
+            SCAN_UNIVERSE.append(s["ticker"])
+    return {s["ticker"] for s in TOP_50_STOCKS}
+
+
+def earnings_dates() -> dict:
+    """Ticker → next earnings date for the Top 50 watchlist."""
+    try:
+        from applovin_data import TOP_50_STOCKS
+        return {s["ticker"]: s.get("next_earnings_date", "") for s in TOP_50_STOCKS}
+    except Exception:
+        return {}
+
+
+def scan(kind: str = "full", universe: list | None = None, progress=None, feed=None,
+         workers: int = SCAN_WORKERS, budget: float | None = None, history: bool = True,
+         watching=None) -> dict:
+    """One planned scan: "quick" (best QUICK_SCAN_N), "full", or "timed" (budget, default SCAN_BUDGET).
+
+    `universe` defaults to SCAN_UNIVERSE (with the Top 50 merged in) and is
+    ordered by scan_plan(); feed and watching are passed to run_scan. Alerts
+    are logged to alert_history unless history is False. Returns the
+    JSON-serialisable result the scheduler keeps: {"alerts", "tickers",
+    "failed", "fetched", "net", "perf"}, where tickers are those scanned and
+    failed those that couldn't be fetched.
+    """
+    top50_set = top50_tickers()
+    earn_map  = earnings_dates()
+    tickers   = scan_plan(SCAN_UNIVERSE if universe is None else universe, top50_set, earn_map,
+                          prev_session_volumes())
+    if kind == "quick":
+        tickers = tickers[:QUICK_SCAN_N]
+    if kind == "timed" and budget is None:
+        budget = SCAN_BUDGET
+    volumes = day_volumes()
+    started = time.time()
+    net0    = net_stats()
+    perf0   = perf.snapshot() if perf.ENABLED else None
+    alerts, scanned, failed = run_scan(tickers, top50_set, earn_map, progress, progress,
+                               workers=workers, feed=feed, budget=budget, watching=watching)
+    if history:
+        alert_history.record(alerts, started)
+    return {
+        "alerts":  alerts,
+        "tickers": scanned,
+        "failed":  failed,
+        "fetched": {t: [started, volumes.get(t)] for t in scanned},
+        "net":     net_delta(net0),
+        # Everything recorded while the scan ran (renders of open sessions included)
+        "perf":    perf.report(perf.since(perf0)) if perf0 else None,
+    }
+
+
+def scan_job(kind: str):
+    """ScanScheduler job running scan(kind), streaming preview alerts to the job's progress
+    while a page is watching it. A scan in which no ticker could be fetched counts as a
+    failed run, so it doesn't replace the previous result."""
+    def job(progress):
+        result = scan(kind, progress=progress, feed=progress.feed, watching=progress.watching)
+        return result if result["tickers"] else None
+    return job
+
+
+def scheduled_jobs() -> dict:
+    """ScanScheduler jobs for every kind in SCAN_SCHEDULE."""
+    return {kind: (SCAN_SCHEDULE[kind], scan_job(kind)) for kind in SCAN_SCHEDULE}
+
+
+# ── Published results ─────────────────────────────────────────────────────────
+# ScanScheduler (and the CLI's --publish) keep each kind's latest completed scan
+# in snapshot_store as ("scan_result", kind): {"started", "finished", "result"}.
+def publish(kind: str, entry: dict):
+    snapshot_store.put("scan_result", kind, entry)
+
+
+def published(kind: str) -> dict | None:
+    """The latest published entry for kind, read from snapshot_store."""
+    hit = snapshot_store.get("scan_result", kind)
+    return hit[1] if hit else None
+
+
+def shared_result(latest=published) -> dict | None:
+    """Latest completed scans merged into one view, or None.
+
+    latest(kind) returns a kind's {"started", "finished", "result"} entry
+    (default: the published one; the page passes its scheduler's latest).
+    Starts from the last Full scan (if any) and layers newer partial scans
+    (Quick, timed) over it, oldest first; "failed" lists the tickers whose
+    latest fetch failed.
+    """
+    done = sorted((e for e in map(latest, SCAN_SCHEDULE) if e), key=lambda e: e["finished"])
+    full = latest("full")
+    if full:
+        done = [full] + [e for e in done if e["finished"] > full["finished"]]
+    if not done:
+        return None
+    r = dict(done[0]["result"], finished=done[0]["finished"])
+    r.setdefault("failed", [])
+    for e in done[1:]:
+        q = e["result"]
+        r["alerts"]   = merge_alerts(r["alerts"], q["alerts"], q["tickers"])
+        seen          = set(r["tickers"])
+        r["tickers"]  = r["tickers"] + [t for t in q["tickers"] if t not in seen]
+        ok, was       = set(q["tickers"]), set(r["failed"])
+        r["failed"]   = [t for t in r["failed"] if t not in ok] + [t for t in q.get("failed", []) if t not in was]
+        r["fetched"]  = {**r["fetched"], **q["fetched"]}
+        r["net"]      = q["net"]
+        r["finished"] = e["finished"]
+    return r
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+class _Stderr:
+    """Progress sink printing a status line to stderr at most once a second."""
+
+    def __init__(self):
+        self._last = 0.0
+
+    def progress(self, fraction):
+        self.fraction = fraction
+
+    def text(self, message):
+        now = time.monotonic()
+        if now - self._last >= 1.0:
+            self._last = now
+            print(message, file=sys.stderr, flush=True)
+
+
+def read_universe(path) -> list:
+    """Tickers listed in path, upper-cased and de-duplicated in file order."""
+    seen, out = set(), []
+    for line in Path(path).read_text().splitlines():
+        for t in line.split("#", 1)[0].replace(",", " ").split():
+            t = t.upper()
+            if t not in seen:
+                seen.add(t)
+                out.append(t)
+    return out
+
+
+def write_alerts(alerts: list, path):
+    """Write alerts to path: Parquet for a .parquet suffix (needs pyarrow), else JSON lines."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pandas as pd
+        pd.DataFrame(alerts).to_parquet(path, index=False)
+        return
+    with open(path, "w") as f:
+        for a in alerts:
+            f.write(json.dumps(a, separators=(",", ":")) + "\n")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Headless unusual-options-activity scan")
+    ap.add_argument("--scan", choices=("full", "quick", "timed"), default="full")
+    ap.add_argument("--universe", help="file of tickers (default: the built-in scan universe)")
+    ap.add_argument("--workers", type=int, default=SCAN_WORKERS)
+    ap.add_argument("--budget", type=float, help=f"seconds before stopping (timed default {SCAN_BUDGET})")
+    ap.add_argument("--out", help="alerts output: .jsonl or .parquet")
+    ap.add_argument("--no-history", action="store_true", help="don't log alerts to alert_history")
+    ap.add_argument("--publish", action="store_true",
+                    help="store the result as the latest scan of its kind (read by the page and api_server)")
+    ap.add_argument("--quiet", action="store_true", help="no progress on stderr")
+    args = ap.parse_args(argv)
+
+    universe = read_universe(args.universe) if args.universe else None
+    t0, started = time.monotonic(), time.time()
+    result = scan(args.scan, universe, progress=None if args.quiet else _Stderr(),
+                  workers=args.workers, budget=args.budget, history=not args.no_history)
+    elapsed = time.monotonic() - t0
+    if args.publish and result["tickers"]:
+        publish(args.scan, {"started": started, "finished": time.time(), "result": result})
+    alerts  = result["alerts"]
+    if args.out:
+        try:
+            write_alerts(alerts, args.out)
+        except ImportError as e:
+            print(f"can't write {args.out}: {e}", file=sys.stderr)
+            return 2
+
+    by_cat: dict = {}
+    for a in alerts:
+        by_cat[a["cat"]] = by_cat.get(a["cat"], 0) + 1
+    print(json.dumps({
+        "scan":            args.scan,
+        "tickers":         len(result["tickers"]),
+        "failed":          len(result["failed"]),
+        "alerts":          len(alerts),
+        "by_category":     by_cat,
+        "top50_alerts":    sum(1 for a in alerts if a["is_top50"]),
+        "seconds":         round(elapsed, 2),
+        "tickers_per_sec": round(len(result["tickers"]) / elapsed, 2) if elapsed else 0.0,
+        "net":             result["net"],
+        "out":             args.out,
+    }))
+    return 0 if result["tickers"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""scan_scheduler.py — Server-wide background scan runner
+One daemon thread per server process runs named scan jobs (e.g. "quick", "full")
+on a fixed interval, one at a time, and keeps each job's latest completed result.
+Pages read results instead of scanning inside their own session, so every user of
+a deployment shares the same scans. Results are also written to snapshot_store,
+so a restarted server serves the last scan straight away and only rescans once
+it is due."""
+
+import threading
+import time
+
+import snapshot_store
+
+TICK = 1.0   # seconds between schedule checks
+
+# A running job counts as watched for this long after a status() call (the
+# page's status fragment polls every few seconds)
+WATCH_TIMEOUT = 10.0
+
+
+class _Progress:
+    """Progress sink with the st.progress / st.empty call shape (.progress, .text),
+    plus feed() for results streamed before the job completes and watching()
+    for whether anyone is reading them."""
+
+    def __init__(self):
+        self.fraction = 0.0
+        self.message  = ""
+        self.partial: list = []
+        self.watched  = 0.0
+
+    def progress(self, fraction: float):
+        self.fraction = float(fraction)
+
+    def text(self, message: str):
+        self.message = str(message)
+
+    def feed(self, items: list):
+        self.partial.extend(items)
+
+    def watching(self) -> bool:
+        return time.time() - self.watched < WATCH_TIMEOUT
+
+
+class ScanScheduler:
+    """Run `jobs` ({name: (interval_seconds, fn)}) on a background thread.
+
+    fn(progress) does one scan and returns a JSON-serialisable dict; a job
+    with interval None only runs when triggered. The latest completed result
+    per job is kept with its start and finish times (a failed run keeps the
+    previous one). trigger() runs a job as soon as the thread is free; a job
+    already queued or running is not queued again.
+    """
+
+    def __init__(self, jobs: dict):
+        self.jobs     = dict(jobs)
+        self._lock    = threading.Lock()
+        self._wake    = threading.Event()
+        self._thread  = None
+        self._queued: list[str] = []
+        self._results: dict[str, dict] = {}
+        self._last_run: dict[str, float] = {}
+        self._running: tuple[str, float, _Progress] | None = None
+        for name in self.jobs:
+            hit = snapshot_store.get("scan_result", name)
+            if hit is not None:
+                self._results[name]  = hit[1]
+                self._last_run[name] = hit[1]["started"]
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="scan-scheduler", daemon=True)
+                self._thread.start()
+        return self
+
+    def trigger(self, name: str):
+        """Queue `name` to run next (no-op if it is already queued or running)."""
+        with self._lock:
+            running = self._running and self._running[0] == name
+            if name in self.jobs and not running and name not in self._queued:
+                self._queued.append(name)
+        self._wake.set()
+
+    def latest(self, name: str) -> dict | None:
+        """Latest completed result: {"started", "finished", "result"} or None."""
+        with self._lock:
+            return self._results.get(name)
+
+    def status(self) -> dict | None:
+        """The job in progress as {"name", "started", "fraction", "message", "partial"}, or None.
+
+        `partial` is everything the job has fed so far (a copy). Calling this
+        marks the job as watched, so it keeps streaming partial results.
+        """
+        with self._lock:
+            if self._running is None:
+                return None
+            name, started, prog = self._running
+            prog.watched = time.time()
+            return {"name": name, "started": started, "fraction": prog.fraction,
+                    "message": prog.message, "partial": list(prog.partial)}
+
+    def queued(self) -> list:
+        with self._lock:
+            return list(self._queued)
+
+    def _next_job(self, now: float) -> str | None:
+        with self._lock:
+            if self._queued:
+                return self._queued.pop(0)
+            for name, (interval, _) in self.jobs.items():
+                last = self._last_run.get(name)
+                if interval is not None and (last is None or now - last >= interval):
+                    return name
+        return None
+
+    def _loop(self):
+        while True:
+            name = self._next_job(time.time())
+            if name is None:
+                self._wake.wait(TICK)
+                self._wake.clear()
+                continue
+            self._run(name)
+
+    def _run(self, name: str):
+        prog    = _Progress()
+        started = time.time()
+        with self._lock:
+            self._running = (name, started, prog)
+            self._last_run[name] = started
+        try:
+            result = self.jobs[name][1](prog)
+        except Exception:
+            result = None
+        entry = {"started": started, "finished": time.time(), "result": result}
+        with self._lock:
+            self._running = None
+            if result is not None:
+                self._results[name] = entry
+        if result is not None:
+            snapshot_store.put("scan_result", name, entry)
@@ -2,6 +2,9 @@
 import streamlit as st
 import plotly.graph_objects as go
 
+import market_data
+import perf
+
 # ── Try numpy for trend line (available via pandas/plotly) ──
 try:
     import numpy as np
@@ -51,7 +54,7 @@ APP_PHASE_MAP = {
 # ─────────────────────────────────────────────────────────────────────────────
 # DATA LOADERS
 # ─────────────────────────────────────────────────────────────────────────────
-@st.cache_data
+@perf.cached("scanner_page._load", st.cache_data)
 def _load():
     from applovin_data import TOP_50_STOCKS, INSTITUTIONAL_PILLARS
     pillar_map: dict = {}
@@ -61,25 +64,6 @@ def _load():
     return TOP_50_STOCKS, pillar_map
 
 
-@st.cache_data(ttl=3600)
-def fetch_iv_rank(ticker: str):
-    try:
-        import requests
-        key = "306e5550-50f0-478a-b47d-477afa769d0a"
-        r = requests.get(
-            "https://api.orats.io/datav2/hist/ivrank",
-            params={"ticker": ticker, "token": key},
-            timeout=5,
-        )
-        if r.status_code == 200:
-            data = r.json().get("data", [])
-            if data:
-                return data[0].get("ivRank")
-    except Exception:
-        pass
-    return None
-
-
 # ─────────────────────────────────────────────────────────────────────────────
 # SHARED HELPERS
 # ─────────────────────────────────────────────────────────────────────────────
@@ -521,7 +505,7 @@ def _render_card(s: dict, pillar_map: dict, show_expanded: bool = False):
         tradingview_chart(s["ticker"])
 
         # ── Options quick-view ───────────────────────────────────────────
-        live_iv = fetch_iv_rank(s["ticker"])
+        live_iv = market_data.iv_rank(s["ticker"])
         iv = live_iv if live_iv is not None else s.get("iv_rank", 0)
         iv_color = "#16A34A" if iv < 40 else "#F59E0B" if iv <= 60 else "#DC2626"
         iv_label = "Low" if iv < 40 else "Moderate" if iv <= 60 else "Elevated"
@@ -0,0 +1,150 @@
+"""snapshot_store.py — Persistent on-disk cache for Polygon/ORATS fetch results
+SQLite file keyed by (kind, ticker) with an as-of timestamp per entry. Fetch helpers
+read through it behind their in-memory caches so restarts and new replicas start warm.
+Entries past their TTL are re-fetched; if the re-fetch fails the last good value is
+served. Total size is bounded by evicting least-recently-used rows."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("APPLOVIN_CACHE_DIR", Path(__file__).parent / ".cache"))
+DB_PATH   = CACHE_DIR / "snapshots.sqlite"
+MAX_BYTES = 256 * 1024 * 1024   # evict down to 90% of this once exceeded
+EVICT_CHECK_EVERY = 200         # puts between size checks
+
+_local = threading.local()
+_puts  = 0
+_puts_lock = threading.Lock()
+
+
+def _conn() -> sqlite3.Connection:
+    """Per-thread connection (sqlite3 connections can't be shared across threads)."""
+    c = getattr(_local, "conn", None)
+    if c is None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        c = sqlite3.connect(DB_PATH, timeout=30)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        c.execute("""CREATE TABLE IF NOT EXISTS snapshots (
+                        kind        TEXT NOT NULL,
+                        key         TEXT NOT NULL,
+                        as_of       REAL NOT NULL,
+                        last_access REAL NOT NULL,
+                        nbytes      INTEGER NOT NULL,
+                        payload     BLOB NOT NULL,
+                        PRIMARY KEY (kind, key))""")
+        c.execute("CREATE INDEX IF NOT EXISTS ix_snapshots_access ON snapshots(last_access)")
+        c.commit()
+        _local.conn = c
+    return c
+
+
+def get(kind: str, key: str) -> tuple[float, object] | None:
+    """Return (as_of, value) for the stored entry, or None."""
+    try:
+        c = _conn()
+        row = c.execute("SELECT as_of, payload FROM snapshots WHERE kind=? AND key=?",
+                        (kind, key)).fetchone()
+        if row is None:
+            return None
+        c.execute("UPDATE snapshots SET last_access=? WHERE kind=? AND key=?",
+                  (time.time(), kind, key))
+        c.commit()
+        return row[0], json.loads(zlib.decompress(row[1]))
+    except Exception:
+        return None
+
+
+def as_of(kind: str, key: str) -> float | None:
+    """as_of of the stored entry without reading its payload, or None."""
+    try:
+        row = _conn().execute("SELECT as_of FROM snapshots WHERE kind=? AND key=?",
+                              (kind, key)).fetchone()
+        return row[0] if row else None
+    except Exception:
+        return None
+
+
+def put(kind: str, key: str, value, as_of: float | None = None):
+    """Store value (JSON-serialisable) as the latest entry for (kind, key)."""
+    global _puts
+    try:
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+        now  = time.time()
+        c = _conn()
+        c.execute("INSERT OR REPLACE INTO snapshots VALUES (?,?,?,?,?,?)",
+                  (kind, key, as_of or now, now, len(blob), blob))
+        c.commit()
+    except Exception:
+        return
+    with _puts_lock:
+        _puts += 1
+        check = _puts % EVICT_CHECK_EVERY == 0
+    if check:
+        evict()
+
+
+def expire(kind: str, key: str):
+    """Mark (kind, key) stale so the next read re-fetches; the value stays as the fallback."""
+    try:
+        c = _conn()
+        c.execute("UPDATE snapshots SET as_of=0 WHERE kind=? AND key=?", (kind, key))
+        c.commit()
+    except Exception:
+        pass
+
+
+def clear():
+    """Drop every stored entry (cold-start benchmarks)."""
+    try:
+        c = _conn()
+        c.execute("DELETE FROM snapshots")
+        c.commit()
+    except Exception:
+        pass
+
+
+def evict(max_bytes: int = MAX_BYTES):
+    """Drop least-recently-used entries until the store is under 90% of max_bytes."""
+    try:
+        c = _conn()
+        total = c.execute("SELECT COALESCE(SUM(nbytes), 0) FROM snapshots").fetchone()[0]
+        if total <= max_bytes:
+            return
+        target = int(max_bytes * 0.9)
+        freed, doomed = 0, []
+        for kind, key, nbytes in c.execute(
+                "SELECT kind, key, nbytes FROM snapshots ORDER BY last_access"):
+            if total - freed <= target:
+                break
+            doomed.append((kind, key))
+            freed += nbytes
+        c.executemany("DELETE FROM snapshots WHERE kind=? AND key=?", doomed)
+        c.commit()
+    except Exception:
+        pass
+
+
+def read_through(kind: str, key: str, ttl: float, fetch, encode=None, decode=None,
+                 valid=bool):
+    """Serve (kind, key) from disk if younger than ttl seconds, else call fetch().
+
+    A fetched value that passes `valid` is stored; otherwise the last stored
+    value (even if stale) is returned when one exists. `encode`/`decode`
+    convert between the in-memory value and its JSON form.
+    """
+    hit = get(kind, key)
+    if hit is not None and time.time() - hit[0] < ttl:
+        return decode(hit[1]) if decode else hit[1]
+    value = fetch()
+    if valid(value):
+        put(kind, key, encode(value) if encode else value)
+        return value
+    if hit is not None:
+        return decode(hit[1]) if decode else hit[1]
+    return value
@@ -0,0 +1,35 @@
+"""Shared test setup: the repo root on sys.path, a throwaway cache directory and
+a replay provider over tests/fixtures."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT     = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+sys.path.insert(0, str(ROOT))
+# snapshot_store / oi_history / baselines read this at import: never touch the app's cache
+os.environ["APPLOVIN_CACHE_DIR"] = tempfile.mkdtemp(prefix="applovin-tests-")
+os.environ.pop("APPLOVIN_REPLAY_DIR", None)
+
+
+@pytest.fixture
+def replay():
+    """A ReplayProvider over tests/fixtures as the market-data source, with cold caches."""
+    import data_providers
+    import market_data
+    import snapshot_store
+
+    previous = data_providers.provider()
+    provider = data_providers.ReplayProvider(FIXTURES)
+    data_providers.set_provider(provider)
+    market_data.clear_caches()
+    snapshot_store.clear()
+    yield provider
+    data_providers.set_provider(previous)
+    market_data.clear_caches()
+    snapshot_store.clear()
@@ -0,0 +1,148 @@
+"""pricing.py against the closed form, finite differences and its own edge-case rules."""
+
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+import pricing
+
+R, Q = 0.03, 0.01
+GRID = list(itertools.product([60.0, 100.0, 140.0],      # S
+                              [80.0, 100.0, 120.0],      # K
+                              [0.05, 0.5, 2.0],          # T
+                              [0.1, 0.4, 1.0],           # sigma
+                              [True, False]))            # call
+
+
+def _N(x):
+    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+
+
+def _bsm(S, K, T, sigma, r, q, call):
+    """Textbook Black-Scholes-Merton with the exact normal CDF."""
+    d1 = (math.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
+    d2 = d1 - sigma * math.sqrt(T)
+    if call:
+        return S * math.exp(-q * T) * _N(d1) - K * math.exp(-r * T) * _N(d2)
+    return K * math.exp(-r * T) * _N(-d2) - S * math.exp(-q * T) * _N(-d1)
+
+
+def _cols():
+    """GRID as S, K, T, sigma, call arrays."""
+    return tuple(np.array(c) for c in zip(*GRID))
+
+
+def test_norm_cdf_accuracy():
+    x = np.linspace(-8, 8, 1601)
+    exact = np.array([_N(v) for v in x])
+    assert np.max(np.abs(pricing.norm_cdf(x) - exact)) < 7.5e-8
+    assert float(pricing.norm_cdf(0.0)) == pytest.approx(0.5, abs=1e-8)
+
+
+def test_price_matches_closed_form():
+    S, K, T, sigma, call = _cols()
+    expected = [_bsm(*g[:4], R, Q, g[4]) for g in GRID]
+    np.testing.assert_allclose(pricing.price(S, K, T, sigma, R, Q, call), expected, rtol=0, atol=5e-5)
+
+
+def test_put_call_parity():
+    S, K, T, sigma, _ = _cols()
+    c = pricing.price(S, K, T, sigma, R, Q, True)
+    p = pricing.price(S, K, T, sigma, R, Q, False)
+    np.testing.assert_allclose(c - p, S * np.exp(-Q * T) - K * np.exp(-R * T), rtol=0, atol=1e-9)
+
+
+def test_greeks_match_finite_differences():
+    # Differences of the exact closed form: the A&S CDF's own slope is off by ~1e-6
+    S, K, T, sigma, call = _cols()
+    g = pricing.greeks(S, K, T, sigma, R, Q, call)
+    exact = np.vectorize(_bsm)
+
+    def V(**kw):
+        return exact(**{"S": S, "K": K, "T": T, "sigma": sigma, "r": R, "q": Q, "call": call, **kw})
+
+    hS, h = 1e-4 * S, 1e-5
+    np.testing.assert_allclose(g["price"], pricing.price(S, K, T, sigma, R, Q, call), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(g["delta"], (V(S=S + hS) - V(S=S - hS)) / (2 * hS), rtol=0, atol=1e-6)
+    np.testing.assert_allclose(g["gamma"], (V(S=S + hS) - 2 * V() + V(S=S - hS)) / hS ** 2,
+                               rtol=0, atol=1e-6)
+    for k, arg, x in (("vega", "sigma", sigma), ("theta", "T", T), ("rho", "r", R)):
+        fd = (V(**{arg: x + h}) - V(**{arg: x - h})) / (2 * h)
+        np.testing.assert_allclose(g[k], -fd if k == "theta" else fd, rtol=1e-6, atol=1e-5)
+
+
+@pytest.mark.parametrize("T", [0.0, -0.1])
+def test_expired_cells_are_intrinsic(T):
+    S, K = np.array([90.0, 100.0, 110.0]), 100.0
+    call = pricing.greeks(S, K, T, 0.3, R, Q, True)
+    put  = pricing.greeks(S, K, T, 0.3, R, Q, False)
+    np.testing.assert_allclose(call["price"], [0.0, 0.0, 10.0])
+    np.testing.assert_allclose(put["price"], [10.0, 0.0, 0.0])
+    np.testing.assert_array_equal(call["delta"], [0.0, 0.0, 1.0])
+    np.testing.assert_array_equal(put["delta"], [-1.0, 0.0, 0.0])
+    for g in (call, put):
+        for k in ("gamma", "vega", "theta", "rho"):
+            np.testing.assert_array_equal(g[k], 0.0)
+
+
+def test_zero_vol_cells_are_discounted_forward_intrinsic():
+    S, K, T = np.array([90.0, 100.0, 110.0]), 100.0, 1.0
+    fwd = S * math.exp(-Q * T) - K * math.exp(-R * T)
+    call = pricing.greeks(S, K, T, 0.0, R, Q, True)
+    put  = pricing.greeks(S, K, T, 0.0, R, Q, False)
+    np.testing.assert_allclose(call["price"], np.maximum(fwd, 0.0))
+    np.testing.assert_allclose(put["price"], np.maximum(-fwd, 0.0))
+    np.testing.assert_allclose(call["delta"], np.where(fwd > 0, math.exp(-Q * T), 0.0))
+    np.testing.assert_allclose(put["delta"], np.where(fwd < 0, -math.exp(-Q * T), 0.0))
+    np.testing.assert_array_equal(call["gamma"], 0.0)
+    # Live cells next to dead ones are priced normally
+    mixed = pricing.price(100.0, 100.0, T, np.array([0.0, 0.3]), R, Q)
+    assert mixed[0] == pytest.approx(max(100 * math.exp(-Q * T) - 100 * math.exp(-R * T), 0.0))
+    assert mixed[1] == pytest.approx(_bsm(100.0, 100.0, T, 0.3, R, Q, True), abs=5e-5)
+
+
+def test_implied_vol_round_trip():
+    S, K, T, sigma, call = _cols()
+    g = pricing.greeks(S, K, T, sigma, R, Q, call)
+    live = g["vega"] >= 1.0            # elsewhere the price barely moves with vol: not identifiable
+    assert live.sum() > len(GRID) // 2
+    iv = pricing.implied_vol(g["price"][live], S[live], K[live], T[live], R, Q, call[live])
+    np.testing.assert_allclose(iv, sigma[live], rtol=0, atol=1e-6)
+
+
+def test_implied_vol_scalar():
+    value = float(pricing.price(100.0, 105.0, 0.25, 0.35, R))
+    assert float(pricing.implied_vol(value, 100.0, 105.0, 0.25, R)) == pytest.approx(0.35, abs=1e-6)
+
+
+def test_implied_vol_nan_outside_the_bracket():
+    S, K, T = 100.0, 100.0, 0.5
+    lo_price = float(pricing.price(S, K, T, 1e-4, R, Q))
+    values = np.array([lo_price - 1.0,                                 # below the lo-vol price
+                       float(pricing.price(S, K, T, 6.0, R, Q)),       # needs vol above hi
+                       S + 1.0,                                        # above any call price
+                       float(pricing.price(S, K, T, 0.4, R, Q))])
+    iv = pricing.implied_vol(values, S, K, T, R, Q)
+    assert np.isnan(iv[:3]).all()
+    assert iv[3] == pytest.approx(0.4, abs=1e-5)
+    assert np.isnan(pricing.implied_vol(5.0, S, K, 0.0, R, Q))         # expired
+
+
+def test_stock_scenario_price_grid_broadcasts():
+    # 4 stocks (strike, vol, call/put) × 3 scenarios (time left) × 5 price points
+    K     = np.array([80.0, 100.0, 120.0, 100.0])[:, None, None]
+    sigma = np.array([0.2, 0.35, 0.5, 0.8])[:, None, None]
+    call  = np.array([True, True, False, False])[:, None, None]
+    T     = np.array([0.0, 0.25, 1.0])[None, :, None]
+    S     = np.linspace(70.0, 130.0, 5)[None, None, :]
+    out = pricing.price(S, K, T, sigma, R, Q, call)
+    assert out.shape == (4, 3, 5)
+    g = pricing.greeks(S, K, T, sigma, R, Q, call)
+    assert all(v.shape == (4, 3, 5) for v in g.values())
+    for i, j, k in itertools.product(range(4), range(3), range(5)):
+        one = pricing.price(S[0, 0, k], K[i, 0, 0], T[0, j, 0], sigma[i, 0, 0], R, Q, bool(call[i, 0, 0]))
+        assert out[i, j, k] == pytest.approx(float(one), abs=1e-12)
+    iv = pricing.implied_vol(out, S, K, T, R, Q, call)
+    assert iv.shape == (4, 3, 5)
@@ -0,0 +1,114 @@
+"""trade_prints.summarize over recorded /v3/trades fixtures, and market_data.chain_prints gating."""
+
+import json
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import market_data
+import trade_prints
+from conftest import FIXTURES
+
+SWEEP_CALL = "O:NVDA261120C00150000"   # 11 prints: a 4-venue sweep, a 2-venue burst, a 3-venue sweep
+BLOCK_PUT  = "O:NVDA261120P00120000"   # 5 prints seconds apart, one 800-lot
+QUIET_CALL = "O:NVDA261120C00160000"   # no prints today
+NO_FILE    = "O:NVDA261120P00170000"   # trades request fails
+
+
+def _trades(contract: str) -> list:
+    return json.loads((FIXTURES / "trades" / f"{contract}.json").read_text())
+
+
+def _opt(symbol: str, ct: str, strike: float, expiry: str, volume: int) -> dict:
+    return {"details": {"ticker": symbol, "contract_type": ct, "strike_price": strike,
+                        "expiration_date": expiry},
+            "day": {"volume": volume}, "open_interest": 1000}
+
+
+def _chain(*options) -> market_data.ChainAggregator:
+    chain = market_data.ChainAggregator()
+    chain.add_page(list(options))
+    return chain
+
+
+# ── summarize ─────────────────────────────────────────────────────────────────
+def test_multi_exchange_burst_is_the_largest_sweep():
+    s = trade_prints.summarize(_trades(SWEEP_CALL))
+    assert s["trades"] == 11
+    assert s["sweeps"] == 2                          # the 2-venue burst doesn't count
+    assert s["sweep_contracts"] == 130
+    assert s["sweep_exchanges"] == 4
+    assert s["sweep_premium"] == pytest.approx(40_575.0)
+    assert s["block_size"] == 60                     # largest single print, not the sweep
+    assert s["block_premium"] == pytest.approx(19_200.0)
+
+
+def test_single_block_without_sweep():
+    s = trade_prints.summarize(_trades(BLOCK_PUT))
+    assert s == dict(trade_prints.EMPTY, trades=5, block_size=800, block_premium=116_000.0)
+
+
+def test_empty_input():
+    s = trade_prints.summarize([])
+    assert s == trade_prints.EMPTY
+    s["trades"] = 1
+    assert trade_prints.EMPTY["trades"] == 0         # a copy, not the shared default
+
+
+def test_unsorted_timestamps_give_the_same_summary():
+    trades = _trades(SWEEP_CALL)
+    expected = trade_prints.summarize(trades)
+    assert trade_prints.summarize(trades[::-1]) == expected
+    shuffled = trades[:]
+    random.Random(7).shuffle(shuffled)
+    assert trade_prints.summarize(shuffled) == expected
+
+
+def test_burst_splits_only_on_gaps_longer_than_the_window():
+    ms = 1_000_000
+    w  = trade_prints.SWEEP_WINDOW_MS
+    trades = [{"sip_timestamp": i * w * ms, "size": 40, "price": 1.0, "exchange": 300 + i}
+              for i in range(3)]
+    assert trade_prints.summarize(trades)["sweeps"] == 1
+    trades[2]["sip_timestamp"] += 1
+    assert trade_prints.summarize(trades)["sweeps"] == 0
+
+
+def test_participant_timestamp_when_sip_is_missing():
+    trades = [{k: v for k, v in t.items() if k != "sip_timestamp"} for t in _trades(SWEEP_CALL)]
+    assert trade_prints.summarize(trades) == trade_prints.summarize(_trades(SWEEP_CALL))
+
+
+# ── chain_prints ──────────────────────────────────────────────────────────────
+def test_drills_into_active_call_and_put(replay):
+    chain = _chain(_opt(SWEEP_CALL, "call", 150, "2026-11-20", 900),
+                   _opt(BLOCK_PUT, "put", 120, "2026-11-20", 850))
+    out = market_data.chain_prints(chain)
+    assert out == {"call": trade_prints.summarize(_trades(SWEEP_CALL)),
+                   "put":  trade_prints.summarize(_trades(BLOCK_PUT))}
+
+
+def test_prefilter_skips_contracts_that_cannot_alert(replay):
+    low = market_data.PRINTS_MIN_VOL - 1
+    chain = _chain(_opt(SWEEP_CALL, "call", 150, "2099-01-15", low),
+                   _opt(BLOCK_PUT, "put", 120, "2099-01-15", low))
+    assert market_data.chain_prints(chain) == {}
+    assert replay.calls == 0
+
+
+def test_near_term_call_volume_passes_the_prefilter(replay):
+    soon = (date.today() + timedelta(days=7)).isoformat()
+    vol  = market_data.PRINTS_MIN_VOL - 1             # most active call alone is below the block floor
+    rest = market_data.PRINTS_MIN_NEAR - vol          # but near-term call volume reaches the sweep floor
+    chain = _chain(_opt(SWEEP_CALL, "call", 150, soon, vol),
+                   _opt("O:NVDA261024C00155000", "call", 155, soon, rest))
+    assert chain.near_call_vol == market_data.PRINTS_MIN_NEAR
+    assert market_data.chain_prints(chain) == {"call": trade_prints.summarize(_trades(SWEEP_CALL))}
+
+
+def test_no_prints_fall_back_to_the_snapshot(replay):
+    chain = _chain(_opt(QUIET_CALL, "call", 160, "2026-11-20", 900),
+                   _opt(NO_FILE, "put", 170, "2026-11-20", 900))
+    assert market_data.chain_prints(chain) == {}
+    assert replay.calls == 2
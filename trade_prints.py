@@ -0,0 +1,52 @@
+"""trade_prints.py — Sweep and block detection from option trade prints
+Reduces one contract's trades for the day (Polygon /v3/trades results) to a small
+summary for the UOA rules. Prints are sorted by SIP timestamp and split into bursts
+wherever the gap to the previous print exceeds SWEEP_WINDOW_MS; a burst that hits
+SWEEP_MIN_EXCHANGES or more exchanges with SWEEP_MIN_CONTRACTS or more contracts
+is a sweep (one order routed across venues). The largest single print is the block
+candidate. Only contracts that already passed the scan's volume prefilter are
+drilled into (see market_data.contract_prints), so the extra calls stay bounded."""
+
+import numpy as np
+
+SWEEP_WINDOW_MS     = 50     # max gap between prints of one sweep
+SWEEP_MIN_EXCHANGES = 3
+SWEEP_MIN_CONTRACTS = 100
+
+EMPTY = {"trades": 0, "sweeps": 0, "sweep_contracts": 0, "sweep_exchanges": 0,
+         "sweep_premium": 0.0, "block_size": 0, "block_premium": 0.0}
+
+
+def summarize(trades: list) -> dict:
+    """Summary of one contract's prints (see EMPTY for the keys).
+
+    sweep_* describe the largest sweep (0 if none); block_* the largest single
+    print. Premiums are in dollars (price × size × 100).
+    """
+    rows = [(t.get("sip_timestamp") or t.get("participant_timestamp") or 0,
+             t.get("size") or 0, t.get("price") or 0.0, t.get("exchange") or 0)
+            for t in trades]
+    if not rows:
+        return dict(EMPTY)
+    arr   = np.array(rows, dtype=np.float64)
+    arr   = arr[np.argsort(arr[:, 0], kind="stable")]
+    ts, size, price, exch = arr.T
+    prem  = price * size * 100
+
+    # Burst id per print: a new burst starts after any gap longer than the window
+    burst = np.concatenate([[0], np.cumsum(np.diff(ts) > SWEEP_WINDOW_MS * 1_000_000)])
+    n     = int(burst[-1]) + 1
+    contracts = np.bincount(burst, weights=size, minlength=n)
+    premium   = np.bincount(burst, weights=prem, minlength=n)
+    pairs     = np.unique(np.column_stack([burst, exch]), axis=0)   # distinct (burst, exchange)
+    venues    = np.bincount(pairs[:, 0].astype(np.int64), minlength=n)
+    is_sweep  = (venues >= SWEEP_MIN_EXCHANGES) & (contracts >= SWEEP_MIN_CONTRACTS)
+
+    out = dict(EMPTY, trades=len(rows), sweeps=int(is_sweep.sum()))
+    if out["sweeps"]:
+        best = int(np.flatnonzero(is_sweep)[np.argmax(contracts[is_sweep])])
+        out.update(sweep_contracts=int(contracts[best]), sweep_exchanges=int(venues[best]),
+                   sweep_premium=round(float(premium[best]), 2))
+    i = int(np.argmax(size))
+    out.update(block_size=int(size[i]), block_premium=round(float(prem[i]), 2))
+    return out
@@ -0,0 +1,247 @@
+"""trade_setups.py — Long call + bear put spread setups behind the Options Engine
+Numbers only, no rendering: options_page draws its trade cards, scenario tables and
+P/L charts from these, and api_server serves them as JSON. A setup is a stock record
+carrying the call / put-spread fields (every TOP_50_STOCKS entry does), or one built
+for any ticker by explorer_setup() from its price and IV rank at ~45 DTE.
+Legs are valued with Black-Scholes (pricing.py) at one flat volatility per setup:
+the vol implied by the call premium, or the one mapped from IV rank."""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+import market_data
+import pricing
+from ttl_cache import ttl_cache
+
+DTE        = 45                                 # explorer target days to expiry
+DOWN_MOVES = range(1, 36)                       # % drops in the downside table
+UP_MOVES   = (5, 10, 15, 20, 30, 50, 75, 100)   # % gains in the upside table
+RATE       = 0.04                               # risk-free rate for leg pricing
+HOLD       = 0.5                                # scenarios: share of the time to expiry already gone
+THETA_DTE  = (45, 30, 15)
+
+_LEG_IS_CALL = np.array([True, False, False])   # call, long put, short put
+
+
+def iv_rank_vol(iv_rank: float) -> float:
+    """Annualised volatility assumed for an IV rank (0-100 → 20%-100%)."""
+    return iv_rank / 100 * 0.8 + 0.2
+
+
+# ── Building a setup ──────────────────────────────────────────────────────────
+def explorer_setup(ticker: str, price: float, iv_rank: float, existing: dict | None = None,
+                   company_name: str | None = None) -> dict:
+    """A setup for any ticker: ~2% OTM call and 93%/80% put spread expiring on the Friday after DTE.
+
+    `existing` (the ticker's Top 50 record, if any) supplies stage, score and
+    the descriptive fields; otherwise neutral defaults are used.
+    """
+    target_expiry = date.today() + timedelta(days=DTE)
+    expiry        = target_expiry + timedelta(days=(4 - target_expiry.weekday()) % 7)
+    expiry_str    = expiry.strftime("%Y-%m-%d")
+
+    call_strike     = round(price * 1.02 / 5) * 5
+    put_buy_strike  = round(price * 0.93 / 5) * 5
+    put_sell_strike = round(price * 0.80 / 5) * 5
+
+    sigma = iv_rank_vol(iv_rank)
+    call_val, put_buy_val, put_sell_val = pricing.price(
+        price, np.array([call_strike, put_buy_strike, put_sell_strike]),
+        (expiry - date.today()).days / pricing.DAYS_PER_YEAR, sigma, RATE, call=_LEG_IS_CALL)
+    call_premium     = round(float(call_val), 2)
+    put_spread_cost  = round(float(put_buy_val - put_sell_val), 2)
+    total_debit      = round(call_premium + put_spread_cost, 2)
+    recovery_ratio   = round((put_buy_strike - put_sell_strike) / total_debit, 1) if total_debit > 0 else 2.0
+
+    ex = existing or {}
+    return {
+        "ticker": ticker,
+        "company_name": company_name or ex.get("company_name", ticker),
+        "app_stage": ex.get("app_stage", "MID_CONFIRMATION"),
+        "app_score": ex.get("app_score", 50),
+        "price_current": price,
+        "iv_rank": iv_rank,
+        "volatility": sigma,
+        "call_strike": call_strike,
+        "call_expiry": expiry_str,
+        "call_premium": call_premium,
+        "put_buy_strike": put_buy_strike,
+        "put_sell_strike": put_sell_strike,
+        "put_spread_expiry": expiry_str,
+        "put_spread_cost": put_spread_cost,
+        "total_debit": total_debit,
+        "max_loss": total_debit,
+        "upside_breakeven": call_strike + total_debit,
+        "target_profit_pct": round(recovery_ratio * 25),
+        "recovery_ratio": recovery_ratio,
+        "plain_english_summary": ex.get("plain_english_summary", f"{ticker} selected for analysis."),
+        "eps_beats_gt15pct": ex.get("eps_beats_gt15pct", 0),
+        "eps_surprise_pct": ex.get("eps_surprise_pct", []),
+        "axon_equivalent": ex.get("axon_equivalent", "core product"),
+        "tam_expansion": ex.get("tam_expansion", "new markets"),
+        "next_earnings_date": ex.get("next_earnings_date", ""),
+        "options_rationale": ex.get("options_rationale", ""),
+        "caution_flags": ex.get("caution_flags", []),
+    }
+
+
+def live_setup(ticker: str, existing: dict | None = None, company_name: str | None = None) -> dict:
+    """explorer_setup() at the previous close and live IV rank.
+
+    Falls back to the Top 50 record's price / IV rank, then to $100 / 45.
+    """
+    price   = market_data.prev_day(ticker).get("c")
+    iv_rank = market_data.iv_rank(ticker)
+    if price is None:
+        price = existing["price_current"] if existing else 100.0
+    if iv_rank is None:
+        iv_rank = existing["iv_rank"] if existing else 45.0
+    return explorer_setup(ticker, price, iv_rank, existing, company_name)
+
+
+# ── Pricing ───────────────────────────────────────────────────────────────────
+def years_to_expiry(s: dict) -> float:
+    """Years from today to the call's expiry (DTE days if a sample record's expiry has passed)."""
+    try:
+        days = (datetime.strptime(s["call_expiry"], "%Y-%m-%d").date() - date.today()).days
+    except Exception:
+        days = 0
+    return (days if days > 0 else DTE) / pricing.DAYS_PER_YEAR
+
+
+@ttl_cache(max_entries=1024)
+def _call_implied_vol(premium: float, price: float, strike: float, years: float) -> float:
+    return float(pricing.implied_vol(premium, price, strike, years, RATE))
+
+
+def volatility(s: dict) -> float:
+    """The setup's pricing vol: its own, else implied by the call premium, else from IV rank."""
+    if s.get("volatility"):
+        return s["volatility"]
+    iv = _call_implied_vol(s["call_premium"], s["price_current"], s["call_strike"], years_to_expiry(s))
+    return iv if np.isfinite(iv) else iv_rank_vol(s.get("iv_rank", 45))
+
+
+def position_value(setups: list, spots, years_left) -> tuple[np.ndarray, np.ndarray]:
+    """(call value, put-spread value) per share for each setup at each spot and time left.
+
+    spots and years_left broadcast against a leading setup axis — shape (len(setups), …) —
+    so a whole book of setups over a price × time grid is one pricing call.
+    """
+    spots, years_left = np.broadcast_arrays(np.asarray(spots, dtype=float), np.asarray(years_left, dtype=float))
+    shape = (len(setups), -1, *(1,) * (spots.ndim - 1))          # setup, leg, then the grid axes
+    legs  = np.array([[s["call_strike"], s["put_buy_strike"], s["put_sell_strike"], volatility(s)]
+                      for s in setups]).reshape(shape)
+    vals  = pricing.price(spots[:, None], legs[:, :3], years_left[:, None], legs[:, 3:], RATE,
+                          call=_LEG_IS_CALL.reshape(shape[1:]))
+    return vals[:, 0], vals[:, 1] - vals[:, 2]
+
+
+# ── Scenarios ─────────────────────────────────────────────────────────────────
+def downside(s: dict) -> list:
+    """Position value for each drop in DOWN_MOVES (per share, "back" per contract), HOLD of the way to expiry."""
+    moves  = np.array(DOWN_MOVES)
+    prices = s["price_current"] * (1 - moves / 100)
+    calls, spreads = position_value([s], prices[None], years_to_expiry(s) * (1 - HOLD))
+    rows = []
+    for dp, new_p, c, p in zip(moves.tolist(), prices.tolist(), calls[0].tolist(), spreads[0].tolist()):
+        call_val, put_spread_val = round(c, 2), round(p, 2)
+        total_val = round(call_val + put_spread_val, 2)
+        rows.append({"move_pct": -dp, "price": new_p, "call": call_val, "put_spread": put_spread_val,
+                     "total": total_val, "pnl": round(total_val - s["total_debit"], 2),
+                     "back": round(total_val * 100, 0)})
+    return rows
+
+
+def upside(s: dict) -> list:
+    """Position value and return on premium for each gain in UP_MOVES, HOLD of the way to expiry."""
+    moves, total_deb = np.array(UP_MOVES), s["total_debit"]
+    prices = s["price_current"] * (1 + moves / 100)
+    calls, spreads = position_value([s], prices[None], years_to_expiry(s) * (1 - HOLD))
+    rows = []
+    for gp, new_p, c, p in zip(moves.tolist(), prices.tolist(), calls[0].tolist(), spreads[0].tolist()):
+        call_val, put_spread_val = round(c, 2), round(p, 2)
+        total_val = round(call_val + put_spread_val, 2)
+        profit    = round(total_val - total_deb, 2)
+        rows.append({"move_pct": gp, "price": new_p, "call": call_val, "put_spread": put_spread_val,
+                     "total": total_val, "profit": profit,
+                     "return_pct": round((profit / total_deb) * 100, 1) if total_deb > 0 else 0})
+    return rows
+
+
+def greeks(s: dict) -> dict:
+    """Position delta, gamma, vega (per vol point) and theta (per day) per share at today's price."""
+    g = pricing.greeks(s["price_current"], np.array([s["call_strike"], s["put_buy_strike"], s["put_sell_strike"]]),
+                       years_to_expiry(s), volatility(s), RATE, call=_LEG_IS_CALL)
+    sign = np.array([1.0, 1.0, -1.0])                   # the low put is sold
+    return {"delta": float(sign @ g["delta"]), "gamma": float(sign @ g["gamma"]),
+            "vega":  float(sign @ g["vega"]) / 100,
+            "theta": float(sign @ g["theta"]) / pricing.DAYS_PER_YEAR}
+
+
+def theta(s: dict) -> dict:
+    """Call time decay per day ($/share, positive = lost) at today's price and 45, 30 and 15 DTE."""
+    g = pricing.greeks(s["price_current"], s["call_strike"], np.array(THETA_DTE) / pricing.DAYS_PER_YEAR,
+                       volatility(s), RATE)
+    return dict(zip(THETA_DTE, (-g["theta"] / pricing.DAYS_PER_YEAR).tolist()))
+
+
+def _pl(s: dict, years_left: float) -> tuple[list, list]:
+    current = s["price_current"]
+    step = max(1, int(current * 0.01))
+    xs = list(range(int(current * 0.65), int(current * 1.55) + 1, step))
+    calls, spreads = position_value([s], np.array(xs, dtype=float)[None], years_left)
+    cost = s["call_premium"] + s["put_spread_cost"]
+    return xs, np.round(calls[0] + spreads[0] - cost, 2).tolist()
+
+
+def pl_at_expiry(s: dict) -> tuple[list, list]:
+    """(stock prices, position P/L per share at expiry) from 65% to 155% of the current price."""
+    return _pl(s, 0.0)
+
+
+def pl_today(s: dict) -> tuple[list, list]:
+    """pl_at_expiry() if the stock moved today, with all the time to expiry left."""
+    return _pl(s, years_to_expiry(s))
+
+
+def earnings_in_window(s: dict) -> bool:
+    """True if the next earnings date falls before the call's expiry."""
+    try:
+        earn_dt = datetime.strptime(s.get("next_earnings_date", ""), "%Y-%m-%d").date()
+        return earn_dt < datetime.strptime(s["call_expiry"], "%Y-%m-%d").date()
+    except Exception:
+        return False
+
+
+def summary(s: dict) -> dict:
+    """The whole setup as plain JSON: legs, cost, breakeven, Greeks, scenarios and P/L curves."""
+    xs, ys = pl_at_expiry(s)
+    _, now = pl_today(s)
+    return {
+        "ticker":             s["ticker"],
+        "company_name":       s.get("company_name", s["ticker"]),
+        "app_stage":          s.get("app_stage"),
+        "app_score":          s.get("app_score"),
+        "price":              s["price_current"],
+        "iv_rank":            s.get("iv_rank"),
+        "volatility":         round(volatility(s), 4),
+        "call":               {"strike": s["call_strike"], "expiry": s["call_expiry"],
+                               "premium": s["call_premium"]},
+        "put_spread":         {"buy_strike": s["put_buy_strike"], "sell_strike": s["put_sell_strike"],
+                               "expiry": s.get("put_spread_expiry", s["call_expiry"]),
+                               "cost": s["put_spread_cost"]},
+        "total_debit":        s["total_debit"],
+        "breakeven":          s["upside_breakeven"],
+        "target_profit_pct":  s["target_profit_pct"],
+        "recovery_ratio":     s["recovery_ratio"],
+        "next_earnings_date": s.get("next_earnings_date") or None,
+        "earnings_in_window": earnings_in_window(s),
+        "greeks":             greeks(s),
+        "theta_per_day":      theta(s),
+        "downside":           downside(s),
+        "upside":             upside(s),
+        "pl_at_expiry":       {"price": xs, "pl": ys},
+        "pl_today":           {"price": xs, "pl": now},
+    }
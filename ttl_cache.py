@@ -0,0 +1,57 @@
+"""ttl_cache.py — In-process memoization for modules that must not import Streamlit
+Stands in for st.cache_data / st.cache_resource under market_data, so the headless
+scan engine (scan_engine.py) gets the same caching without loading Streamlit.
+Results are kept per argument tuple for `ttl` seconds and shared by every thread
+(and every Streamlit session) of the process; .clear() drops everything and
+.clear(*args) one entry, as the Streamlit caches do. Unlike st.cache_data, values
+are handed back as-is rather than copied — callers treat them as read-only."""
+
+import functools
+import math
+import threading
+import time
+
+
+def ttl_cache(ttl: float | None = None, max_entries: int | None = None):
+    """Decorator: memoize a function of hashable arguments for ttl seconds (None = forever).
+
+    Exceptions are not cached. Entries are kept in insertion order, so expired
+    ones are dropped from the front on each miss, and the oldest go first once
+    there are more than max_entries.
+    """
+    def wrap(fn):
+        lock = threading.Lock()
+        entries: dict = {}   # key → (expires at, value), oldest first
+
+        def key(args, kwargs):
+            return (args, tuple(sorted(kwargs.items()))) if kwargs else args
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            k   = key(args, kwargs)
+            now = time.monotonic()
+            with lock:
+                hit = entries.get(k)
+                if hit is not None and hit[0] > now:
+                    return hit[1]
+            value = fn(*args, **kwargs)
+            with lock:
+                entries.pop(k, None)
+                entries[k] = (now + ttl if ttl is not None else math.inf, value)
+                while entries:
+                    old = next(iter(entries))
+                    if entries[old][0] > now and (max_entries is None or len(entries) <= max_entries):
+                        break
+                    del entries[old]
+            return value
+
+        def clear(*args, **kwargs):
+            with lock:
+                if args or kwargs:
+                    entries.pop(key(args, kwargs), None)
+                else:
+                    entries.clear()
+
+        call.clear = clear
+        return call
+    return wrap
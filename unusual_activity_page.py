@@ -1,16 +1,25 @@
 """unusual_activity_page.py — Section 4: Unusual Options Activity Monitor
 Scans 1,000+ NASDAQ, S&P 500, and NYSE stocks for unusual options activity.
 Uses Polygon API for volume, OI, and trade data. ORATS for IV Rank.
+Scanning itself lives in scan_engine.py (no Streamlit); this page triggers the
+shared background scans, reads their results and renders the alerts.
 """
 
 import streamlit as st
-import requests
 import pandas as pd
 from datetime import datetime, date, timedelta
 import math
-
-POLYGON_KEY = "vzp2Q7xwgpv5g6rEl3Ewfp28fQlXsYqj"
-ORATS_KEY   = "306e5550-50f0-478a-b47d-477afa769d0a"
+import time
+
+import alert_history
+from alert_store import AlertStore
+import market_data
+import perf
+import scan_engine
+import uoa_rules
+from http_client import net_stats
+from scan_engine import QUICK_SCAN_N, SCAN_BUDGET, SCAN_UNIVERSE
+from scan_scheduler import ScanScheduler
 
 # ── Design tokens (matches rest of app) ───────────────────────────────────────
 BLUE      = "#2563EB"
@@ -26,427 +35,161 @@ GOLD      = "#D97706"
 PURPLE    = "#7C3AED"
 FONT      = "Helvetica Neue, Helvetica, Arial, sans-serif"
 
-# ── Full scan universe: S&P 500 + NASDAQ 100 + high-volume NYSE ───────────────
-SCAN_UNIVERSE = [
-    # Mega-cap tech
-    "AAPL","MSFT","NVDA","AMZN","GOOGL","GOOG","META","TSLA","AVGO","ORCL",
-    # Semis / hardware
-    "AMD","QCOM","MU","INTC","TXN","MCHP","SWKS","QRVO","MPWR","ENTG",
-    "ONTO","MKSI","COHR","CIEN","LRCX","AMAT","KLAC","SNPS","CDNS","ANSS",
-    # Software / cloud
-    "ADBE","CRM","NOW","INTU","PANW","FTNT","ZS","CRWD","NET","DDOG",
-    "HUBS","OKTA","DOCU","ZM","TWLO","TEAM","GTLB","PATH","ASAN","IOT",
-    "S","TENB","QLYS","VRNS","CYBR","DT","ESTC","NEWR","SUMO","PCOR",
-    "SNOW","PLTR","AI","BBAI","APP","TTD","MGNI","PUBM","DSP","APPS",
-    # Fintech / payments
-    "V","MA","PYPL","SQ","AFRM","SOFI","LC","ALLY","NU","STNE",
-    "HOOD","COIN","UPST","OPEN","GLBE","DLO","WEX","FLYW","TOST","FOUR",
-    # Large-cap financials
-    "JPM","BAC","WFC","GS","MS","BLK","C","AXP","SCHW","COF",
-    "BX","KKR","APO","ARES","CG","BAM","MCD","NDAQ","ICE","CME",
-    "SPGI","MCO","MSCI","FDS","MORN",
-    # Healthcare / biotech
-    "LLY","UNH","JNJ","PFE","MRK","ABBV","BMY","AMGN","GILD","REGN",
-    "VRTX","MRNA","ISRG","DXCM","ILMN","IDXX","SYK","MDT","ABT","TMO",
-    "DHR","BRKR","WAT","MTD","A","ALNY","BIIB","RARE","BMRN","HZNP",
-    # Consumer / retail
-    "WMT","COST","HD","LOW","TGT","SBUX","MCD","CMG","DPZ","WING",
-    "SHAK","BROS","NKE","LULU","DECK","SKX","TPR","CROX","CELH","MNST",
-    "ETSY","W","CHWY","BABA","JD","PDD","SE","GRAB","CPNG","MELI",
-    "SHOP","ETSY","AMZN","EBAY","WISH","POSH",
-    # Communication / media
-    "NFLX","DIS","SPOT","ROKU","SNAP","PINS","MTCH","WBD","PARA","FOXA",
-    # Energy
-    "XOM","CVX","COP","DVN","EOG","PXD","OXY","HAL","SLB","BKR",
-    # Industrials
-    "CAT","DE","HON","GE","BA","LMT","RTX","GD","NOC","LHX",
-    "ETN","EMR","ROK","PH","ITW","DOV","XYL","OTIS","CARR","ROP","UNP","CSX",
-    # Travel / leisure / gaming
-    "BKNG","ABNB","EXPE","LYFT","UBER","DKNG","PENN","WYNN","LVS","MGM","CZR",
-    "DAL","UAL","AAL","LUV","JBLU","CCL","RCL","NCLH",
-    # EV / auto
-    "TSLA","RIVN","LCID","NIO","XPEV","LI","F","GM",
-    # Crypto / digital assets
-    "MSTR","RIOT","CLSK","MARA","HUT","CIFR","CORZ","COIN",
-    # Utilities / REITs (high options vol)
-    "NEE","DUK","SO","D","PCG","AMT","PLD","CCI","EQIX","VICI",
-    # High-vol ETFs (must scan)
-    "SPY","QQQ","IWM","GLD","SLV","TLT","HYG","LQD",
-    "XLF","XLK","XLE","XLV","XLY","XLI","XLP","XLB","XLRE",
-    "VXX","UVXY","SQQQ","TQQQ","SPXU","UPRO","LABU","LABD",
-    # AppLovin Gems Top 50 universe (added at runtime merge)
-    "DUOL","CAVA","ONON","DASH","HIMS","RXRX","CELH","FOUR",
-    "FTDR","MNDY","GTLB","BILL","IOT","TOST","PCOR",
-    # Additional S&P / large-cap names
-    "PG","KO","PEP","PM","MO","MDLZ","GIS","CL","EL",
-    "BRK-B","PGR","TRV","CB","AIG","MET","PRU","AFL",
-    "ISRG","ZBH","BSX","EW","HOLX","TECH","KEYS","HXGN","TRMB","FTV",
-]
-# Deduplicate preserving order
-_seen_tickers: set = set()
-SCAN_UNIVERSE = [t for t in SCAN_UNIVERSE if not (t in _seen_tickers or _seen_tickers.add(t))]
-
-# ── Sector mapping ────────────────────────────────────────────────────────────
-_SECTOR: dict[str, str] = {
-    **{t: "Technology" for t in ["AAPL","MSFT","NVDA","AMD","AVGO","ORCL","QCOM","MU","INTC",
-       "TXN","ADBE","CRM","NOW","INTU","PANW","FTNT","ZS","CRWD","NET","DDOG",
-       "HUBS","OKTA","DOCU","ZM","TWLO","TEAM","GTLB","PATH","ASAN","IOT",
-       "S","SNOW","PLTR","AI","BBAI","APP","TTD","LRCX","AMAT","KLAC",
-       "SNPS","CDNS","ANSS","MCHP","SWKS","QRVO","MPWR","ENTG","ONTO","MKSI","COHR","CIEN",
-       "DT","ESTC","NEWR","SUMO","PCOR","TENB","QLYS","VRNS","CYBR","MGNI","PUBM","APPS"]},
-    **{t: "Financial" for t in ["JPM","BAC","WFC","GS","MS","BLK","C","AXP","SCHW","COF",
-       "BX","KKR","APO","ARES","CG","BAM","NDAQ","ICE","CME","SPGI","MCO","MSCI","FDS","MORN",
-       "V","MA","PYPL","SQ","AFRM","SOFI","LC","ALLY","NU","STNE",
-       "HOOD","COIN","UPST","OPEN","GLBE","DLO","WEX","FLYW","TOST","FOUR","BILL"]},
-    **{t: "Healthcare" for t in ["LLY","UNH","JNJ","PFE","MRK","ABBV","BMY","AMGN","GILD","REGN",
-       "VRTX","MRNA","ISRG","DXCM","ILMN","IDXX","SYK","MDT","ABT","TMO",
-       "DHR","BRKR","WAT","MTD","A","ALNY","BIIB","RARE","BMRN","HZNP","HIMS","RXRX","HOLX"]},
-    **{t: "Consumer" for t in ["WMT","COST","HD","LOW","TGT","SBUX","MCD","CMG","DPZ","WING",
-       "SHAK","BROS","NKE","LULU","DECK","SKX","TPR","CROX","CELH","MNST",
-       "ETSY","W","CHWY","BABA","JD","PDD","SE","GRAB","CPNG","MELI",
-       "SHOP","EBAY","DUOL","CAVA","ONON"]},
-    **{t: "Communication" for t in ["GOOGL","GOOG","META","NFLX","DIS","SPOT","ROKU","SNAP","PINS",
-       "MTCH","WBD","PARA","FOXA","DASH"]},
-    **{t: "Energy" for t in ["XOM","CVX","COP","DVN","EOG","PXD","OXY","HAL","SLB","BKR"]},
-    **{t: "Industrial" for t in ["CAT","DE","HON","GE","BA","LMT","RTX","GD","NOC","LHX",
-       "ETN","EMR","ROK","PH","ITW","DOV","XYL","OTIS","CARR","ROP","UNP","CSX"]},
-    **{t: "Travel/Leisure" for t in ["BKNG","ABNB","EXPE","LYFT","UBER","DKNG","PENN","WYNN","LVS","MGM",
-       "CZR","DAL","UAL","AAL","LUV","JBLU","CCL","RCL","NCLH"]},
-    **{t: "Auto/EV" for t in ["TSLA","RIVN","LCID","NIO","XPEV","LI","F","GM"]},
-    **{t: "Crypto/Digital" for t in ["MSTR","RIOT","CLSK","MARA","HUT","CIFR","CORZ","COIN"]},
-    **{t: "ETF" for t in ["SPY","QQQ","IWM","GLD","SLV","TLT","HYG","LQD",
-       "XLF","XLK","XLE","XLV","XLY","XLI","XLP","XLB","XLRE",
-       "VXX","UVXY","SQQQ","TQQQ","SPXU","UPRO","LABU","LABD"]},
-}
-
-def _sector(ticker: str) -> str:
-    return _SECTOR.get(ticker, "Other")
-
-
-# ── Market-cap tier (for $2B+ filter) ────────────────────────────────────────
-_MEGA = {"AAPL","MSFT","NVDA","AMZN","GOOGL","GOOG","META","TSLA","AVGO","LLY",
-         "JPM","V","XOM","UNH","MA","PG","JNJ","HD","ORCL","COST",
-         "SPY","QQQ","IWM"}
-_LARGE = {"AMD","QCOM","MU","BAC","WFC","GS","MS","BLK","SCHW","NFLX","ADBE",
-          "CRM","NOW","INTU","PANW","CRWD","REGN","ABBV","AMGN","GILD","MRK",
-          "ISRG","PYPL","SQ","MELI","SHOP","COIN","PLTR","DKNG","WYNN","LMT",
-          "RTX","CAT","DE","HON","GE","BA","NEE","DUK","CVX","COP","TMO","DHR",
-          "ZM","DOCU","OKTA","HUBS","TWLO","S","DDOG","NET","BKNG","ABNB","UBER"}
-
-def _mcap_tier(ticker: str) -> str:
-    if ticker in _MEGA:
-        return "Mega ($500B+)"
-    if ticker in _LARGE:
-        return "Large ($50-500B)"
-    return "Mid ($2-50B)"
-
-
-# ── Alert definitions ─────────────────────────────────────────────────────────
-ALERT_DEFS = {
-    # Volume-based
-    "CALL_VOL_2X":  {"label": "🚨 Call Volume 2x Average",          "cat": "Volume",  "color": AMBER,  "bullish": True},
-    "CALL_VOL_3X":  {"label": "🚨 Call Volume 3x Average",          "cat": "Volume",  "color": AMBER,  "bullish": True},
-    "CALL_VOL_5X":  {"label": "🚨 Call Volume 5x Average",          "cat": "Volume",  "color": RED,    "bullish": True},
-    "PC_COLLAPSE":  {"label": "🚨 Put/Call Ratio Collapse",         "cat": "Volume",  "color": AMBER,  "bullish": True},
-    # Block trade
-    "LARGE_BLOCK":  {"label": "🚨 Large Block Trade",               "cat": "Block",   "color": BLUE,   "bullish": True},
-    "INST_BLOCK":   {"label": "🚨 Institutional Block 500+ Ctrs",   "cat": "Block",   "color": BLUE,   "bullish": True},
-    "SWEEP":        {"label": "🚨 Sweep Order Detected",            "cat": "Block",   "color": PURPLE, "bullish": True},
-    # OI-based
-    "OI_SPIKE_25":  {"label": "🚨 Open Interest Spike +25%",        "cat": "OI",      "color": GREEN,  "bullish": True},
-    "OI_SPIKE_40":  {"label": "🚨 OI Up 40% Overnight",             "cat": "OI",      "color": GREEN,  "bullish": True},
-    "OI_SURGE":     {"label": "🚨 OI Surge — New Positioning",      "cat": "OI",      "color": GREEN,  "bullish": True},
-    # IV-based
-    "IV_SPIKE":     {"label": "🚨 IV Spike Detected",               "cat": "IV",      "color": AMBER,  "bullish": None},
-    "IV_ELEVATED":  {"label": "🚨 IV Rank — 80th Percentile",       "cat": "IV",      "color": AMBER,  "bullish": None},
-    "IV_CRUSH":     {"label": "🚨 IV Crush Risk — Earnings Near",   "cat": "IV",      "color": RED,    "bullish": None},
-    # Bearish / warning
-    "UNUSUAL_PUT":  {"label": "⚠️ Unusual Put Activity",            "cat": "Bearish", "color": RED,    "bullish": False},
-    "PUT_VOL_3X":   {"label": "⚠️ Put Volume 3x Average",           "cat": "Bearish", "color": RED,    "bullish": False},
-    "BEARISH_BLOCK":{"label": "⚠️ Large Bearish Block",             "cat": "Bearish", "color": RED,    "bullish": False},
-}
-
 ALL_CATS = ["All", "Volume", "Block", "OI", "IV", "Bearish"]
 ALL_SECTORS = ["All Sectors", "Technology", "Financial", "Healthcare", "Consumer",
                "Communication", "Energy", "Industrial", "Travel/Leisure",
                "Auto/EV", "Crypto/Digital", "ETF", "Other"]
 ALL_MCAP = ["All Sizes", "Mega ($500B+)", "Large ($50-500B)", "Mid ($2-50B)"]
+SORT_OPTIONS = {"Top 50 first": None, "Volume ratio": "vol_ratio",
+                "Est. notional": "est_notional", "Put/Call ratio": "pc_ratio"}
+
+# ── Alert table ───────────────────────────────────────────────────────────────
+ALERT_PAGE_SIZE = 100   # rows sent to the browser per page
+ALERT_COLUMNS = {
+    "Top 50":  st.column_config.TextColumn("⭐", width="small"),
+    "Price":   st.column_config.NumberColumn(format="$%.2f"),
+    "Calls":   st.column_config.NumberColumn(format="%d"),
+    "Puts":    st.column_config.NumberColumn(format="%d"),
+    "P/C":     st.column_config.NumberColumn(format="%.2f"),
+    "IV Rank": st.column_config.NumberColumn(format="%.0f"),
+    "New":     st.column_config.TextColumn("🆕", width="small"),
+    "Seen":    st.column_config.NumberColumn("Scans", format="%d", help="Scans today that raised this alert"),
+}
 
+# ── Background scans ──────────────────────────────────────────────────────────
+@perf.cached("unusual_activity_page._scheduler", st.cache_resource)
+def _scheduler() -> ScanScheduler:
+    """The server-wide scan scheduler, started once per process."""
+    return ScanScheduler(scan_engine.scheduled_jobs()).start()
 
-# ── Polygon & ORATS helpers ───────────────────────────────────────────────────
-@st.cache_data(ttl=900)
-def _options_snapshot(ticker: str) -> list:
-    """Fetch up to 250 contracts for ticker from Polygon options snapshot."""
-    try:
-        r = requests.get(
-            f"https://api.polygon.io/v3/snapshot/options/{ticker}",
-            params={"limit": 250, "apiKey": POLYGON_KEY},
-            timeout=8,
-        )
-        if r.status_code == 200:
-            return r.json().get("results", [])
-    except Exception:
-        pass
-    return []
-
-
-@st.cache_data(ttl=1800)
-def _prev_day(ticker: str) -> dict:
-    """Previous-day OHLCV from Polygon."""
-    try:
-        r = requests.get(
-            f"https://api.polygon.io/v2/aggs/ticker/{ticker}/prev",
-            params={"apiKey": POLYGON_KEY},
-            timeout=5,
-        )
-        if r.status_code == 200 and r.json().get("results"):
-            return r.json()["results"][0]
-    except Exception:
-        pass
-    return {}
-
-
-@st.cache_data(ttl=3600)
-def _iv_rank(ticker: str):
-    try:
-        r = requests.get(
-            "https://api.orats.io/datav2/hist/ivrank",
-            params={"ticker": ticker, "token": ORATS_KEY},
-            timeout=5,
-        )
-        if r.status_code == 200:
-            data = r.json().get("data", [])
-            if data:
-                return data[0].get("ivRank")
-    except Exception:
-        pass
-    return None
-
-
-# ── Alert detection logic ─────────────────────────────────────────────────────
-def _detect(ticker: str, top50_set: set, earnings_map: dict) -> list:
-    """Return list of alert dicts for one ticker."""
-    options = _options_snapshot(ticker)
-    if not options:
-        return []
-
-    prev = _prev_day(ticker)
-    price = prev.get("c")
-    if not price or price <= 0:
-        return []
-
-    # ── Aggregate by contract type ────────────────────────────────────────────
-    total_call_vol = total_put_vol = 0
-    total_call_oi  = total_put_oi  = 0
-    max_call_vol   = max_put_vol   = 0
-    max_call_opt   = max_put_opt   = None
-    call_iv_list   = []
-    call_oi_by_strike: dict[float, int] = {}
-    put_oi_by_strike:  dict[float, int] = {}
-    near_term_call_vol = 0  # expires ≤30d — proxy for sweeps
-    cutoff_30d = (date.today() + timedelta(days=30)).isoformat()
-
-    for opt in options:
-        details = opt.get("details", {})
-        ct      = details.get("contract_type", "").lower()
-        strike  = details.get("strike_price", 0) or 0
-        expiry  = details.get("expiration_date", "9999-12-31")
-        day     = opt.get("day", {})
-        vol     = day.get("volume", 0) or 0
-        oi      = opt.get("open_interest", 0) or 0
-        iv      = opt.get("implied_volatility", 0) or 0
-
-        if ct == "call":
-            total_call_vol += vol
-            total_call_oi  += oi
-            if iv > 0:
-                call_iv_list.append(iv * 100)
-            if strike:
-                call_oi_by_strike[strike] = call_oi_by_strike.get(strike, 0) + oi
-            if vol > max_call_vol:
-                max_call_vol, max_call_opt = vol, opt
-            if expiry <= cutoff_30d:
-                near_term_call_vol += vol
-        elif ct == "put":
-            total_put_vol += vol
-            total_put_oi  += oi
-            if strike:
-                put_oi_by_strike[strike] = put_oi_by_strike.get(strike, 0) + oi
-            if vol > max_put_vol:
-                max_put_vol, max_put_opt = vol, opt
-
-    total_vol = total_call_vol + total_put_vol
-    pc_ratio  = (total_put_vol / total_call_vol) if total_call_vol > 0 else 999.0
-
-    # ── IV rank (ORATS) ───────────────────────────────────────────────────────
-    iv_rank_val = _iv_rank(ticker)
-
-    # ── Baseline call volume estimate (30-day avg proxy) ─────────────────────
-    # We estimate from previous-day stock volume and market-cap tier
-    prev_stock_vol = prev.get("v", 0) or 0
-    tier = _mcap_tier(ticker)
-    if "Mega" in tier:
-        baseline_call = max(5000, prev_stock_vol // 200)
-    elif "Large" in tier:
-        baseline_call = max(1000, prev_stock_vol // 500)
-    else:
-        baseline_call = max(300,  prev_stock_vol // 1000)
-    baseline_put = int(baseline_call * 0.7)
-
-    is_top50 = ticker in top50_set
-    ts       = datetime.now().strftime("%H:%M")
-
-    def _mk(alert_type: str, extra: dict | None = None) -> dict:
-        d = ALERT_DEFS[alert_type]
-        a = {
-            "ticker":      ticker,
-            "alert_type":  alert_type,
-            "label":       d["label"],
-            "cat":         d["cat"],
-            "color":       d["color"],
-            "bullish":     d["bullish"],
-            "time":        ts,
-            "price":       price,
-            "call_vol":    total_call_vol,
-            "put_vol":     total_put_vol,
-            "total_vol":   total_vol,
-            "pc_ratio":    round(pc_ratio, 2),
-            "call_oi":     total_call_oi,
-            "put_oi":      total_put_oi,
-            "iv_rank":     iv_rank_val,
-            "is_top50":    is_top50,
-            "sector":      _sector(ticker),
-            "mcap_tier":   tier,
-            "conflict":    False,
-        }
-        if extra:
-            a.update(extra)
-        return a
-
-    alerts: list[dict] = []
-
-    # ── VOLUME-BASED ──────────────────────────────────────────────────────────
-    if total_call_vol >= 500 and baseline_call > 0:
-        ratio = total_call_vol / baseline_call
-        if ratio >= 5 and total_call_vol >= 1000:
-            alerts.append(_mk("CALL_VOL_5X", {"vol_ratio": round(ratio, 1)}))
-        elif ratio >= 3 and total_call_vol >= 500:
-            alerts.append(_mk("CALL_VOL_3X", {"vol_ratio": round(ratio, 1)}))
-        elif ratio >= 2 and total_call_vol >= 500:
-            alerts.append(_mk("CALL_VOL_2X", {"vol_ratio": round(ratio, 1)}))
-
-    # P/C Ratio Collapse: P/C < 0.40, high volume
-    if pc_ratio < 0.40 and total_vol >= int(baseline_call * 1.5) and total_call_vol >= 500:
-        alerts.append(_mk("PC_COLLAPSE"))
-
-    # ── BLOCK TRADE-BASED ─────────────────────────────────────────────────────
-    if max_call_vol >= 200 and price:
-        est_notional = max_call_vol * price * 0.40 * 100  # delta ~0.40
-        if max_call_vol >= 500 and est_notional >= 500_000:
-            alerts.append(_mk("INST_BLOCK", {
-                "block_contracts": max_call_vol,
-                "est_notional":    est_notional,
-            }))
-        elif max_call_vol >= 200 and est_notional >= 100_000:
-            alerts.append(_mk("LARGE_BLOCK", {
-                "block_contracts": max_call_vol,
-                "est_notional":    est_notional,
-            }))
-
-    # Sweep: ≥300 near-term contracts = concentrated near-expiry buying across exchanges
-    if near_term_call_vol >= 300 and total_call_vol > 0:
-        concentration = near_term_call_vol / total_call_vol
-        if concentration >= 0.40:
-            alerts.append(_mk("SWEEP", {"near_term_vol": near_term_call_vol,
-                                         "concentration": round(concentration, 2)}))
-
-    # ── OI-BASED ─────────────────────────────────────────────────────────────
-    if call_oi_by_strike:
-        max_strike_oi = max(call_oi_by_strike.values())
-        if max_strike_oi >= 1000 and total_call_oi > 0:
-            conc = max_strike_oi / total_call_oi
-            if conc >= 0.35 and max_strike_oi >= 5000:
-                alerts.append(_mk("OI_SURGE", {
-                    "max_strike_oi": max_strike_oi,
-                    "oi_concentration": round(conc, 2),
-                }))
-            elif conc >= 0.25 and max_strike_oi >= 2000:
-                alerts.append(_mk("OI_SPIKE_40", {"max_strike_oi": max_strike_oi}))
-            elif max_strike_oi >= 1000:
-                alerts.append(_mk("OI_SPIKE_25", {"max_strike_oi": max_strike_oi}))
-
-    # ── IV-BASED ──────────────────────────────────────────────────────────────
-    if iv_rank_val is not None:
-        if iv_rank_val >= 80:
-            alerts.append(_mk("IV_ELEVATED"))
-
-        earnings_dt_str = earnings_map.get(ticker, "")
-        if earnings_dt_str:
-            try:
-                ed       = datetime.strptime(earnings_dt_str, "%Y-%m-%d").date()
-                days_out = (ed - date.today()).days
-                if 0 <= days_out <= 14 and iv_rank_val >= 50:
-                    alerts.append(_mk("IV_CRUSH", {
-                        "days_to_earnings": days_out,
-                        "earnings_date":    earnings_dt_str,
-                    }))
-            except Exception:
-                pass
-
-    # ── BEARISH / WARNING ─────────────────────────────────────────────────────
-    if total_put_vol >= 500:
-        if pc_ratio >= 3.0 and total_put_vol >= baseline_put * 3:
-            alerts.append(_mk("PUT_VOL_3X"))
-        elif pc_ratio >= 1.5 and total_put_vol >= baseline_put * 2:
-            alerts.append(_mk("UNUSUAL_PUT"))
-
-    if max_put_vol >= 200 and price:
-        max_put_strike = 0.0
-        if put_oi_by_strike:
-            max_put_strike = max(put_oi_by_strike, key=put_oi_by_strike.get)
-        is_bearish_strike = max_put_strike <= price * 1.02
-        est_put_notional  = max_put_vol * price * 0.35 * 100
-        if max_put_vol >= 200 and est_put_notional >= 150_000 and is_bearish_strike:
-            alerts.append(_mk("BEARISH_BLOCK", {
-                "block_contracts": max_put_vol,
-                "est_notional":    est_put_notional,
-            }))
-
-    # ── CONFLICT FLAG ─────────────────────────────────────────────────────────
-    has_bull = any(a["bullish"] is True  for a in alerts)
-    has_bear = any(a["bullish"] is False for a in alerts)
-    if is_top50 and has_bear:
-        for a in alerts:
-            if a["bullish"] is False:
-                a["conflict"] = True
-
-    return alerts
-
-
-# ── Full scanner ──────────────────────────────────────────────────────────────
-def _run_scan(tickers: list, top50_set: set, earnings_map: dict,
-              prog, status) -> list:
-    all_alerts: list[dict] = []
-    n = len(tickers)
-    for i, ticker in enumerate(tickers):
-        try:
-            all_alerts.extend(_detect(ticker, top50_set, earnings_map))
-        except Exception:
-            pass
-        prog.progress((i + 1) / n)
-        status.text(f"Scanning {ticker}… ({i + 1}/{n})")
-    # Newest first (by time string), conflicts & Top-50 surfaced at top per group
-    return sorted(all_alerts, key=lambda a: (not a["is_top50"], not a["conflict"], a["time"]), reverse=False)
-
-
-# ── Earnings map helper ───────────────────────────────────────────────────────
-@st.cache_data
-def _earnings_map() -> dict:
-    try:
-        from applovin_data import TOP_50_STOCKS
-        return {s["ticker"]: s.get("next_earnings_date", "") for s in TOP_50_STOCKS}
-    except Exception:
-        return {}
+
+def _adopt_shared_scan(sched: ScanScheduler):
+    """Show the latest background scan unless this session already holds newer results."""
+    r = scan_engine.shared_result(sched.latest)
+    if r is None or r["finished"] <= st.session_state.get("uoa_scan_at", 0):
+        return
+    st.session_state["uoa_alerts"]       = r["alerts"]
+    st.session_state["uoa_last_scan"]    = datetime.fromtimestamp(r["finished"]).strftime("%H:%M:%S CT")
+    st.session_state["uoa_scan_n"]       = len(r["tickers"])
+    # Tickers that failed stay in the universe, so Refresh retries them
+    st.session_state["uoa_scan_tickers"] = list(r["tickers"]) + list(r.get("failed", []))
+    st.session_state["uoa_fetched"]      = dict(r["fetched"])
+    st.session_state["uoa_refetched"]    = None
+    st.session_state["uoa_scan_net"]     = r["net"]
+    st.session_state["uoa_scan_at"]      = r["finished"]
+
+
+def _age(seconds: float) -> str:
+    if seconds < 90:
+        return f"{int(seconds)} sec ago"
+    if seconds < 5400:
+        return f"{int(seconds // 60)} min ago"
+    return f"{seconds / 3600:.1f} hr ago"
+
+
+@st.fragment(run_every=3)
+@perf.timed("uoa.render.scan_status")
+def _scan_status(sched: ScanScheduler):
+    """Live progress and streamed alerts of the running background scan.
+
+    Reruns the page when a newer completed scan lands.
+    """
+    run = sched.status()
+    if run is not None:
+        st.progress(run["fraction"],
+                    text=f"Background {run['name']} scan running (started "
+                         f"{_age(time.time() - run['started'])}) — {run['message']}")
+        if run["partial"] and st.session_state.get("uoa_alerts"):
+            with st.expander(f"Live feed from the running scan ({len(run['partial'])} alerts so far)"):
+                _live_feed(run["partial"])
+        elif run["partial"]:
+            _live_feed(run["partial"])
+    elif sched.queued():
+        st.caption(f"Background scan queued: {', '.join(sched.queued())}")
+    r = scan_engine.shared_result(sched.latest)
+    if r is not None and r["finished"] > st.session_state.get("uoa_scan_at", 0):
+        st.rerun()
+
+
+def _alerts_frame(alerts: list) -> pd.DataFrame:
+    """One row per alert for the alert table (see ALERT_COLUMNS)."""
+    return pd.DataFrame({
+        "Top 50":   ["⭐" if a["is_top50"] else "" for a in alerts],
+        "Ticker":   [a["ticker"] for a in alerts],
+        "Alert":    [a["label"] for a in alerts],
+        "Category": [a["cat"] for a in alerts],
+        "Price":    [a["price"] for a in alerts],
+        "Calls":    [a["call_vol"] for a in alerts],
+        "Puts":     [a["put_vol"] for a in alerts],
+        "P/C":      [a["pc_ratio"] for a in alerts],
+        "IV Rank":  [a["iv_rank"] for a in alerts],
+        "Sector":   [a["sector"] for a in alerts],
+        "Conflict": ["⚠️" if a.get("conflict") else "" for a in alerts],
+        "New":      ["🆕" if a.get("is_new") else "" for a in alerts],
+        "First":    [_clock(a.get("first_seen")) or a["time"] for a in alerts],
+        "Seen":     [a.get("scans") for a in alerts],
+        "Time":     [a["time"] for a in alerts],
+    })
+
+
+def _clock(ts: float | None) -> str:
+    return datetime.fromtimestamp(ts).strftime("%H:%M") if ts else ""
+
+
+def _live_feed(alerts: list):
+    """Alerts streamed so far: summary metrics, conflict banner, Top 50 first."""
+    alerts = scan_engine.sort_alerts(alerts)
+    store  = AlertStore(alerts)
+    every  = store.select()
+    st.markdown(f'<div style="font-size:13px;color:{TEXT_GRAY};margin:4px 0 8px;">'
+                f'Live feed — {len(alerts)} alerts so far (final results replace these when the scan '
+                f'completes)</div>', unsafe_allow_html=True)
+    _summary_metrics(store.summary(every))
+    _conflict_banner(store.conflict_tickers(every))
+    top50 = [a for a in alerts if a["is_top50"]]
+    for a in top50:
+        _alert_card(a)
+    others = [a for a in alerts if not a["is_top50"]]
+    if others:
+        st.dataframe(_alerts_frame(others), hide_index=True, use_container_width=True,
+                     height=280, column_config=ALERT_COLUMNS)
+
+
+# ── Summary metrics & conflict banner ─────────────────────────────────────────
+def _mbox(col, lbl, val, clr=BLUE):
+    col.markdown(f'''<div style="background:{WHITE};border:1px solid {BORDER};border-radius:8px;
+padding:12px;text-align:center;box-shadow:0 1px 3px rgba(0,0,0,0.06);">
+<div style="font-size:24px;font-weight:700;color:{clr};">{val}</div>
+<div style="font-size:11px;color:{TEXT_GRAY};">{lbl}</div></div>''', unsafe_allow_html=True)
+
+
+def _summary_metrics(counts: dict):
+    """counts is AlertStore.summary() for the alerts on screen."""
+    conflict_cnt = counts["conflict"]
+
+    sm1, sm2, sm3, sm4, sm5 = st.columns(5)
+    _mbox(sm1, "Filtered Alerts",   counts["alerts"],   BLUE)
+    _mbox(sm2, "Bullish Signals",   counts["bullish"],  GREEN)
+    _mbox(sm3, "Bearish Signals",   counts["bearish"],  RED)
+    _mbox(sm4, "Top 50 Triggered",  counts["is_top50"], GOLD)
+    _mbox(sm5, "Conflicts",         conflict_cnt,       RED if conflict_cnt else TEXT_GRAY)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+
+def _conflict_banner(tickers: list):
+    if tickers:
+        tks = ", ".join(tickers)
+        st.markdown(f'''
+<div style="background:#FEF2F2;border:2px solid {RED};border-radius:8px;
+padding:14px 18px;margin-bottom:16px;">
+<div style="font-size:14px;font-weight:700;color:{RED};margin-bottom:4px;">
+⚠️ Conflict Alert — Bearish signals on Top 50 Bullish-list stocks</div>
+<div style="font-size:13px;color:{TEXT_DARK};">
+Tickers affected: <strong>{tks}</strong><br>
+These stocks carry active bearish signals. Review your positions before adding exposure.
+</div></div>
+''', unsafe_allow_html=True)
 
 
 # ── Alert card ────────────────────────────────────────────────────────────────
@@ -460,6 +203,12 @@ def _alert_card(a: dict):
     # Volume line
     vol_line = (f"Calls: {a['call_vol']:,} | Puts: {a['put_vol']:,} | "
                 f"P/C: {a['pc_ratio']:.2f} | Total: {a['total_vol']:,}")
+    if a.get("vol_z") is not None:
+        vol_line += f" | {a['vol_z']:+.1f}σ vs 30d avg"
+    if a.get("oi_change") is not None:
+        pct = f" ({a['oi_change_pct']:+.0f}%)" if a.get("oi_change_pct") is not None else " (new)"
+        vol_line += (f" | OI +{a['oi_change']:,}{pct} overnight on "
+                     f"${a['oi_strike']:.0f}C {a['oi_expiry']}")
 
     # Notional
     notional_html = ""
@@ -467,6 +216,11 @@ def _alert_card(a: dict):
         n = a["est_notional"]
         nstr = f"${n/1_000:.0f}K" if n < 1_000_000 else f"${n/1_000_000:.1f}M"
         notional_html = f' | Est. {nstr} notional ({a.get("block_contracts",0):,} contracts)'
+        if a.get("block_premium"):
+            notional_html += f' in one print, ${a["block_premium"]:,.0f} premium'
+    if a.get("sweep_exchanges"):
+        notional_html += (f' | Sweep: {a["sweep_contracts"]:,} contracts across '
+                          f'{a["sweep_exchanges"]} exchanges, ${a["sweep_premium"]:,.0f} premium')
 
     # Badges
     top50_badge = (f'<span style="background:{GOLD};color:#FFF;font-size:10px;'
@@ -520,47 +274,40 @@ border-radius:8px;padding:14px 18px;margin:4px 0;box-shadow:0 1px 3px rgba(0,0,0
 ''', unsafe_allow_html=True)
 
 
-# ── Alert detail expand ───────────────────────────────────────────────────────
-def _alert_detail(a: dict):
-    """Render options chain table + trade recommendation inside an expander."""
-    ticker = a["ticker"]
-    price  = a["price"]
-    color  = a["color"]
-
-    st.markdown(f'<div style="font-size:13px;font-weight:600;color:{TEXT_DARK};margin:8px 0 4px;">Options Chain Snapshot</div>',
-                unsafe_allow_html=True)
-
-    options = _options_snapshot(ticker)
-    if not options:
-        st.caption("Options chain unavailable for this ticker.")
-    else:
-        rows = []
-        for opt in options[:60]:
-            details = opt.get("details", {})
-            ct      = details.get("contract_type", "").lower()
-            strike  = details.get("strike_price", 0)
-            expiry  = details.get("expiration_date", "")
-            day     = opt.get("day", {})
-            vol     = day.get("volume", 0) or 0
-            oi      = opt.get("open_interest", 0) or 0
-            iv      = (opt.get("implied_volatility", 0) or 0) * 100
-            delta   = (opt.get("greeks", {}) or {}).get("delta", None)
-            rows.append({
-                "Type":   "📞 CALL" if ct == "call" else "📉 PUT",
-                "Strike": f"${strike:.0f}",
-                "Expiry": expiry,
-                "Vol":    f"{vol:,}",
-                "OI":     f"{oi:,}",
-                "IV %":   f"{iv:.1f}%",
-                "Delta":  f"{delta:.2f}" if delta is not None else "—",
-            })
-        if rows:
-            st.dataframe(pd.DataFrame(rows), use_container_width=True, height=280)
-
-    # ── Trade recommendation ───────────────────────────────────────────────────
-    st.markdown(f'<div style="font-size:13px;font-weight:600;color:{TEXT_DARK};margin:12px 0 4px;">Suggested Trade</div>',
-                unsafe_allow_html=True)
-
+# ── Alert detail (selected row only) ─────────────────────────────────────────
+# Memoised per (ticker, scan id): a ticker with several alerts shares one chain
+# table, and reruns (filter changes, paging, reselecting) rebuild nothing.
+@perf.cached("unusual_activity_page._chain_table", st.cache_data(max_entries=256, show_spinner=False))
+def _chain_table(ticker: str, scan_id: float) -> pd.DataFrame:
+    """First 60 contracts of ticker's options snapshot as a display table."""
+    rows = []
+    for opt in market_data.options_snapshot(ticker)[:60]:
+        details = opt.get("details", {})
+        ct      = details.get("contract_type", "").lower()
+        strike  = details.get("strike_price", 0)
+        expiry  = details.get("expiration_date", "")
+        day     = opt.get("day", {})
+        vol     = day.get("volume", 0) or 0
+        oi      = opt.get("open_interest", 0) or 0
+        iv      = (opt.get("implied_volatility", 0) or 0) * 100
+        delta   = (opt.get("greeks", {}) or {}).get("delta", None)
+        rows.append({
+            "Type":   "📞 CALL" if ct == "call" else "📉 PUT",
+            "Strike": f"${strike:.0f}",
+            "Expiry": expiry,
+            "Vol":    f"{vol:,}",
+            "OI":     f"{oi:,}",
+            "IV %":   f"{iv:.1f}%",
+            "Delta":  f"{delta:.2f}" if delta is not None else "—",
+        })
+    return pd.DataFrame(rows)
+
+
+@perf.cached("unusual_activity_page._trade_html", st.cache_data(max_entries=1024, show_spinner=False))
+def _trade_html(ticker: str, scan_id: float, alert_type: str, _a: dict) -> str:
+    """Suggested-trade block for one alert (_a is the alert; keyed by ticker, scan and type)."""
+    a           = _a
+    price       = a["price"]
     iv_rank_val = a.get("iv_rank") or 45.0
 
     if a["bullish"] is True:
@@ -572,7 +319,7 @@ def _alert_detail(a: dict):
         premium     = round(price * sigma * math.sqrt(45 / 365) * 0.40, 2)
         breakeven   = call_strike + premium
 
-        st.markdown(f'''
+        return f'''
 <div class="trade-terminal" style="background:{TEXT_DARK};border-radius:8px;
 padding:14px 18px;margin:8px 0;font-family:'Courier New',monospace;font-size:13px;line-height:2.2;">
 📞 BULLISH SETUP — Triggered by {a["label"]}<br>
@@ -583,13 +330,10 @@ TOTAL COST:  <span class="tv-amber" style="font-weight:700;">${premium:.2f}/shar
 BREAKEVEN:   <span class="tv-green" style="font-weight:700;">${breakeven:.2f}</span> at {expiry_str}<br>
 IV RANK:     <span class="tv-amber" style="font-weight:700;">{iv_rank_val:.0f}</span> — {"Favorable for buyers" if iv_rank_val < 60 else "Elevated — consider smaller size"}
 </div>
-''', unsafe_allow_html=True)
-
-        if a.get("is_top50"):
-            st.success(f"⭐ {ticker} is on our Top 50 Watchlist — this alert reinforces the bullish thesis. See Options Engine for the full spread setup.")
+'''
 
-    elif a["bullish"] is False:
-        st.markdown(f'''
+    if a["bullish"] is False:
+        return f'''
 <div style="background:#FEF2F2;border:1px solid #FCA5A5;border-radius:8px;
 padding:14px 18px;margin:8px 0;font-size:13px;color:{RED};">
 <strong>⚠️ Bearish Signal: {a["label"]}</strong><br><br>
@@ -597,10 +341,9 @@ Put/Call Ratio: <strong>{a["pc_ratio"]:.2f}</strong> | Put Volume: <strong>{a["p
 Consider reviewing or hedging long positions in <strong>{ticker}</strong>.<br>
 {"<br><strong>⚠️ CONFLICT with Top 50 Bullish List — review conviction before adjusting.</strong>" if a.get("conflict") else ""}
 </div>
-''', unsafe_allow_html=True)
+'''
 
-    else:
-        st.markdown(f'''
+    return f'''
 <div style="background:#FFF7ED;border:1px solid #FED7AA;border-radius:8px;
 padding:14px 18px;margin:8px 0;font-size:13px;color:{AMBER};">
 <strong>ℹ️ IV Alert: {a["label"]}</strong><br><br>
@@ -609,25 +352,41 @@ IV Rank: <strong>{iv_rank_val:.0f}</strong> —
  else "Earnings approaching — IV likely to collapse post-event. Avoid buying premium now."}<br>
 {"Earnings in <strong>" + str(a.get("days_to_earnings","?")) + " days</strong> (" + a.get("earnings_date","") + ")" if a.get("days_to_earnings") else ""}
 </div>
-''', unsafe_allow_html=True)
+'''
+
+
+@perf.timed("uoa.render.alert_detail")
+def _alert_detail(a: dict):
+    """Render options chain table + trade recommendation for the selected alert."""
+    ticker  = a["ticker"]
+    scan_id = st.session_state.get("uoa_scan_at", 0.0)
+
+    st.markdown(f'<div style="font-size:13px;font-weight:600;color:{TEXT_DARK};margin:8px 0 4px;">Options Chain Snapshot</div>',
+                unsafe_allow_html=True)
+
+    table = _chain_table(ticker, scan_id)
+    if table.empty:
+        st.caption("Options chain unavailable for this ticker.")
+    else:
+        st.dataframe(table, use_container_width=True, height=280)
+
+    # ── Trade recommendation ───────────────────────────────────────────────────
+    st.markdown(f'<div style="font-size:13px;font-weight:600;color:{TEXT_DARK};margin:12px 0 4px;">Suggested Trade</div>',
+                unsafe_allow_html=True)
+    st.markdown(_trade_html(ticker, scan_id, a["alert_type"], a), unsafe_allow_html=True)
+
+    if a["bullish"] is True and a.get("is_top50"):
+        st.success(f"⭐ {ticker} is on our Top 50 Watchlist — this alert reinforces the bullish thesis. See Options Engine for the full spread setup.")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # MAIN RENDER
 # ═══════════════════════════════════════════════════════════════════════════════
 def render_unusual_activity_page():
-    # Load Top 50 reference
-    try:
-        from applovin_data import TOP_50_STOCKS
-        top50_set = {s["ticker"] for s in TOP_50_STOCKS}
-        # Merge top50 tickers into scan universe
-        for s in TOP_50_STOCKS:
-            if s["ticker"] not in SCAN_UNIVERSE:
-                SCAN_UNIVERSE.append(s["ticker"])
-    except Exception:
-        top50_set = set()
-
-    earn_map = _earnings_map()
+    # Load Top 50 reference (merged into the scan universe)
+    top50_set = scan_engine.top50_tickers()
+    earn_map  = scan_engine.earnings_dates()
+    sched     = _scheduler()
 
     # ── PAGE HEADER ──────────────────────────────────────────────────────────
     st.markdown(f'''
@@ -644,7 +403,7 @@ block trades, OI surges, and IV alerts.<br>
 ''', unsafe_allow_html=True)
 
     # ── FILTER ROW ────────────────────────────────────────────────────────────
-    fc1, fc2, fc3, fc4 = st.columns(4)
+    fc1, fc2, fc3, fc4, fc5 = st.columns(5)
     with fc1:
         cat_filter = st.selectbox("Alert Category", ALL_CATS, key="uoa_cat")
     with fc2:
@@ -652,18 +411,28 @@ block trades, OI surges, and IV alerts.<br>
     with fc3:
         mc_filter  = st.selectbox("Market Cap", ALL_MCAP, key="uoa_mc")
     with fc4:
+        sort_label = st.selectbox("Sort By", list(SORT_OPTIONS), key="uoa_sort")
+    with fc5:
         top50_only = st.checkbox("Top 50 Only 🌟", value=False, key="uoa_top50")
+        new_only   = st.checkbox("New since last scan 🆕", value=False, key="uoa_new")
 
     # ── SCAN CONTROLS ─────────────────────────────────────────────────────────
-    bc1, bc2, bc3 = st.columns([1, 1, 2])
+    bc1, bc2, bc3, bc4, bc5 = st.columns([1, 1, 1, 1, 2])
     with bc1:
         full_scan  = st.button("🔍 Full Scan (all tickers)", type="primary", use_container_width=True)
     with bc2:
-        quick_scan = st.button("⚡ Quick Scan (Top 100)", use_container_width=True)
+        quick_scan = st.button(f"⚡ Quick Scan (best {QUICK_SCAN_N})", use_container_width=True)
     with bc3:
+        timed_scan = st.button(f"⏱️ {SCAN_BUDGET}-sec Scan", use_container_width=True)
+    with bc4:
+        refresh_scan = st.button("♻️ Refresh (changed only)", use_container_width=True)
+    with bc5:
         st.markdown(f'<div style="font-size:11px;color:{TEXT_GRAY};padding-top:8px;">'
-                    '⚡ Quick Scan = ~1-2 min &nbsp;|&nbsp; Full Scan = ~5-8 min &nbsp;|&nbsp; '
-                    'Results cached 15 min. Earnings-day rules apply to Top 50 tickers.</div>',
+                    'Tickers are scanned Top 50 first, then earnings within 14 days, then by '
+                    'previous-day volume &nbsp;|&nbsp; ⚡ Quick Scan = ~15 sec &nbsp;|&nbsp; '
+                    'Full Scan = ~1-2 min; scans run in the background and are shared by all users '
+                    '(auto every 5 / 15 min) &nbsp;|&nbsp; ♻️ Refresh re-fetches only stale or newly '
+                    'traded tickers &nbsp;|&nbsp; Earnings-day rules apply to Top 50 tickers.</div>',
                     unsafe_allow_html=True)
 
     # ── ALERT TYPE LEGEND ─────────────────────────────────────────────────────
@@ -686,28 +455,59 @@ block trades, OI surges, and IV alerts.<br>
     if "uoa_alerts"    not in st.session_state: st.session_state["uoa_alerts"]    = []
     if "uoa_last_scan" not in st.session_state: st.session_state["uoa_last_scan"] = None
     if "uoa_scan_n"    not in st.session_state: st.session_state["uoa_scan_n"]    = 0
+    if "uoa_fetched"   not in st.session_state: st.session_state["uoa_fetched"]   = {}
 
     # ── TRIGGER SCAN ──────────────────────────────────────────────────────────
-    if full_scan or quick_scan:
-        tickers = SCAN_UNIVERSE[:100] if quick_scan else SCAN_UNIVERSE
+    # Full / Quick run on the shared background scheduler; this session just reads results
+    if full_scan or quick_scan or timed_scan:
+        sched.trigger("full" if full_scan else "quick" if quick_scan else "timed")
+    _adopt_shared_scan(sched)
+    _scan_status(sched)
+
+    if refresh_scan:
+        volumes = scan_engine.day_volumes()
+        started = time.time()
+        # Same universe as the last scan; only stale or changed tickers are fetched
+        universe = st.session_state.get("uoa_scan_tickers") or SCAN_UNIVERSE
+        stale, changed = scan_engine.rescan_plan(universe, st.session_state["uoa_fetched"], volumes, started)
+        tickers = stale + changed
+        # Cached chains can be up to a TTL older than their fetch stamp: fetch every one afresh
+        for t in tickers:
+            market_data.expire_chain(t)
         st.markdown(f'''
 <div style="background:#EFF6FF;border:1px solid #BFDBFE;border-radius:8px;
 padding:12px 16px;margin:8px 0;font-size:13px;color:{BLUE};">
-🔍 Scanning <strong>{len(tickers)} tickers</strong> for unusual activity…
-Results cached for 15 minutes. Full scan: ~5-8 min.
+🔍 Refreshing <strong>{len(tickers)} of {len(universe)} tickers</strong>
+({len(stale)} stale, {len(changed)} with new volume)…
 </div>''', unsafe_allow_html=True)
 
         prog = st.progress(0)
         status = st.empty()
-
-        alerts = _run_scan(tickers, top50_set, earn_map, prog, status)
-
-        st.session_state["uoa_alerts"]    = alerts
-        st.session_state["uoa_last_scan"] = datetime.now().strftime("%H:%M:%S CT")
-        st.session_state["uoa_scan_n"]    = len(tickers)
+        live = st.empty()
+        streamed: list = []
+
+        def _feed(new: list):
+            streamed.extend(new)
+            with live.container():
+                _live_feed(streamed)
+
+        net0   = net_stats()
+        alerts, scanned, _ = scan_engine.run_scan(tickers, top50_set, earn_map, prog, status, feed=_feed)
+        alert_history.record(alerts, started)
+        # Tickers that failed keep their previous alerts and stay due for the next Refresh
+        st.session_state["uoa_fetched"].update({t: (started, volumes.get(t)) for t in scanned})
+
+        st.session_state["uoa_alerts"]       = scan_engine.merge_alerts(st.session_state["uoa_alerts"], alerts, scanned)
+        st.session_state["uoa_last_scan"]    = datetime.now().strftime("%H:%M:%S CT")
+        st.session_state["uoa_scan_n"]       = len(universe)
+        st.session_state["uoa_scan_tickers"] = list(universe)
+        st.session_state["uoa_refetched"]    = len(scanned)
+        st.session_state["uoa_scan_net"]     = scan_engine.net_delta(net0)
+        st.session_state["uoa_scan_at"]      = time.time()
 
         prog.empty()
         status.empty()
+        live.empty()
         st.rerun()
 
     # ── DISPLAY RESULTS ───────────────────────────────────────────────────────
@@ -716,89 +516,92 @@ Results cached for 15 minutes. Full scan: ~5-8 min.
     scan_n    = st.session_state.get("uoa_scan_n", 0)
 
     if not alerts and not last_scan:
-        st.info("Click **Full Scan** to scan all tickers (1,000+) or **Quick Scan** for a 100-ticker preview. "
-                "Results are cached for 15 minutes.")
+        if sched.status() or sched.queued():
+            st.info("A background scan is running — results appear here as soon as it completes.")
+        else:
+            st.info("Click **Full Scan** to scan all tickers (1,000+) or **Quick Scan** for a 100-ticker "
+                    "preview. Scans run in the background and are shared by all users.")
         return
 
     if last_scan:
-        st.caption(f"Last scan: {last_scan} | {scan_n} tickers checked | {len(alerts)} total alerts found")
-
-    # ── APPLY FILTERS ─────────────────────────────────────────────────────────
-    fa = alerts
-    if cat_filter != "All":
-        fa = [a for a in fa if a["cat"] == cat_filter]
-    if sec_filter != "All Sectors":
-        fa = [a for a in fa if a["sector"] == sec_filter]
-    if mc_filter  != "All Sizes":
-        fa = [a for a in fa if a["mcap_tier"] == mc_filter]
-    if top50_only:
-        fa = [a for a in fa if a["is_top50"]]
-
-    if not fa:
+        net = st.session_state.get("uoa_scan_net")
+        net_txt = (f" | API: {net['requests']:,} requests, {net['throttled']} throttled, "
+                   f"{net['retried']} retried, {net['failed']} failed" if net else "")
+        refetched = st.session_state.get("uoa_refetched")
+        scope = (f"{scan_n} tickers checked ({refetched} re-fetched)" if refetched is not None
+                 else f"{scan_n} tickers checked")
+        age = _age(time.time() - st.session_state.get("uoa_scan_at", time.time()))
+        st.caption(f"Last scan: {last_scan} ({age}) | {scope} | {len(alerts)} total alerts found{net_txt}")
+
+    # ── APPLY FILTERS (columnar store, built once per alert list) ─────────────
+    # Alerts are annotated from the history log (first seen, scans, new) as the store is built
+    with perf.timer("uoa.render.filter"):
+        cached = st.session_state.get("uoa_store")
+        if cached is None or cached[0] is not alerts:
+            cached = st.session_state["uoa_store"] = (
+                alerts, AlertStore(alert_history.annotate(alerts, st.session_state.get("uoa_fetched", {}))))
+        store = cached[1]
+        sel = store.select(cat=None if cat_filter == "All" else cat_filter,
+                           sector=None if sec_filter == "All Sectors" else sec_filter,
+                           mcap_tier=None if mc_filter == "All Sizes" else mc_filter,
+                           top50_only=top50_only, new_only=new_only, sort_by=SORT_OPTIONS[sort_label])
+
+    if not len(sel):
         st.success("No alerts match your current filters.")
         return
+    counts = store.summary(sel)
 
     # ── SUMMARY METRICS ───────────────────────────────────────────────────────
-    bull_cnt     = sum(1 for a in fa if a["bullish"] is True)
-    bear_cnt     = sum(1 for a in fa if a["bullish"] is False)
-    top50_cnt    = sum(1 for a in fa if a["is_top50"])
-    conflict_cnt = sum(1 for a in fa if a.get("conflict"))
-
-    sm1, sm2, sm3, sm4, sm5 = st.columns(5)
-    def _mbox(col, lbl, val, clr=BLUE):
-        col.markdown(f'''<div style="background:{WHITE};border:1px solid {BORDER};border-radius:8px;
-padding:12px;text-align:center;box-shadow:0 1px 3px rgba(0,0,0,0.06);">
-<div style="font-size:24px;font-weight:700;color:{clr};">{val}</div>
-<div style="font-size:11px;color:{TEXT_GRAY};">{lbl}</div></div>''', unsafe_allow_html=True)
-
-    _mbox(sm1, "Filtered Alerts",   len(fa),      BLUE)
-    _mbox(sm2, "Bullish Signals",   bull_cnt,     GREEN)
-    _mbox(sm3, "Bearish Signals",   bear_cnt,     RED)
-    _mbox(sm4, "Top 50 Triggered",  top50_cnt,    GOLD)
-    _mbox(sm5, "Conflicts",         conflict_cnt, RED if conflict_cnt else TEXT_GRAY)
-
-    st.markdown("<br>", unsafe_allow_html=True)
+    _summary_metrics(counts)
 
     # ── CONFLICT BANNER ───────────────────────────────────────────────────────
-    conflicts = [a for a in fa if a.get("conflict")]
-    if conflicts:
-        tks = ", ".join(sorted(set(a["ticker"] for a in conflicts)))
-        st.markdown(f'''
-<div style="background:#FEF2F2;border:2px solid {RED};border-radius:8px;
-padding:14px 18px;margin-bottom:16px;">
-<div style="font-size:14px;font-weight:700;color:{RED};margin-bottom:4px;">
-⚠️ Conflict Alert — Bearish signals on Top 50 Bullish-list stocks</div>
-<div style="font-size:13px;color:{TEXT_DARK};">
-Tickers affected: <strong>{tks}</strong><br>
-These stocks carry active bearish signals. Review your positions before adding exposure.
-</div></div>
-''', unsafe_allow_html=True)
+    _conflict_banner(store.conflict_tickers(sel))
+
+    # ── ALERT TABLE: TOP 50 FIRST, ONE PAGE AT A TIME ─────────────────────────
+    n_pages = max(1, math.ceil(len(sel) / ALERT_PAGE_SIZE))
+    # The widget takes its value from session_state only, clamped to this selection's pages
+    cur = st.session_state.get("uoa_page")
+    if cur is None or not 1 <= cur <= n_pages:
+        st.session_state["uoa_page"] = min(max(int(cur or 1), 1), n_pages)
+    pc1, pc2 = st.columns([1, 5])
+    with pc1:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, key="uoa_page")
+    lo   = (page - 1) * ALERT_PAGE_SIZE
+    rows = store.rows(sel[lo:lo + ALERT_PAGE_SIZE])
+    with pc2:
+        st.markdown(f'<div style="font-size:12px;color:{TEXT_GRAY};padding-top:34px;">'
+                    f'Showing {lo + 1:,}–{lo + len(rows):,} of {len(sel):,} alerts '
+                    f'(<span style="color:{GOLD};font-weight:600;">⭐ {counts["is_top50"]} Top 50</span> listed first, '
+                    f'🆕 {counts["is_new"]} new since the last scan). '
+                    f'Click a column header to sort, or a row for its options chain and suggested trade.</div>',
+                    unsafe_allow_html=True)
 
-    # ── FEED: TOP 50 FIRST ────────────────────────────────────────────────────
-    top50_alerts = [a for a in fa if a["is_top50"]]
-    other_alerts = [a for a in fa if not a["is_top50"]]
-
-    if top50_alerts:
-        st.markdown(f'<div style="font-size:15px;font-weight:700;color:{GOLD};margin:8px 0 4px;">'
-                    f'⭐ Top 50 Watchlist Alerts ({len(top50_alerts)})</div>', unsafe_allow_html=True)
-        for a in top50_alerts:
-            label = f"⭐ {a['ticker']} — {a['label']} @ ${a['price']:.2f}"
-            with st.expander(label, expanded=False):
-                _alert_card(a)
-                _alert_detail(a)
-
-    if other_alerts:
-        st.markdown(f'<div style="font-size:15px;font-weight:700;color:{TEXT_DARK};margin:16px 0 4px;">'
-                    f'Market-Wide Alerts ({len(other_alerts)})</div>', unsafe_allow_html=True)
-        # Cap display at 300 for performance; show note if more
-        display_alerts = other_alerts[:300]
-        if len(other_alerts) > 300:
-            st.caption(f"Showing top 300 of {len(other_alerts)} market-wide alerts. Use filters to narrow.")
-        for a in display_alerts:
-            label = f"{a['ticker']} — {a['label']} @ ${a['price']:.2f}"
-            with st.expander(label, expanded=False):
-                _alert_card(a)
-                _alert_detail(a)
+    table_key = f"uoa_table_{cat_filter}_{sec_filter}_{mc_filter}_{top50_only}_{new_only}_{sort_label}_{page}"
+    with perf.timer("uoa.render.table"):
+        event = st.dataframe(_alerts_frame(rows), hide_index=True, use_container_width=True,
+                             height=min(38 + 35 * len(rows), 600), column_config=ALERT_COLUMNS,
+                             on_select="rerun", selection_mode="single-row", key=table_key)
+    selected = event.selection.rows if event is not None else []
+    if selected:
+        a = rows[selected[0]]
+        _alert_card(a)
+        _alert_detail(a)
+
+    # ── TODAY'S ALERT HISTORY ─────────────────────────────────────────────────
+    with st.expander("📜 Today's alert history (all scans, de-duplicated)"):
+        hist = alert_history.history()
+        if hist.empty:
+            st.caption("No alerts logged yet today.")
+        else:
+            hist["first_seen"] = [_clock(t) for t in hist["first_seen"]]
+            hist["last_seen"]  = [_clock(t) for t in hist["last_seen"]]
+            hist["alert_type"] = [uoa_rules.ALERT_DEFS.get(k, {}).get("label", k) for k in hist["alert_type"]]
+            st.dataframe(hist.rename(columns={
+                "ticker": "Ticker", "alert_type": "Alert", "first_seen": "First Seen",
+                "last_seen": "Last Seen", "scans": "Scans", "peak_vol_ratio": "Peak Vol Ratio",
+                "peak_vol_z": "Peak Vol Z", "peak_total_vol": "Peak Volume",
+                "peak_est_notional": "Peak Notional"}),
+                hide_index=True, use_container_width=True, height=300)
 
     # ── DISCLAIMER ────────────────────────────────────────────────────────────
     st.markdown(f'''
@@ -0,0 +1,393 @@
+"""uoa_rules.py — Unusual-options-activity alert rules
+ALERT_DEFS plus the vectorised rule evaluation shared by the UOA scanner and the
+Options Engine's Top 25 "UNUSUAL CALL ACTIVITY" badge. Inputs are the per-ticker
+(chain, prev_day, iv_rank, prints) tuples from market_data.scan_inputs; volume
+rules use the rolling baselines (baselines.py), OI rules the overnight deltas
+(oi_history.py) and block/sweep rules the trade prints (trade_prints.py)."""
+
+from datetime import datetime, date
+
+import numpy as np
+import pandas as pd
+
+import baselines
+import oi_history
+import perf
+
+# Volume baselines: rolling window used, and the z-score a volume alert needs
+# once a ticker has real history (see baselines.py)
+BASELINE_WINDOW = 30
+VOL_Z_MIN       = 2.0
+
+# Alert colours (same tokens as the pages)
+BLUE   = "#2563EB"
+GREEN  = "#16A34A"
+RED    = "#DC2626"
+AMBER  = "#F59E0B"
+PURPLE = "#7C3AED"
+
+# ── Sector mapping ────────────────────────────────────────────────────────────
+_SECTOR: dict[str, str] = {
+    **{t: "Technology" for t in ["AAPL","MSFT","NVDA","AMD","AVGO","ORCL","QCOM","MU","INTC",
+       "TXN","ADBE","CRM","NOW","INTU","PANW","FTNT","ZS","CRWD","NET","DDOG",
+       "HUBS","OKTA","DOCU","ZM","TWLO","TEAM","GTLB","PATH","ASAN","IOT",
+       "S","SNOW","PLTR","AI","BBAI","APP","TTD","LRCX","AMAT","KLAC",
+       "SNPS","CDNS","ANSS","MCHP","SWKS","QRVO","MPWR","ENTG","ONTO","MKSI","COHR","CIEN",
+       "DT","ESTC","NEWR","SUMO","PCOR","TENB","QLYS","VRNS","CYBR","MGNI","PUBM","APPS"]},
+    **{t: "Financial" for t in ["JPM","BAC","WFC","GS","MS","BLK","C","AXP","SCHW","COF",
+       "BX","KKR","APO","ARES","CG","BAM","NDAQ","ICE","CME","SPGI","MCO","MSCI","FDS","MORN",
+       "V","MA","PYPL","SQ","AFRM","SOFI","LC","ALLY","NU","STNE",
+       "HOOD","COIN","UPST","OPEN","GLBE","DLO","WEX","FLYW","TOST","FOUR","BILL"]},
+    **{t: "Healthcare" for t in ["LLY","UNH","JNJ","PFE","MRK","ABBV","BMY","AMGN","GILD","REGN",
+       "VRTX","MRNA","ISRG","DXCM","ILMN","IDXX","SYK","MDT","ABT","TMO",
+       "DHR","BRKR","WAT","MTD","A","ALNY","BIIB","RARE","BMRN","HZNP","HIMS","RXRX","HOLX"]},
+    **{t: "Consumer" for t in ["WMT","COST","HD","LOW","TGT","SBUX","MCD","CMG","DPZ","WING",
+       "SHAK","BROS","NKE","LULU","DECK","SKX","TPR","CROX","CELH","MNST",
+       "ETSY","W","CHWY","BABA","JD","PDD","SE","GRAB","CPNG","MELI",
+       "SHOP","EBAY","DUOL","CAVA","ONON"]},
+    **{t: "Communication" for t in ["GOOGL","GOOG","META","NFLX","DIS","SPOT","ROKU","SNAP","PINS",
+       "MTCH","WBD","PARA","FOXA","DASH"]},
+    **{t: "Energy" for t in ["XOM","CVX","COP","DVN","EOG","PXD","OXY","HAL","SLB","BKR"]},
+    **{t: "Industrial" for t in ["CAT","DE","HON","GE","BA","LMT","RTX","GD","NOC","LHX",
+       "ETN","EMR","ROK","PH","ITW","DOV","XYL","OTIS","CARR","ROP","UNP","CSX"]},
+    **{t: "Travel/Leisure" for t in ["BKNG","ABNB","EXPE","LYFT","UBER","DKNG","PENN","WYNN","LVS","MGM",
+       "CZR","DAL","UAL","AAL","LUV","JBLU","CCL","RCL","NCLH"]},
+    **{t: "Auto/EV" for t in ["TSLA","RIVN","LCID","NIO","XPEV","LI","F","GM"]},
+    **{t: "Crypto/Digital" for t in ["MSTR","RIOT","CLSK","MARA","HUT","CIFR","CORZ","COIN"]},
+    **{t: "ETF" for t in ["SPY","QQQ","IWM","GLD","SLV","TLT","HYG","LQD",
+       "XLF","XLK","XLE","XLV","XLY","XLI","XLP","XLB","XLRE",
+       "VXX","UVXY","SQQQ","TQQQ","SPXU","UPRO","LABU","LABD"]},
+}
+
+def _sector(ticker: str) -> str:
+    return _SECTOR.get(ticker, "Other")
+
+
+# ── Market-cap tier (for $2B+ filter) ────────────────────────────────────────
+_MEGA = {"AAPL","MSFT","NVDA","AMZN","GOOGL","GOOG","META","TSLA","AVGO","LLY",
+         "JPM","V","XOM","UNH","MA","PG","JNJ","HD","ORCL","COST",
+         "SPY","QQQ","IWM"}
+_LARGE = {"AMD","QCOM","MU","BAC","WFC","GS","MS","BLK","SCHW","NFLX","ADBE",
+          "CRM","NOW","INTU","PANW","CRWD","REGN","ABBV","AMGN","GILD","MRK",
+          "ISRG","PYPL","SQ","MELI","SHOP","COIN","PLTR","DKNG","WYNN","LMT",
+          "RTX","CAT","DE","HON","GE","BA","NEE","DUK","CVX","COP","TMO","DHR",
+          "ZM","DOCU","OKTA","HUBS","TWLO","S","DDOG","NET","BKNG","ABNB","UBER"}
+
+def _mcap_tier(ticker: str) -> str:
+    if ticker in _MEGA:
+        return "Mega ($500B+)"
+    if ticker in _LARGE:
+        return "Large ($50-500B)"
+    return "Mid ($2-50B)"
+
+
+# ── Alert definitions ─────────────────────────────────────────────────────────
+ALERT_DEFS = {
+    # Volume-based
+    "CALL_VOL_2X":  {"label": "🚨 Call Volume 2x Average",          "cat": "Volume",  "color": AMBER,  "bullish": True},
+    "CALL_VOL_3X":  {"label": "🚨 Call Volume 3x Average",          "cat": "Volume",  "color": AMBER,  "bullish": True},
+    "CALL_VOL_5X":  {"label": "🚨 Call Volume 5x Average",          "cat": "Volume",  "color": RED,    "bullish": True},
+    "PC_COLLAPSE":  {"label": "🚨 Put/Call Ratio Collapse",         "cat": "Volume",  "color": AMBER,  "bullish": True},
+    # Block trade
+    "LARGE_BLOCK":  {"label": "🚨 Large Block Trade",               "cat": "Block",   "color": BLUE,   "bullish": True},
+    "INST_BLOCK":   {"label": "🚨 Institutional Block 500+ Ctrs",   "cat": "Block",   "color": BLUE,   "bullish": True},
+    "SWEEP":        {"label": "🚨 Sweep Order Detected",            "cat": "Block",   "color": PURPLE, "bullish": True},
+    # OI-based
+    "OI_SPIKE_25":  {"label": "🚨 Open Interest Spike +25%",        "cat": "OI",      "color": GREEN,  "bullish": True},
+    "OI_SPIKE_40":  {"label": "🚨 OI Up 40% Overnight",             "cat": "OI",      "color": GREEN,  "bullish": True},
+    "OI_SURGE":     {"label": "🚨 OI Surge — New Positioning",      "cat": "OI",      "color": GREEN,  "bullish": True},
+    # IV-based
+    "IV_SPIKE":     {"label": "🚨 IV Spike Detected",               "cat": "IV",      "color": AMBER,  "bullish": None},
+    "IV_ELEVATED":  {"label": "🚨 IV Rank — 80th Percentile",       "cat": "IV",      "color": AMBER,  "bullish": None},
+    "IV_CRUSH":     {"label": "🚨 IV Crush Risk — Earnings Near",   "cat": "IV",      "color": RED,    "bullish": None},
+    # Bearish / warning
+    "UNUSUAL_PUT":  {"label": "⚠️ Unusual Put Activity",            "cat": "Bearish", "color": RED,    "bullish": False},
+    "PUT_VOL_3X":   {"label": "⚠️ Put Volume 3x Average",           "cat": "Bearish", "color": RED,    "bullish": False},
+    "BEARISH_BLOCK":{"label": "⚠️ Large Bearish Block",             "cat": "Bearish", "color": RED,    "bullish": False},
+}
+
+# Bullish call-side alerts behind the Options Engine's "UNUSUAL CALL ACTIVITY" badge
+CALL_ACTIVITY = {"CALL_VOL_2X", "CALL_VOL_3X", "CALL_VOL_5X", "LARGE_BLOCK", "INST_BLOCK", "SWEEP"}
+
+
+# ── Alert detection logic ─────────────────────────────────────────────────────
+@perf.timed("uoa_rules.universe_frames")
+def universe_frames(inputs: dict, oi_deltas: bool = True) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Flatten scan inputs into one per-(ticker, type, strike) frame and one per-ticker frame.
+
+    oi_deltas=False skips the overnight OI diff (OI rules then use strike
+    concentration) — for cheap single-ticker lookups; scans keep it on.
+    """
+    tickers = list(inputs)
+    cols    = {c: [] for c in ("ticker", "type", "strike", "volume", "oi", "near_vol")}
+    for t in tickers:
+        chain = inputs[t][0]
+        cols["ticker"] += [t] * len(chain.strikes)
+        for c, vals in zip(chain.STRIKE_COLUMNS, chain.strike_columns()):
+            cols[c] += vals
+    strikes = pd.DataFrame(cols)
+    strikes["strike"] = strikes["strike"].astype("float64")
+    for col in ("volume", "oi", "near_vol"):
+        strikes[col] = strikes[col].astype("int64")
+
+    df = pd.DataFrame(index=pd.Index(tickers, name="ticker"))
+    df["price"]       = [float(inputs[t][1]["c"]) for t in tickers]
+    df["stock_vol"]   = [int(inputs[t][1].get("v", 0) or 0) for t in tickers]
+    df["iv_rank"]     = pd.to_numeric(pd.Series([inputs[t][2] for t in tickers], index=df.index),
+                                      errors="coerce")
+    df["max_call_vol"] = [inputs[t][0].max_call_vol for t in tickers]
+    df["max_put_vol"]  = [inputs[t][0].max_put_vol for t in tickers]
+
+    # Trade prints of the most active call / put (absent when not drilled into)
+    for ct in ("call", "put"):
+        side = [inputs[t][3].get(ct) for t in tickers]
+        df[f"has_{ct}_prints"] = [p is not None for p in side]
+        for key in ("block_size", "block_premium") + (
+                ("sweep_contracts", "sweep_exchanges", "sweep_premium") if ct == "call" else ()):
+            df[f"{ct}_{key}"] = [(p or {}).get(key, 0) for p in side]
+
+    by_type = (strikes.groupby(["ticker", "type"])[["volume", "oi", "near_vol"]].sum()
+               .unstack("type", fill_value=0))
+    for src, ct, dst in (("volume", "call", "call_vol"), ("volume", "put", "put_vol"),
+                         ("oi", "call", "call_oi"), ("oi", "put", "put_oi"),
+                         ("near_vol", "call", "near_term_call_vol")):
+        col = by_type[(src, ct)] if (src, ct) in by_type.columns else pd.Series(dtype="int64")
+        df[dst] = col.reindex(df.index, fill_value=0).astype("int64")
+
+    call_strikes = strikes[(strikes["type"] == "call") & (strikes["strike"] != 0)]
+    put_strikes  = strikes[(strikes["type"] == "put") & (strikes["strike"] != 0)]
+    df["max_strike_oi"]  = call_strikes.groupby("ticker")["oi"].max().reindex(df.index)
+    top_put = put_strikes.groupby("ticker", sort=False)["oi"].idxmax()
+    df["max_put_strike"] = (pd.Series(put_strikes.loc[top_put.values, "strike"].values,
+                                      index=top_put.index, dtype="float64")
+                            .reindex(df.index, fill_value=0.0))
+
+    # Overnight OI: largest per-contract call OI increase vs the previous stored day
+    oi_chg = pd.DataFrame(columns=["ticker", "type", "strike", "expiry", "prev_oi", "oi", "change"])
+    if oi_deltas:
+        try:
+            oi_history.flush()
+            oi_chg = oi_history.changes(tickers)
+        except Exception:
+            pass
+    df["has_oi_hist"] = df.index.isin(oi_chg["ticker"].unique())
+    call_chg = oi_chg[oi_chg["type"] == "call"]
+    best = call_chg.loc[call_chg.groupby("ticker")["change"].idxmax()].set_index("ticker") \
+        if not call_chg.empty else pd.DataFrame(columns=["strike", "expiry", "prev_oi", "change"])
+    df["oi_change"]        = best["change"].reindex(df.index).fillna(0).astype("int64")
+    df["oi_prev"]          = best["prev_oi"].reindex(df.index).fillna(0).astype("int64")
+    df["oi_change_strike"] = best["strike"].reindex(df.index)
+    df["oi_change_expiry"] = best["expiry"].reindex(df.index)
+    return strikes, df
+
+
+@perf.timed("uoa_rules.detect_batch")
+def detect_batch(inputs: dict, top50_set: set, earnings_map: dict,
+                 frame: pd.DataFrame | None = None, oi_deltas: bool = True,
+                 hist: pd.DataFrame | None = None) -> list:
+    """Evaluate every ALERT_DEFS rule over all tickers at once.
+
+    `inputs` maps ticker → (chain, prev_day, iv_rank, prints) from scan_inputs; pass
+    `frame` if the per-ticker frame was already built (oi_deltas is passed to
+    universe_frames otherwise), and `hist` if baselines.frame(BASELINE_WINDOW)
+    was already read — callers detecting many small batches read it once. Rules are computed as
+    column operations; only the resulting alerts are materialised as dicts,
+    in ticker then rule order.
+    """
+    if not inputs:
+        return []
+    df = frame if frame is not None else universe_frames(inputs, oi_deltas)[1]
+    tickers = df.index
+
+    call_vol, put_vol = df["call_vol"], df["put_vol"]
+    price     = df["price"]
+    total_vol = call_vol + put_vol
+    pc_ratio  = (put_vol / call_vol.where(call_vol > 0)).fillna(999.0)
+
+    # ── Volume baselines ──────────────────────────────────────────────────────
+    # Real rolling 30-day call/put means once a ticker has MIN_DAYS of history;
+    # until then, estimate from previous-day stock volume and market-cap tier.
+    tier = pd.Series([_mcap_tier(t) for t in tickers], index=tickers)
+    sv   = df["stock_vol"]
+    est_call = pd.Series(np.select(
+        [tier.str.contains("Mega"), tier.str.contains("Large")],
+        [np.maximum(5000, sv // 200), np.maximum(1000, sv // 500)],
+        np.maximum(300, sv // 1000),
+    ), index=tickers)
+    try:
+        hist = (baselines.frame(BASELINE_WINDOW) if hist is None else hist).reindex(tickers)
+    except Exception:
+        hist = pd.DataFrame(index=tickers, columns=["n"] + [
+            f"{m}_{k}" for m in ("call_vol", "put_vol") for k in ("mean", "std")], dtype="float64")
+    has_hist = hist["n"].fillna(0) >= baselines.MIN_DAYS
+    baseline_call = est_call.where(~has_hist, hist["call_vol_mean"].clip(lower=1))
+    baseline_put  = (est_call * 0.7).astype("int64").where(~has_hist, hist["put_vol_mean"].clip(lower=1))
+    call_z = (call_vol - hist["call_vol_mean"]) / hist["call_vol_std"].clip(lower=1)
+    put_z  = (put_vol - hist["put_vol_mean"]) / hist["put_vol_std"].clip(lower=1)
+
+    # ── VOLUME-BASED ──────────────────────────────────────────────────────────
+    vol_ratio = call_vol / baseline_call.where(baseline_call > 0)
+    vol_base  = (call_vol >= 500) & (baseline_call > 0) & (~has_hist | (call_z >= VOL_Z_MIN))
+    vol_alert = pd.Series(np.select(
+        [vol_base & (vol_ratio >= 5) & (call_vol >= 1000),
+         vol_base & (vol_ratio >= 3), vol_base & (vol_ratio >= 2)],
+        ["CALL_VOL_5X", "CALL_VOL_3X", "CALL_VOL_2X"], ""), index=tickers)
+
+    # P/C Ratio Collapse: P/C < 0.40, high volume
+    pc_collapse = ((pc_ratio < 0.40) & (total_vol >= (baseline_call * 1.5).astype("int64"))
+                   & (call_vol >= 500))
+
+    # ── BLOCK TRADE-BASED ─────────────────────────────────────────────────────
+    # With trade prints, a block is the largest single print on the most active
+    # call and a sweep is a burst of prints across exchanges (trade_prints.py).
+    # Tickers without prints fall back to the snapshot proxies: the contract's
+    # whole-day volume, and near-term volume concentration.
+    call_prints = df["has_call_prints"]
+    mcv = df["call_block_size"].where(call_prints, df["max_call_vol"])
+    est_notional = mcv * price * 0.40 * 100  # delta ~0.40
+    block_alert = pd.Series(np.select(
+        [(mcv >= 500) & (est_notional >= 500_000), (mcv >= 200) & (est_notional >= 100_000)],
+        ["INST_BLOCK", "LARGE_BLOCK"], ""), index=tickers)
+
+    near = df["near_term_call_vol"]
+    concentration = near / call_vol.where(call_vol > 0)
+    sweep = ((call_prints & (df["call_sweep_contracts"] > 0))
+             | (~call_prints & (near >= 300) & (call_vol > 0) & (concentration >= 0.40)))
+
+    # ── OI-BASED ─────────────────────────────────────────────────────────────
+    # True overnight change of the biggest-moving call contract (oi_history).
+    # Tickers with no stored OI from the previous day fall back to
+    # single-snapshot strike concentration.
+    oi_hist = df["has_oi_hist"]
+    oi_chg, oi_prev = df["oi_change"], df["oi_prev"]
+    oi_pct = oi_chg / oi_prev.where(oi_prev > 0)   # NaN = contract opened since yesterday
+    is_new = oi_prev == 0
+    delta_alert = np.select(
+        [oi_hist & (oi_chg >= 5000) & (is_new | (oi_pct >= 1.00)),
+         oi_hist & (oi_chg >= 2000) & (is_new | (oi_pct >= 0.40)),
+         oi_hist & (oi_chg >= 1000) & (is_new | (oi_pct >= 0.25))],
+        ["OI_SURGE", "OI_SPIKE_40", "OI_SPIKE_25"], "")
+
+    msoi = df["max_strike_oi"]
+    oi_conc = msoi / df["call_oi"].where(df["call_oi"] > 0)
+    oi_base = (msoi >= 1000) & (df["call_oi"] > 0)
+    conc_alert = np.select(
+        [oi_base & (oi_conc >= 0.35) & (msoi >= 5000),
+         oi_base & (oi_conc >= 0.25) & (msoi >= 2000), oi_base],
+        ["OI_SURGE", "OI_SPIKE_40", "OI_SPIKE_25"], "")
+    oi_alert = pd.Series(np.where(oi_hist, delta_alert, conc_alert), index=tickers)
+
+    # ── IV-BASED ──────────────────────────────────────────────────────────────
+    iv = df["iv_rank"]
+    iv_elevated = iv >= 80
+    earn_str  = pd.Series([earnings_map.get(t, "") or "" for t in tickers], index=tickers)
+    earn_dt   = pd.to_datetime(earn_str, format="%Y-%m-%d", errors="coerce")
+    days_out  = (earn_dt - pd.Timestamp(date.today())).dt.days
+    iv_crush  = (days_out >= 0) & (days_out <= 14) & (iv >= 50)
+
+    # ── BEARISH / WARNING ─────────────────────────────────────────────────────
+    put_base  = (put_vol >= 500) & (~has_hist | (put_z >= VOL_Z_MIN))
+    put_alert = pd.Series(np.select(
+        [put_base & (pc_ratio >= 3.0) & (put_vol >= baseline_put * 3),
+         put_base & (pc_ratio >= 1.5) & (put_vol >= baseline_put * 2)],
+        ["PUT_VOL_3X", "UNUSUAL_PUT"], ""), index=tickers)
+
+    put_prints = df["has_put_prints"]
+    mpv = df["put_block_size"].where(put_prints, df["max_put_vol"])
+    est_put_notional = mpv * price * 0.35 * 100
+    bearish_block = ((mpv >= 200) & (est_put_notional >= 150_000)
+                     & (df["max_put_strike"] <= price * 1.02))
+
+    fired = ((vol_alert != "") | pc_collapse | (block_alert != "") | sweep | (oi_alert != "")
+             | iv_elevated | iv_crush | (put_alert != "") | bearish_block)
+
+    # ── Materialise alert dicts for tickers that fired ────────────────────────
+    ts = datetime.now().strftime("%H:%M")
+    alerts: list[dict] = []
+    for t in tickers[fired.to_numpy()]:
+        _, prev, iv_rank_val, _ = inputs[t]
+        is_top50 = t in top50_set
+        base = {
+            "time":        ts,
+            "price":       prev["c"],
+            "call_vol":    int(call_vol[t]),
+            "put_vol":     int(put_vol[t]),
+            "total_vol":   int(total_vol[t]),
+            "pc_ratio":    round(float(pc_ratio[t]), 2),
+            "call_oi":     int(df.at[t, "call_oi"]),
+            "put_oi":      int(df.at[t, "put_oi"]),
+            "iv_rank":     iv_rank_val,
+            "is_top50":    is_top50,
+            "sector":      _sector(t),
+            "mcap_tier":   tier[t],
+        }
+
+        def _mk(alert_type: str, extra: dict | None = None) -> dict:
+            d = ALERT_DEFS[alert_type]
+            a = {
+                "ticker":     t,
+                "alert_type": alert_type,
+                "label":      d["label"],
+                "cat":        d["cat"],
+                "color":      d["color"],
+                "bullish":    d["bullish"],
+                **base,
+                "conflict":   is_top50 and d["bullish"] is False,
+            }
+            if extra:
+                a.update(extra)
+            return a
+
+        if vol_alert[t]:
+            extra = {"vol_ratio": round(float(vol_ratio[t]), 1)}
+            if has_hist[t]:
+                extra["vol_z"] = round(float(call_z[t]), 1)
+            alerts.append(_mk(vol_alert[t], extra))
+        if pc_collapse[t]:
+            alerts.append(_mk("PC_COLLAPSE"))
+        if block_alert[t]:
+            alerts.append(_mk(block_alert[t], {
+                "block_contracts": int(mcv[t]),
+                "est_notional":    float(est_notional[t]),
+                **({"block_premium": float(df.at[t, "call_block_premium"])} if call_prints[t] else {}),
+            }))
+        if sweep[t] and call_prints[t]:
+            alerts.append(_mk("SWEEP", {
+                "sweep_contracts": int(df.at[t, "call_sweep_contracts"]),
+                "sweep_exchanges": int(df.at[t, "call_sweep_exchanges"]),
+                "sweep_premium":   float(df.at[t, "call_sweep_premium"]),
+            }))
+        elif sweep[t]:
+            alerts.append(_mk("SWEEP", {"near_term_vol": int(near[t]),
+                                        "concentration": round(float(concentration[t]), 2)}))
+        if oi_alert[t] and oi_hist[t]:
+            alerts.append(_mk(oi_alert[t], {
+                "oi_change":     int(oi_chg[t]),
+                "oi_prev":       int(oi_prev[t]),
+                "oi_change_pct": None if is_new[t] else round(float(oi_pct[t]) * 100, 1),
+                "oi_strike":     float(df.at[t, "oi_change_strike"]),
+                "oi_expiry":     df.at[t, "oi_change_expiry"],
+            }))
+        elif oi_alert[t] == "OI_SURGE":
+            alerts.append(_mk("OI_SURGE", {
+                "max_strike_oi":    int(msoi[t]),
+                "oi_concentration": round(float(oi_conc[t]), 2),
+            }))
+        elif oi_alert[t]:
+            alerts.append(_mk(oi_alert[t], {"max_strike_oi": int(msoi[t])}))
+        if iv_elevated[t]:
+            alerts.append(_mk("IV_ELEVATED"))
+        if iv_crush[t]:
+            alerts.append(_mk("IV_CRUSH", {
+                "days_to_earnings": int(days_out[t]),
+                "earnings_date":    earn_str[t],
+            }))
+        if put_alert[t]:
+            alerts.append(_mk(put_alert[t], {"vol_z": round(float(put_z[t]), 1)} if has_hist[t] else None))
+        if bearish_block[t]:
+            alerts.append(_mk("BEARISH_BLOCK", {
+                "block_contracts": int(mpv[t]),
+                "est_notional":    float(est_put_notional[t]),
+                **({"block_premium": float(df.at[t, "put_block_premium"])} if put_prints[t] else {}),
+            }))
+    return alerts